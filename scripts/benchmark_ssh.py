@@ -0,0 +1,78 @@
+"""Compare the Paramiko and OpenSSH session backends against the configured host.
+
+Reads the usual ``REMOTECRAFT_*`` settings, then for each backend measures the
+latency of a trivial command on a warm connection and the throughput of streaming
+a block of zeros from the host. Nothing on the host is modified.
+
+    python scripts/benchmark_ssh.py --commands 50 --megabytes 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
+from remotecraft.config import Settings
+from remotecraft.openssh import OpenSSHMaster
+from remotecraft.ssh import RemoteSession, SSHConnectionPool
+
+Factory = Callable[[], AbstractContextManager[RemoteSession]]
+
+
+def measure(factory: Factory, commands: int, megabytes: int) -> dict[str, float]:
+    with factory() as remote:
+        remote.run("true")  # connect and authenticate outside the timings
+
+    latencies = []
+    for _ in range(commands):
+        started = time.perf_counter()
+        with factory() as remote:
+            remote.run("true")
+        latencies.append(time.perf_counter() - started)
+
+    size = megabytes * 1024 * 1024
+    started = time.perf_counter()
+    with factory() as remote:
+        received = sum(
+            len(chunk.text) for chunk in remote.stream(f"head -c {size} /dev/zero", max_bytes=size)
+        )
+    elapsed = time.perf_counter() - started
+    if received != size:
+        raise SystemExit(f"expected {size} bytes, received {received}")
+
+    latencies.sort()
+    return {
+        "median_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "mib_per_s": megabytes / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=50)
+    parser.add_argument("--megabytes", type=int, default=64)
+    args = parser.parse_args()
+
+    settings = Settings.from_env()
+    backends: dict[str, Factory] = {
+        "paramiko": SSHConnectionPool(settings),
+        "openssh": OpenSSHMaster(settings),
+    }
+    print(f"{'backend':<10} {'median ms':>10} {'p95 ms':>10} {'MiB/s':>10}")
+    for name, factory in backends.items():
+        try:
+            result = measure(factory, args.commands, args.megabytes)
+        finally:
+            factory.close()  # type: ignore[attr-defined]
+        print(
+            f"{name:<10} {result['median_ms']:>10.1f} {result['p95_ms']:>10.1f} "
+            f"{result['mib_per_s']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure server metadata lookups and updates for each store backend.
+
+Fills a temporary data directory with 10, 100 and 1000 records per backend, then
+times ``get`` of random ids and ``update`` of one record's status. Nothing outside
+the temporary directory is touched.
+
+    python scripts/benchmark_store.py --operations 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+from remotecraft.models import ServerRecord
+from remotecraft.store import JournaledServerStore, RecordStore, ServerStore, SqliteServerStore
+
+SIZES = (10, 100, 1000)
+BACKENDS: dict[str, Callable[[Path], RecordStore]] = {
+    "json": ServerStore,
+    "journal": JournaledServerStore,
+    "sqlite": SqliteServerStore,
+}
+
+
+def record(index: int) -> ServerRecord:
+    server_id = uuid.uuid4().hex
+    return ServerRecord(
+        id=server_id,
+        name=f"server-{index}",
+        version="1.21.5",
+        ram_gb=4,
+        path=f"/srv/minecraft/server-{index}-{server_id[:8]}",
+        screen_name=f"rc-{server_id[:12]}",
+        jar_sha1="0" * 40,
+    )
+
+
+def timed(operation: Callable[[], object], count: int) -> float:
+    """Return the median latency of ``operation`` in microseconds."""
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1_000_000
+
+
+def measure(
+    factory: Callable[[Path], RecordStore], size: int, operations: int
+) -> tuple[float, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        store = factory(Path(directory))
+        ids = [store.add(record(index)).id for index in range(size)]
+        statuses = iter(["online", "offline"] * operations)
+        get = timed(lambda: store.get(random.choice(ids)), operations)  # noqa: S311
+        update = timed(lambda: store.update(ids[0], status=next(statuses)), operations)
+        close = getattr(store, "close", None)
+        if close:
+            close()
+    return get, update
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'records':>8} {'get µs':>10} {'update µs':>10}")
+    for name, factory in BACKENDS.items():
+        for size in SIZES:
+            get, update = measure(factory, size, args.operations)
+            print(f"{name:<8} {size:>8} {get:>10.1f} {update:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ import os
 import uvicorn
 from dotenv import load_dotenv
 
+from remotecraft.config import Settings
+from remotecraft.errors import ConfigurationError
+
 
 def main() -> None:
     load_dotenv()
@@ -15,7 +18,12 @@ def main() -> None:
         raise SystemExit("REMOTECRAFT_PORT must be an integer") from exc
     if not 1 <= port <= 65535:
         raise SystemExit("REMOTECRAFT_PORT must be between 1 and 65535")
-    uvicorn.run("remotecraft.api:create_app", factory=True, host=host, port=port)
+    try:
+        workers = Settings.from_env().workers
+    except ConfigurationError as exc:
+        raise SystemExit(str(exc)) from exc
+    # Each worker process builds its own app through the factory.
+    uvicorn.run("remotecraft.api:create_app", factory=True, host=host, port=port, workers=workers)
 
 
 if __name__ == "__main__":
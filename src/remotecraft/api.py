@@ -2,25 +2,48 @@
 
 from __future__ import annotations
 
+import contextlib
+import functools
 import hmac
-from typing import Annotated, Literal
+import itertools
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Annotated, Literal, TypeVar
 
+import anyio
 from fastapi import Depends, FastAPI, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
 from remotecraft import __version__
+from remotecraft.breaker import CircuitBreaker, GuardedSessionFactory
 from remotecraft.config import Settings
 from remotecraft.errors import RemoteCraftError
-from remotecraft.models import ServerView
-from remotecraft.service import MinecraftService
-from remotecraft.store import ServerStore
+from remotecraft.events import EventBus, StateFeed, event_stream, relay_events
+from remotecraft.helper import RemoteHelper
+from remotecraft.jobs import DEFAULT_QUEUE, JobManager, JobWork, Report
+from remotecraft.mirror import JarMirror
+from remotecraft.models import BulkAction, BulkResult, JobView, ServerView
+from remotecraft.openssh import OpenSSHMaster
+from remotecraft.reconciler import StatusReconciler
+from remotecraft.service import AsyncMinecraftService, MinecraftService
+from remotecraft.shared import FileLock, SharedState
+from remotecraft.ssh import SSHConnectionPool
+from remotecraft.store import (
+    JournaledServerStore,
+    RecordStore,
+    ServerStore,
+    SqliteServerStore,
+)
 from remotecraft.versions import VersionCatalog
 
 bearer = HTTPBearer(auto_error=False)
+T = TypeVar("T")
+UNREACHABLE_HOST: dict[str, object] = {"reachable": False, "ready": False, "tools": {}}
 
 
 class CreateServerRequest(BaseModel):
@@ -34,10 +57,48 @@ class CommandRequest(BaseModel):
     command: str = Field(min_length=1, max_length=512)
 
 
+class BulkRequest(BaseModel):
+    ids: list[str] = Field(min_length=1, max_length=100)
+    # Each booting server holds an SSH channel; sshd allows 10 per connection.
+    stagger: int | None = Field(default=None, ge=1, le=8)
+
+
 def build_service(settings: Settings) -> MinecraftService:
-    store = ServerStore(settings.data_dir)
+    stores: dict[str, Callable[[Path], RecordStore]] = {
+        "json": ServerStore,
+        "journal": JournaledServerStore,
+        "sqlite": SqliteServerStore,
+    }
+    store = stores[settings.store_backend](settings.data_dir)
+    # Worker processes share status, jobs and events only when there are several.
+    shared = SharedState(settings.data_dir) if settings.workers > 1 else None
     catalog = VersionCatalog(settings.data_dir / "versions.json")
-    return MinecraftService(settings, store, catalog)
+    breaker = CircuitBreaker(
+        failure_threshold=settings.ssh_failure_threshold,
+        reset_seconds=settings.ssh_retry_seconds,
+    )
+    sessions = (
+        OpenSSHMaster(settings)
+        if settings.ssh_backend == "openssh"
+        else SSHConnectionPool(settings)
+    )
+    return MinecraftService(
+        settings,
+        store,
+        catalog,
+        session_factory=GuardedSessionFactory(sessions, breaker),
+        helper=RemoteHelper(
+            settings,
+            breaker=breaker,
+            master=sessions if isinstance(sessions, OpenSSHMaster) else None,
+        )
+        if settings.remote_helper
+        else None,
+        mirror=JarMirror(settings.data_dir / "jars", catalog)
+        if settings.jar_source == "mirror"
+        else None,
+        shared=shared,
+    )
 
 
 def create_app(
@@ -45,6 +106,82 @@ def create_app(
 ) -> FastAPI:
     settings = settings or Settings.from_env()
     service = service or build_service(settings)
+    session_factory = getattr(service, "session_factory", None)
+    breaker: CircuitBreaker | None = getattr(session_factory, "breaker", None)
+    shared: SharedState | None = getattr(service, "shared", None)
+    reconciler = (
+        StatusReconciler(
+            service,
+            interval_seconds=settings.reconcile_interval_seconds,
+            leader=FileLock(settings.data_dir / "reconciler.lock") if shared else None,
+        )
+        if isinstance(service, MinecraftService) and settings.reconcile_interval_seconds
+        else None
+    )
+    bus = EventBus(shared=shared)
+    feed = StateFeed(bus)
+
+    def job_changed(job: JobView, servers: list[ServerView] | None) -> None:
+        feed.job(job)
+        if servers is not None:
+            feed.servers(servers)
+
+    def job_listener(job: JobView) -> None:
+        # Runs on the job's worker thread, so the store read stays off the event loop.
+        servers = reconciler.list_servers() if job.state == "succeeded" and reconciler else None
+        bus.call_threadsafe(job_changed, job, servers)
+
+    jobs = JobManager(
+        max_workers=settings.job_concurrency,
+        listener=job_listener,
+        shared=shared,
+        # Bulk operations and background restarts must not hold up provisioning;
+        # a staggered bulk start can take hours.
+        queues={"lifecycle": settings.job_concurrency},
+    )
+
+    async def probe_host(factory: GuardedSessionFactory) -> None:
+        # Requests fail fast while the circuit is open; this loop closes it once the
+        # host answers again, without waiting for a user request to be the trial.
+        while True:
+            await anyio.sleep(factory.breaker.reset_seconds)
+            if factory.breaker.state != "closed":
+                await anyio.to_thread.run_sync(factory.probe)
+
+    async def warm_catalog(catalog: VersionCatalog) -> None:
+        # Loads or revalidates the manifest before the first /api/versions request.
+        with contextlib.suppress(RemoteCraftError):
+            await anyio.to_thread.run_sync(catalog.refresh, abandon_on_cancel=True)
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+        bus.attach()
+        async with anyio.create_task_group() as tasks:
+            catalog = getattr(service, "catalog", None)
+            if isinstance(catalog, VersionCatalog):
+                tasks.start_soon(warm_catalog, catalog)
+            if isinstance(session_factory, GuardedSessionFactory):
+                tasks.start_soon(probe_host, session_factory)
+            if reconciler:
+                tasks.start_soon(
+                    functools.partial(reconciler.run, remote.limiter, after_pass=after_pass)
+                )
+            if shared:
+                tasks.start_soon(relay_events, shared, feed)
+            yield
+            tasks.cancel_scope.cancel()
+        for resource in (
+            jobs,
+            session_factory,
+            getattr(service, "helper", None),
+            getattr(service, "store", None),
+            bus,
+            shared,
+        ):
+            close = getattr(resource, "close", None)
+            if close:
+                close()
+
     app = FastAPI(
         title="RemoteCraft API",
         summary="Manage Vanilla Minecraft servers on a trusted Linux host over SSH.",
@@ -52,9 +189,53 @@ def create_app(
         docs_url=None,
         redoc_url=None,
         openapi_url=None,
+        lifespan=lifespan,
     )
     app.state.settings = settings
     app.state.service = service
+    remote = AsyncMinecraftService(service, concurrency=settings.ssh_pool_size)
+
+    async def current_servers() -> list[ServerView]:
+        if reconciler:
+            # No SSH, but still store I/O, which must not block the event loop.
+            return await anyio.to_thread.run_sync(reconciler.list_servers)
+        return await remote.list_servers()
+
+    async def publish_servers() -> None:
+        if not bus.subscribers:
+            return
+        try:
+            feed.servers(await current_servers())
+        except RemoteCraftError:
+            # The operation itself succeeded; the next pass or snapshot catches up.
+            pass
+
+    async def after_pass(reachable: bool) -> None:
+        if not reachable:
+            feed.host_state(UNREACHABLE_HOST)
+        elif not (feed.host and feed.host["reachable"]):
+            # Tools are only re-checked when the host comes back, not on every pass.
+            try:
+                feed.host_state({"reachable": True, **await remote.check_host()})
+            except RemoteCraftError:
+                feed.host_state(UNREACHABLE_HOST)
+        feed.servers(await current_servers())
+
+    async def submit_job(kind: str, work: JobWork, *, queue: str = DEFAULT_QUEUE) -> JobView:
+        # With several workers the job is saved to SQLite, which must not block the loop.
+        return await anyio.to_thread.run_sync(
+            functools.partial(jobs.submit, kind, work, queue=queue)
+        )
+
+    async def operate(action: str, server_id: str, call: Awaitable[T]) -> T:
+        try:
+            result = await call
+        except RemoteCraftError as exc:
+            feed.operation(action, server_id, ok=False, detail=str(exc))
+            raise
+        feed.operation(action, server_id, ok=True)
+        await publish_servers()
+        return result
 
     if settings.allowed_origins:
         app.add_middleware(
@@ -109,59 +290,143 @@ def create_app(
     auth = [Depends(require_token)]
 
     @app.get("/api/health", include_in_schema=False)
-    def health() -> dict[str, object]:
-        return {"status": "ok", "version": __version__}
+    async def health() -> dict[str, object]:
+        payload: dict[str, object] = {"status": "ok", "version": __version__}
+        if breaker:
+            payload["ssh"] = breaker.snapshot()
+        return payload
 
     @app.get("/api/host", dependencies=auth)
-    def host_status() -> dict[str, object]:
-        return service.check_host()
+    async def host_status() -> dict[str, object]:
+        host = await remote.check_host()
+        feed.host_state({"reachable": True, **host})
+        return host
+
+    @app.post("/api/host/jar-cache/collect", dependencies=auth)
+    async def collect_jar_cache() -> dict[str, list[str]]:
+        return {"removed": await remote.collect_jar_cache()}
 
     @app.get("/api/versions", dependencies=auth)
-    def versions(limit: Annotated[int, Query(ge=1, le=100)] = 30) -> dict[str, list[str]]:
-        return {"versions": service.catalog.list_releases(limit)}
+    async def versions(limit: Annotated[int, Query(ge=1, le=100)] = 30) -> dict[str, list[str]]:
+        return {"versions": await remote.list_releases(limit)}
 
     @app.get("/api/servers", dependencies=auth, response_model=list[ServerView])
-    def list_servers() -> list[ServerView]:
-        return service.list_servers()
+    async def list_servers() -> list[ServerView]:
+        return await current_servers()
+
+    @app.get("/api/events", dependencies=auth, include_in_schema=False)
+    async def events() -> StreamingResponse:
+        return StreamingResponse(
+            event_stream(bus, feed, current_servers),
+            media_type="text/event-stream",
+            headers={"X-Accel-Buffering": "no"},
+        )
 
     @app.post(
         "/api/servers",
         dependencies=auth,
-        response_model=ServerView,
-        status_code=status.HTTP_201_CREATED,
+        response_model=JobView,
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+    async def create_server(payload: CreateServerRequest) -> JobView:
+        request = payload.model_dump()
+        # Invalid or duplicate requests fail here; the download runs as a job.
+        await remote.validate_new_server(**request)
+        return await submit_job(
+            "create", lambda report: service.create_server(**request, progress=report)
+        )
+
+    @app.get("/api/jobs/{job_id}", dependencies=auth, response_model=JobView)
+    async def job_status(job_id: str) -> JobView:
+        return await anyio.to_thread.run_sync(jobs.get, job_id)
+
+    # Registered before the per-server routes, which would match ``bulk`` as an id.
+    @app.post(
+        "/api/servers/bulk/{action}",
+        dependencies=auth,
+        response_model=JobView,
+        status_code=status.HTTP_202_ACCEPTED,
     )
-    def create_server(payload: CreateServerRequest) -> ServerView:
-        return service.create_server(**payload.model_dump())
+    async def bulk_operation(action: BulkAction, payload: BulkRequest) -> JobView:
+        service.validate_bulk(action, stagger=payload.stagger)
+        total = len(set(payload.ids))
+
+        def run(report: Report) -> list[BulkResult]:
+            # A staggered start can take hours, so each server's outcome is published
+            # as an ``operation`` event as soon as it is known.
+            done = itertools.count(1)
+
+            def finished(result: BulkResult) -> None:
+                bus.call_threadsafe(
+                    lambda: feed.operation(
+                        action, result.id, ok=result.ok, detail=result.detail or ""
+                    )
+                )
+                report(action, next(done), total)
+
+            return service.run_bulk(
+                action, payload.ids, stagger=payload.stagger, on_result=finished
+            )
+
+        return await submit_job(f"bulk-{action}", run, queue="lifecycle")
 
     @app.post("/api/servers/{server_id}/start", dependencies=auth, response_model=ServerView)
-    def start_server(server_id: str) -> ServerView:
-        return service.start_server(server_id)
+    async def start_server(server_id: str) -> ServerView:
+        return await operate("start", server_id, remote.start_server(server_id))
 
     @app.post("/api/servers/{server_id}/stop", dependencies=auth, response_model=ServerView)
-    def stop_server(server_id: str) -> ServerView:
-        return service.stop_server(server_id)
+    async def stop_server(server_id: str, wait: bool = False) -> ServerView:
+        return await operate("stop", server_id, remote.stop_server(server_id, wait=wait))
 
-    @app.post("/api/servers/{server_id}/restart", dependencies=auth, response_model=ServerView)
-    def restart_server(server_id: str) -> ServerView:
-        return service.restart_server(server_id)
+    @app.post(
+        "/api/servers/{server_id}/restart",
+        dependencies=auth,
+        response_model=ServerView,
+        responses={status.HTTP_202_ACCEPTED: {"model": JobView}},
+    )
+    async def restart_server(server_id: str, background: bool = False) -> ServerView | JSONResponse:
+        if not background:
+            return await operate("restart", server_id, remote.restart_server(server_id))
+        # Unknown ids fail here; the stop, wait, and start run as a job.
+        await remote.get_server(server_id)
+
+        def run(_report: Report) -> ServerView:
+            # The dashboard follows restarts through their ``operation`` event.
+            try:
+                server = service.restart_server(server_id)
+            except RemoteCraftError as exc:
+                detail = str(exc)
+                bus.call_threadsafe(
+                    lambda: feed.operation("restart", server_id, ok=False, detail=detail)
+                )
+                raise
+            bus.call_threadsafe(lambda: feed.operation("restart", server_id, ok=True))
+            return server
+
+        job = await submit_job("restart", run, queue="lifecycle")
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED, content=job.model_dump(mode="json")
+        )
 
     @app.post("/api/servers/{server_id}/kill", dependencies=auth, response_model=ServerView)
-    def kill_server(server_id: str) -> ServerView:
-        return service.kill_server(server_id)
+    async def kill_server(server_id: str) -> ServerView:
+        return await operate("kill", server_id, remote.kill_server(server_id))
 
     @app.delete("/api/servers/{server_id}", dependencies=auth, response_model=ServerView)
-    def delete_server(
+    async def delete_server(
         server_id: str, confirm: str = Query(min_length=2, max_length=32)
     ) -> ServerView:
-        return service.delete_server(server_id, confirm=confirm)
+        return await operate("delete", server_id, remote.delete_server(server_id, confirm=confirm))
 
     @app.post("/api/servers/{server_id}/command", dependencies=auth)
-    def send_command(server_id: str, payload: CommandRequest) -> dict[str, str]:
-        return service.send_command(server_id, payload.command)
+    async def send_command(server_id: str, payload: CommandRequest) -> dict[str, str]:
+        return await remote.send_command(server_id, payload.command)
 
     @app.get("/api/servers/{server_id}/logs", dependencies=auth)
-    def logs(server_id: str, lines: Annotated[int, Query(ge=1, le=500)] = 100) -> dict[str, object]:
-        return service.get_logs(server_id, lines)
+    async def logs(
+        server_id: str, lines: Annotated[int, Query(ge=1, le=500)] = 100
+    ) -> dict[str, object]:
+        return await remote.get_logs(server_id, lines)
 
     app.mount("/assets", StaticFiles(directory=settings.frontend_dir), name="assets")
 
@@ -0,0 +1,151 @@
+"""Circuit breaker that fails fast while the managed host is unreachable."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from types import TracebackType
+from typing import Any, Literal, TypeVar
+
+import paramiko
+
+from remotecraft.errors import ConfigurationError, HostUnavailableError, RemoteCraftError
+from remotecraft.ssh import TRANSPORT_ERRORS, RemoteSession
+
+BreakerState = Literal["closed", "open", "half_open"]
+T = TypeVar("T")
+
+
+def _is_rejection(exc: BaseException) -> bool:
+    """Whether the host answered but refused our host key check or credentials."""
+    if isinstance(exc, paramiko.BadHostKeyException | paramiko.AuthenticationException):
+        return True
+    # RejectPolicy reports an unknown host key as a plain SSHException.
+    return isinstance(exc, paramiko.SSHException) and "not found in known_hosts" in str(exc)
+
+
+class CircuitBreaker:
+    """Tracks consecutive connection failures to the SSH host.
+
+    After ``failure_threshold`` failures the circuit opens and callers are rejected
+    immediately. Once ``reset_seconds`` have passed a single trial connection is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state: BreakerState = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def _retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.reset_seconds - self.clock())
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and self._retry_in() == 0:
+                self.state = "half_open"
+                return
+        retry = max(1, math.ceil(self._retry_in()))
+        raise HostUnavailableError(f"SSH host is unreachable; retrying in {retry}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = self.clock()
+
+    def call(self, func: Callable[[], T]) -> T:
+        self.before_call()
+        try:
+            result = func()
+        except TRANSPORT_ERRORS as exc:
+            if _is_rejection(exc):
+                # The host is up; retrying cannot fix its key or our credentials.
+                self.record_success()
+                raise ConfigurationError(f"SSH host rejected the connection: {exc}") from exc
+            self.record_failure()
+            raise HostUnavailableError("Could not connect to the SSH host") from exc
+        except BaseException:
+            # Configuration or policy errors say nothing about reachability, but a
+            # half-open trial must not leave the circuit stuck waiting for a result.
+            with self._lock:
+                if self.state == "half_open":
+                    self.state = "open"
+                    self._opened_at = self.clock()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in_seconds": round(self._retry_in(), 1) if self.state == "open" else 0,
+            }
+
+
+class GuardedSessionFactory:
+    """Session factory whose connection step goes through a :class:`CircuitBreaker`."""
+
+    def __init__(
+        self,
+        factory: Callable[[], AbstractContextManager[RemoteSession]],
+        breaker: CircuitBreaker,
+    ) -> None:
+        self.factory = factory
+        self.breaker = breaker
+
+    def __call__(self) -> _GuardedSession:
+        return _GuardedSession(self.factory(), self.breaker)
+
+    def probe(self) -> bool:
+        """Try one connection if the breaker allows it; used by the background prober."""
+        try:
+            with self():
+                return True
+        except RemoteCraftError:
+            return False
+
+    def close(self) -> None:
+        close = getattr(self.factory, "close", None)
+        if close:
+            close()
+
+
+class _GuardedSession:
+    def __init__(self, session: AbstractContextManager[RemoteSession], breaker: CircuitBreaker):
+        self.session = session
+        self.breaker = breaker
+
+    def __enter__(self) -> RemoteSession:
+        return self.breaker.call(self.session.__enter__)
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> Any:
+        return self.session.__exit__(exc_type, exc_value, traceback)
@@ -44,6 +44,18 @@ class Settings:
     max_ram_gb: int = 16
     connect_timeout_seconds: int = 10
     command_timeout_seconds: int = 90
+    ssh_pool_size: int = 4
+    ssh_pool_idle_seconds: int = 60
+    remote_helper: bool = False
+    ssh_failure_threshold: int = 3
+    ssh_retry_seconds: int = 15
+    ssh_backend: str = "paramiko"
+    status_cache_seconds: int = 5
+    reconcile_interval_seconds: int = 10
+    job_concurrency: int = 2
+    jar_source: str = "host"
+    store_backend: str = "json"
+    workers: int = 1
     allowed_origins: tuple[str, ...] = ()
 
     @classmethod
@@ -80,8 +92,18 @@ class Settings:
             max_ram_gb = int(os.getenv("REMOTECRAFT_MAX_RAM_GB", "16"))
             connect_timeout = int(os.getenv("REMOTECRAFT_CONNECT_TIMEOUT", "10"))
             command_timeout = int(os.getenv("REMOTECRAFT_COMMAND_TIMEOUT", "90"))
+            pool_size = int(os.getenv("REMOTECRAFT_SSH_POOL_SIZE", "4"))
+            pool_idle = int(os.getenv("REMOTECRAFT_SSH_POOL_IDLE", "60"))
+            failure_threshold = int(os.getenv("REMOTECRAFT_SSH_FAILURE_THRESHOLD", "3"))
+            retry_seconds = int(os.getenv("REMOTECRAFT_SSH_RETRY_SECONDS", "15"))
+            status_cache = int(os.getenv("REMOTECRAFT_STATUS_CACHE_SECONDS", "5"))
+            reconcile_interval = int(os.getenv("REMOTECRAFT_RECONCILE_SECONDS", "10"))
+            job_concurrency = int(os.getenv("REMOTECRAFT_JOB_CONCURRENCY", "2"))
+            workers = int(os.getenv("REMOTECRAFT_WORKERS", "1"))
         except ValueError as exc:
-            raise ConfigurationError("Port, RAM, and timeout settings must be integers") from exc
+            raise ConfigurationError(
+                "Port, RAM, timeout, pool, cache, job, and worker settings must be integers"
+            ) from exc
 
         if not 1 <= ssh_port <= 65535:
             raise ConfigurationError("REMOTECRAFT_SSH_PORT must be between 1 and 65535")
@@ -89,10 +111,38 @@ class Settings:
             raise ConfigurationError("REMOTECRAFT_MAX_RAM_GB must be between 1 and 64")
         if connect_timeout < 1 or command_timeout < 1:
             raise ConfigurationError("SSH timeouts must be positive")
+        if not 1 <= pool_size <= 32:
+            raise ConfigurationError("REMOTECRAFT_SSH_POOL_SIZE must be between 1 and 32")
+        if pool_idle < 1:
+            raise ConfigurationError("REMOTECRAFT_SSH_POOL_IDLE must be positive")
+        if failure_threshold < 1 or retry_seconds < 1:
+            raise ConfigurationError("SSH circuit breaker settings must be positive")
+        if not 0 <= status_cache <= 300:
+            raise ConfigurationError("REMOTECRAFT_STATUS_CACHE_SECONDS must be between 0 and 300")
+        if not 0 <= reconcile_interval <= 3600:
+            raise ConfigurationError("REMOTECRAFT_RECONCILE_SECONDS must be between 0 and 3600")
+        if not 1 <= job_concurrency <= 16:
+            raise ConfigurationError("REMOTECRAFT_JOB_CONCURRENCY must be between 1 and 16")
+        if not 1 <= workers <= 32:
+            raise ConfigurationError("REMOTECRAFT_WORKERS must be between 1 and 32")
 
         password = os.getenv("REMOTECRAFT_SSH_PASSWORD", "").strip() or None
         key_path = _optional_path(os.getenv("REMOTECRAFT_SSH_KEY_PATH"))
         use_agent = _as_bool(os.getenv("REMOTECRAFT_SSH_USE_AGENT"), True)
+        remote_helper = _as_bool(os.getenv("REMOTECRAFT_REMOTE_HELPER"), False)
+        ssh_backend = os.getenv("REMOTECRAFT_SSH_BACKEND", "paramiko").strip().lower()
+        if ssh_backend not in {"paramiko", "openssh"}:
+            raise ConfigurationError("REMOTECRAFT_SSH_BACKEND must be paramiko or openssh")
+        if ssh_backend == "openssh" and password:
+            raise ConfigurationError("The OpenSSH backend does not support password authentication")
+        jar_source = os.getenv("REMOTECRAFT_JAR_SOURCE", "host").strip().lower()
+        if jar_source not in {"host", "mirror"}:
+            raise ConfigurationError("REMOTECRAFT_JAR_SOURCE must be host or mirror")
+        store_backend = os.getenv("REMOTECRAFT_STORE_BACKEND", "json").strip().lower()
+        if store_backend not in {"json", "journal", "sqlite"}:
+            raise ConfigurationError("REMOTECRAFT_STORE_BACKEND must be json, journal, or sqlite")
+        if store_backend == "journal" and workers > 1:
+            raise ConfigurationError("The journal store backend supports only one worker")
         if not password and not key_path and not use_agent:
             raise ConfigurationError("Configure an SSH password, key path, or SSH agent")
 
@@ -122,5 +172,17 @@ class Settings:
             max_ram_gb=max_ram_gb,
             connect_timeout_seconds=connect_timeout,
             command_timeout_seconds=command_timeout,
+            ssh_pool_size=pool_size,
+            ssh_pool_idle_seconds=pool_idle,
+            remote_helper=remote_helper,
+            ssh_failure_threshold=failure_threshold,
+            ssh_retry_seconds=retry_seconds,
+            ssh_backend=ssh_backend,
+            status_cache_seconds=status_cache,
+            reconcile_interval_seconds=reconcile_interval,
+            job_concurrency=job_concurrency,
+            jar_source=jar_source,
+            store_backend=store_backend,
+            workers=workers,
             allowed_origins=origins,
         )
@@ -41,3 +41,8 @@ class StoreError(RemoteCraftError):
 class UpstreamError(RemoteCraftError):
     code = "upstream_error"
     status_code = 502
+
+
+class HostUnavailableError(RemoteCraftError):
+    code = "host_unavailable"
+    status_code = 503
@@ -0,0 +1,202 @@
+"""Server-sent events pushed to dashboards when observed state changes."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+
+from remotecraft.errors import StoreError
+from remotecraft.models import JobView, ServerView
+from remotecraft.shared import SharedState
+
+Event = dict[str, Any]
+KEEPALIVE_SECONDS = 15
+RELAY_SECONDS = 0.5
+RELAY_MAX_BACKOFF_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """Fans events out to subscribers on the event loop.
+
+    Each subscriber gets a bounded queue. A subscriber that falls behind is
+    disconnected rather than buffered; it reconnects and starts from a fresh snapshot.
+    With ``shared`` published events are also appended there for :func:`relay_events`
+    in the other worker processes, in order, by one writer thread: SQLite may wait on
+    another process's lock, which must not stall the event loop.
+    """
+
+    def __init__(self, *, max_queued: int = 64, shared: SharedState | None = None) -> None:
+        self.max_queued = max_queued
+        self.shared = shared
+        self._writer = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="events") if shared else None
+        )
+        self._subscribers: set[MemoryObjectSendStream[Event]] = set()
+        self._token: anyio.lowlevel.EventLoopToken | None = None
+        self._loop_thread: int | None = None
+
+    def attach(self) -> None:
+        """Remember the running event loop so worker threads can hand work to it."""
+        self._token = anyio.lowlevel.current_token()
+        self._loop_thread = threading.get_ident()
+
+    def call_threadsafe(self, func: Callable[..., object], *args: object) -> None:
+        """Run ``func`` on the event loop, from any thread."""
+        if self._token is None or threading.get_ident() == self._loop_thread:
+            func(*args)
+            return
+        try:
+            anyio.from_thread.run_sync(func, *args, token=self._token)
+        except RuntimeError:
+            # The loop is shutting down; nobody is subscribed any more.
+            pass
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[MemoryObjectReceiveStream[Event]]:
+        send, receive = anyio.create_memory_object_stream[Event](self.max_queued)
+        self._subscribers.add(send)
+        try:
+            with receive:
+                yield receive
+        finally:
+            self._subscribers.discard(send)
+            send.close()
+
+    def publish(self, event: Event) -> None:
+        if self.shared and self._writer:
+            self._writer.submit(self._append, self.shared, event)
+        self.deliver(event)
+
+    @staticmethod
+    def _append(shared: SharedState, event: Event) -> None:
+        try:
+            shared.append_event(event)
+        except StoreError:
+            # Other workers miss this one event; their next snapshot catches up.
+            logger.exception("Could not share a %s event with other workers", event["type"])
+
+    def close(self) -> None:
+        """Finish appending queued events to the shared state."""
+        if self._writer:
+            self._writer.shutdown(wait=True)
+
+    def deliver(self, event: Event) -> None:
+        """Hand ``event`` to this process's subscribers only."""
+        for send in list(self._subscribers):
+            try:
+                send.send_nowait(event)
+            except (anyio.WouldBlock, anyio.BrokenResourceError):
+                self._subscribers.discard(send)
+                send.close()
+
+
+class StateFeed:
+    """Remembers the last published state and publishes only what changed."""
+
+    def __init__(self, bus: EventBus) -> None:
+        self.bus = bus
+        self.host: dict[str, object] | None = None
+        self._servers: dict[str, dict[str, Any]] = {}
+
+    @staticmethod
+    def _comparable(view: ServerView) -> dict[str, Any]:
+        # The snapshot age changes on every pass and is not a state change.
+        return view.model_dump(mode="json", exclude={"status_age_seconds"})
+
+    def servers(self, views: Sequence[ServerView]) -> None:
+        current = {view.id: self._comparable(view) for view in views}
+        changed = [
+            view.model_dump(mode="json")
+            for view in views
+            if self._servers.get(view.id) != current[view.id]
+        ]
+        removed = [server_id for server_id in self._servers if server_id not in current]
+        self._servers = current
+        if changed or removed:
+            self.bus.publish({"type": "servers", "changed": changed, "removed": removed})
+
+    def host_state(self, host: dict[str, object]) -> None:
+        if host != self.host:
+            self.host = host
+            self.bus.publish({"type": "host", "host": host})
+
+    def job(self, job: JobView) -> None:
+        self.bus.publish({"type": "job", "job": job.model_dump(mode="json")})
+
+    def operation(self, action: str, server_id: str, *, ok: bool, detail: str = "") -> None:
+        self.bus.publish(
+            {
+                "type": "operation",
+                "action": action,
+                "server_id": server_id,
+                "ok": ok,
+                "detail": detail,
+            }
+        )
+
+
+async def relay_events(
+    shared: SharedState, feed: StateFeed, *, interval_seconds: float = RELAY_SECONDS
+) -> None:
+    """Deliver events published by other worker processes to this one's subscribers.
+
+    A failed read, such as a database locked for longer than its busy timeout, is
+    retried with a doubling delay of up to :data:`RELAY_MAX_BACKOFF_SECONDS`.
+    """
+    last: int | None = None
+    delay = interval_seconds
+    while True:
+        try:
+            if last is None:
+                last = await anyio.to_thread.run_sync(shared.last_event)
+            else:
+                for seq, event in await anyio.to_thread.run_sync(shared.events_since, last):
+                    if event["type"] == "host":
+                        feed.host = event["host"]
+                    feed.bus.deliver(event)
+                    last = seq
+            delay = interval_seconds
+        except StoreError:
+            logger.exception("Could not read events from other workers")
+            delay = min(delay * 2, RELAY_MAX_BACKOFF_SECONDS)
+        await anyio.sleep(delay)
+
+
+def format_event(event: Event) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+async def event_stream(
+    bus: EventBus,
+    feed: StateFeed,
+    servers: Callable[[], Awaitable[Sequence[ServerView]]],
+    *,
+    keepalive_seconds: float = KEEPALIVE_SECONDS,
+) -> AsyncIterator[str]:
+    """Yield a snapshot followed by every published change as SSE frames."""
+    with bus.subscribe() as receive:
+        # Subscribing first means nothing published while the snapshot is read is lost.
+        snapshot = [view.model_dump(mode="json") for view in await servers()]
+        yield format_event({"type": "snapshot", "servers": snapshot, "host": feed.host})
+        while True:
+            event: Event | None = None
+            with anyio.move_on_after(keepalive_seconds):
+                try:
+                    event = await receive.receive()
+                except anyio.EndOfStream:
+                    return
+            yield format_event(event) if event else ": keepalive\n\n"
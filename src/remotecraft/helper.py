@@ -0,0 +1,347 @@
+"""Optional long-lived helper process on the managed host.
+
+The helper is a small, version-pinned Python script uploaded to the host and kept
+running on one SSH channel. It speaks length-prefixed JSON frames and only accepts a
+fixed allow-list of verbs that mirror the service's narrow command surface, so the
+security boundary stays explicit while each operation costs one message round-trip
+instead of a new exec channel, remote shell and ``screen`` fork.
+"""
+
+from __future__ import annotations
+
+import base64
+import functools
+import hashlib
+import json
+import shlex
+import struct
+import threading
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from remotecraft.breaker import CircuitBreaker
+from remotecraft.config import Settings
+from remotecraft.errors import RemoteCommandError
+from remotecraft.openssh import OpenSSHMaster
+from remotecraft.ssh import TRANSPORT_ERRORS, ParamikoRemoteSession, connect_client
+
+MAX_FRAME = 4 * 1024 * 1024
+HEADER = struct.Struct(">I")
+
+HELPER_SCRIPT = r'''"""RemoteCraft host helper. Generated by the control plane; do not edit."""
+import json
+import os
+import re
+import shlex
+import struct
+import subprocess
+import sys
+
+ROOT = os.path.normpath(sys.argv[1])
+SCREEN = re.compile(r"rc-[0-9a-f]{12}")
+CONTROL = re.compile(r"[\x00-\x1f\x7f]")
+HEADER = struct.Struct(">I")
+MAX_FRAME = 4 * 1024 * 1024
+QUIET = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+
+
+def read_exact(size):
+    data = b""
+    while len(data) < size:
+        chunk = sys.stdin.buffer.read(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def send(message):
+    payload = json.dumps(message).encode()
+    sys.stdout.buffer.write(HEADER.pack(len(payload)) + payload)
+    sys.stdout.buffer.flush()
+
+
+def screen_name(args):
+    name = args.get("screen")
+    if not isinstance(name, str) or not SCREEN.fullmatch(name):
+        raise ValueError("invalid screen name")
+    return name
+
+
+def server_path(args):
+    path = args.get("path")
+    if (
+        not isinstance(path, str)
+        or os.path.normpath(path) != path
+        or os.path.dirname(path) != ROOT
+        or os.path.basename(path) in {"", ".", ".."}
+    ):
+        raise ValueError("path is outside the servers root")
+    return path
+
+
+def bounded_int(args, key, low, high):
+    value = args.get(key)
+    if type(value) is not int or not low <= value <= high:
+        raise ValueError(f"{key} must be between {low} and {high}")
+    return value
+
+
+def running(name):
+    return subprocess.run(["screen", "-S", name, "-Q", "select", "."], **QUIET).returncode == 0
+
+
+def status_all(_args):
+    output = subprocess.run(["screen", "-ls"], capture_output=True, text=True).stdout
+    return {"sessions": sorted(set(re.findall(r"^\s*\d+\.(rc-[0-9a-f]{12})\s", output, re.M)))}
+
+
+def is_running(args):
+    return {"running": running(screen_name(args))}
+
+
+def start(args):
+    name = screen_name(args)
+    path = server_path(args)
+    ram_gb = bounded_int(args, "ram_gb", 1, 64)
+    if running(name):
+        return {"started": False}
+    inner = f"cd {shlex.quote(path)} && exec java -Xms1G -Xmx{ram_gb}G -jar server.jar nogui"
+    subprocess.run(["screen", "-DmS", name, "bash", "-lc", inner], check=True, **QUIET)
+    return {"started": True}
+
+
+def stuff(args, text=None):
+    name = screen_name(args)
+    text = args.get("text") if text is None else text
+    if not isinstance(text, str) or not 1 <= len(text) <= 512 or CONTROL.search(text):
+        raise ValueError("text must be 1-512 printable characters")
+    if not running(name):
+        return {"sent": False}
+    subprocess.run(["screen", "-S", name, "-X", "stuff", text + "\n"], check=True, **QUIET)
+    return {"sent": True}
+
+
+def stop(args):
+    return stuff(args, "stop")
+
+
+def quit_session(args):
+    subprocess.run(["screen", "-S", screen_name(args), "-X", "quit"], **QUIET)
+    return {}
+
+
+def tail(args):
+    lines = bounded_int(args, "lines", 1, 500)
+    log_path = os.path.join(server_path(args), "logs", "latest.log")
+    if not os.path.isfile(log_path):
+        return {"available": False, "lines": []}
+    with open(log_path, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position, data = handle.tell(), b""
+        while position > 0 and data.count(b"\n") <= lines:
+            step = min(65536, position)
+            position -= step
+            handle.seek(position)
+            data = handle.read(step) + data
+    text = data.decode("utf-8", errors="replace")
+    return {"available": True, "lines": text.splitlines()[-lines:]}
+
+
+VERBS = {
+    "status-all": status_all,
+    "running": is_running,
+    "start": start,
+    "stuff": stuff,
+    "stop": stop,
+    "quit": quit_session,
+    "tail": tail,
+}
+
+
+def main():
+    while True:
+        try:
+            (size,) = HEADER.unpack(read_exact(HEADER.size))
+            if size > MAX_FRAME:
+                send({"id": None, "ok": False, "error": "frame too large"})
+                return
+            request = json.loads(read_exact(size))
+        except EOFError:
+            return
+        except ValueError:
+            send({"id": None, "ok": False, "error": "invalid request"})
+            continue
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            verb = VERBS[request["verb"]]
+            args = request.get("args") or {}
+            if not isinstance(args, dict):
+                raise ValueError("args must be an object")
+            send({"id": request_id, "ok": True, "result": verb(args)})
+        except KeyError:
+            send({"id": request_id, "ok": False, "error": "unknown verb"})
+        except Exception as exc:
+            send({"id": request_id, "ok": False, "error": str(exc)[:500]})
+
+
+if __name__ == "__main__":
+    main()
+'''
+HELPER_DIGEST = hashlib.sha256(HELPER_SCRIPT.encode()).hexdigest()
+HELPER_PATH = f".cache/remotecraft/helper-{HELPER_DIGEST[:16]}.py"
+
+
+class HelperChannel(Protocol):
+    def sendall(self, data: bytes) -> None: ...
+
+    def recv(self, size: int) -> bytes: ...
+
+    def close(self) -> None: ...
+
+
+def encode_frame(message: dict[str, Any]) -> bytes:
+    payload = json.dumps(message, separators=(",", ":")).encode()
+    if len(payload) > MAX_FRAME:
+        raise RemoteCommandError("Remote helper request is too large")
+    return HEADER.pack(len(payload)) + payload
+
+
+def read_frame(channel: HelperChannel) -> dict[str, Any]:
+    def read_exact(size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = channel.recv(size - len(data))
+            if not chunk:
+                raise EOFError("remote helper closed the channel")
+            data += chunk
+        return data
+
+    (size,) = HEADER.unpack(read_exact(HEADER.size))
+    if size > MAX_FRAME:
+        raise RemoteCommandError("Remote helper response is too large")
+    message = json.loads(read_exact(size))
+    if not isinstance(message, dict):
+        raise RemoteCommandError("Remote helper returned an invalid response")
+    return message
+
+
+def install_command() -> str:
+    """Upload the pinned helper unless an identical copy is already on the host."""
+    path = shlex.quote(HELPER_PATH)
+    encoded = base64.b64encode(HELPER_SCRIPT.encode()).decode()
+    return (
+        f"printf '%s  %s\\n' {HELPER_DIGEST} {path} | sha256sum --check --status 2>/dev/null || "
+        "{ install -d -m 0700 .cache/remotecraft && "
+        f"printf '%s' {encoded} | base64 -d > {path}.tmp && "
+        f"chmod 0500 {path}.tmp && mv -f {path}.tmp {path}; }}"
+    )
+
+
+def helper_command(settings: Settings) -> str:
+    """Replace the login shell with the installed helper, serving ``servers_root``."""
+    return f"exec python3 -I {shlex.quote(HELPER_PATH)} {shlex.quote(settings.servers_root)}"
+
+
+class RemoteHelper:
+    """Serializes verb calls to one helper process over a long-lived SSH channel.
+
+    The channel is opened lazily and dropped on any transport error; the next call
+    reconnects. A failed call is never retried because start and stuff are not
+    idempotent.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        open_channel: Callable[[], HelperChannel] | None = None,
+        breaker: CircuitBreaker | None = None,
+        master: OpenSSHMaster | None = None,
+    ) -> None:
+        self.settings = settings
+        if open_channel is None:
+            open_channel = (
+                functools.partial(self._open_openssh_channel, master)
+                if master
+                else self._open_ssh_channel
+            )
+        self.open_channel = open_channel
+        self.breaker = breaker
+        self._channel: HelperChannel | None = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _open_ssh_channel(self) -> HelperChannel:
+        client = connect_client(self.settings)
+        try:
+            installer = ParamikoRemoteSession(self.settings)
+            installer.client = client
+            installer.run(install_command())
+            transport = client.get_transport()
+            if transport is None:
+                raise RemoteCommandError("SSH session is not connected")
+            channel = transport.open_session(timeout=self.settings.connect_timeout_seconds)
+            channel.settimeout(self.settings.command_timeout_seconds)
+            channel.exec_command(helper_command(self.settings))
+        except BaseException:
+            client.close()
+            raise
+        return _OwningChannel(channel, client)
+
+    def _open_openssh_channel(self, master: OpenSSHMaster) -> HelperChannel:
+        with master() as installer:
+            installer.run(install_command())
+        return master.open_channel(helper_command(self.settings))
+
+    def call(self, verb: str, **args: object) -> Any:
+        with self._lock:
+            if self._channel is None:
+                self._channel = (
+                    self.breaker.call(self.open_channel) if self.breaker else self.open_channel()
+                )
+            self._next_id += 1
+            try:
+                self._channel.sendall(
+                    encode_frame({"id": self._next_id, "verb": verb, "args": args})
+                )
+                response = read_frame(self._channel)
+            except (*TRANSPORT_ERRORS, ValueError) as exc:
+                self._close_channel()
+                raise RemoteCommandError("Lost connection to the remote helper") from exc
+            except RemoteCommandError:
+                self._close_channel()
+                raise
+            if response.get("id") != self._next_id:
+                self._close_channel()
+                raise RemoteCommandError("Remote helper response was out of order")
+        if not response.get("ok"):
+            raise RemoteCommandError(str(response.get("error") or "remote helper failed")[:500])
+        return response.get("result")
+
+    def _close_channel(self) -> None:
+        if self._channel is not None:
+            self._channel.close()
+            self._channel = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_channel()
+
+
+class _OwningChannel:
+    """Helper channel that also closes the dedicated SSH client it runs on."""
+
+    def __init__(self, channel: Any, client: Any) -> None:
+        self.channel = channel
+        self.client = client
+
+    def sendall(self, data: bytes) -> None:
+        self.channel.sendall(data)
+
+    def recv(self, size: int) -> bytes:
+        return self.channel.recv(size)
+
+    def close(self) -> None:
+        self.channel.close()
+        self.client.close()
@@ -0,0 +1,130 @@
+"""Bounded background jobs for long-running operations such as provisioning."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+
+from remotecraft.errors import NotFoundError, RemoteCraftError
+from remotecraft.models import BulkResult, JobProgress, JobView, ServerView
+from remotecraft.shared import SharedState
+
+Report = Callable[[str, int | None, int | None], None]
+JobListener = Callable[[JobView], None]
+JobWork = Callable[[Report], ServerView | list[BulkResult]]
+DEFAULT_QUEUE = "default"
+
+logger = logging.getLogger(__name__)
+
+
+class JobManager:
+    """Runs jobs on a fixed-size worker pool and keeps their latest state in memory.
+
+    Jobs beyond ``max_workers`` wait in the queue. ``queues`` names extra worker pools
+    with their own sizes, so long jobs submitted to one cannot hold up the default
+    queue. Workers report progress through the
+    callable passed to the job; ``listener`` sees every state change and progress step
+    that moves by at least one percent. Only the most recent ``history`` jobs are kept.
+    With ``shared`` every change is also saved there, so any worker process can answer
+    :meth:`get` for a job another one runs.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int,
+        listener: JobListener | None = None,
+        history: int = 100,
+        shared: SharedState | None = None,
+        queues: Mapping[str, int] | None = None,
+    ) -> None:
+        self.listener = listener
+        self.history = history
+        self.shared = shared
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-job")
+            for name, workers in {DEFAULT_QUEUE: max_workers, **(queues or {})}.items()
+        }
+        self._jobs: OrderedDict[str, JobView] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, work: JobWork, *, queue: str = DEFAULT_QUEUE) -> JobView:
+        executor = self._executors[queue]
+        job = JobView(id=uuid.uuid4().hex, kind=kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest].state in ("queued", "running"):
+                    break
+                self._jobs.popitem(last=False)
+        self._notify(job)
+        executor.submit(self._run, job.id, work)
+        return job
+
+    def get(self, job_id: str) -> JobView:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.shared:
+            job = self.shared.load_job(job_id)
+        if job is None:
+            raise NotFoundError("Job not found")
+        return job
+
+    def _update(self, job_id: str, **changes: object) -> JobView:
+        with self._lock:
+            job = self._jobs[job_id].model_copy(update=changes)
+            self._jobs[job_id] = job
+        self._notify(job)
+        return job
+
+    def _notify(self, job: JobView) -> None:
+        if self.shared:
+            self.shared.save_job(job)
+        if self.listener:
+            self.listener(job)
+
+    def _run(self, job_id: str, work: JobWork) -> None:
+        self._update(job_id, state="running", progress=JobProgress(stage="starting"))
+        last: list[tuple[str, int | None]] = [("starting", None)]
+
+        def report(stage: str, done: int | None = None, total: int | None = None) -> None:
+            percent = done * 100 // total if done is not None and total else None
+            if (stage, percent) == last[0]:
+                return
+            last[0] = (stage, percent)
+            self._update(job_id, progress=JobProgress(stage=stage, done=done, total=total))
+
+        try:
+            result = work(report)
+        except RemoteCraftError as exc:
+            self._finish(job_id, state="failed", error=str(exc), error_code=exc.code)
+        except Exception:
+            # Clients only see a generic message, so the traceback goes to the log.
+            logger.exception("Job %s (%s) failed unexpectedly", job_id, self._jobs[job_id].kind)
+            self._finish(
+                job_id,
+                state="failed",
+                error="The job failed unexpectedly",
+                error_code="internal_error",
+            )
+        else:
+            self._finish(job_id, state="succeeded", result=result)
+
+    def _finish(self, job_id: str, **changes: object) -> None:
+        stage = "done" if changes["state"] == "succeeded" else "failed"
+        self._update(
+            job_id,
+            progress=JobProgress(stage=stage),
+            finished_at=datetime.now(UTC),
+            **changes,
+        )
+
+    def close(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,97 @@
+"""Per-server serialization of lifecycle operations."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar
+
+from remotecraft.shared import FileLock
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+@dataclass(slots=True)
+class _Entry:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    users: int = 0
+    calls: dict[Hashable, _Call] = field(default_factory=dict)
+
+
+class ServerLocks:
+    """A lock table keyed by server id.
+
+    Operations on one server run one at a time; operations on different servers never
+    wait for each other. A request whose ``key`` matches one already queued or running
+    on the same server waits for that call and shares its result or error instead of
+    running again, so a double-clicked restart restarts once. Entries exist only while
+    a call holds or waits for them.
+
+    With ``directory`` each call also holds an advisory lock on
+    ``<directory>/<server id>.lock``, which serializes the server across worker
+    processes. Server ids must then be safe file names.
+    """
+
+    def __init__(
+        self, directory: Path | None = None, *, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.directory = directory
+        self.clock = clock
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        if directory:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def run(self, server_id: str, key: Hashable, work: Callable[[], T]) -> tuple[T, float]:
+        """Run ``work`` under ``server_id``'s lock; return its result and the seconds waited."""
+        started = self.clock()
+        with self._lock:
+            entry = self._entries.setdefault(server_id, _Entry())
+            entry.users += 1
+            call = entry.calls.get(key)
+            leader = call is None
+            if call is None:
+                call = entry.calls[key] = _Call()
+        try:
+            if not leader:
+                call.done.wait()
+                if call.error:
+                    raise call.error
+                return call.result, self.clock() - started
+            try:
+                with entry.lock, self._process_lock(server_id):
+                    waited = self.clock() - started
+                    call.result = work()
+            except BaseException as exc:
+                call.error = exc
+                raise
+            finally:
+                with self._lock:
+                    del entry.calls[key]
+                call.done.set()
+            return call.result, waited
+        finally:
+            with self._lock:
+                entry.users -= 1
+                if not entry.users:
+                    del self._entries[server_id]
+
+    def _process_lock(self, server_id: str) -> AbstractContextManager[object]:
+        return FileLock(self.directory / f"{server_id}.lock") if self.directory else nullcontext()
+
+    def pending(self, server_id: str) -> int:
+        """Number of calls running or waiting on ``server_id``."""
+        with self._lock:
+            entry = self._entries.get(server_id)
+            return entry.users if entry else 0
@@ -0,0 +1,149 @@
+"""Control-plane copies of server jars, pushed to hosts that cannot download them."""
+
+from __future__ import annotations
+
+import re
+import shlex
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from pathlib import Path, PurePosixPath
+
+from remotecraft.errors import RemoteCommandError
+from remotecraft.jobs import Report
+from remotecraft.models import DownloadSpec
+from remotecraft.ssh import RemoteSession
+from remotecraft.versions import VersionCatalog
+
+UPLOAD_TIMEOUT_SECONDS = 600
+# Prints ``cached`` when the host already has a verified copy, else the size of an
+# earlier, interrupted upload to resume from.
+PUSH_CHECK = r"""rc_jar={jar}
+if printf '%s  %s\n' {sha1} "$rc_jar" | sha1sum --check --status 2>/dev/null; then
+  touch -c "$rc_jar"
+  echo cached
+else
+  mkdir -p -m 0750 {cache} && echo "partial=$(stat -c %s "$rc_jar.part" 2>/dev/null || echo 0)"
+fi"""
+PUSH_COMMIT = r"""rc_jar={jar}
+if printf '%s  %s\n' {sha1} "$rc_jar.part" | sha1sum --check --status; then
+  chmod 0444 "$rc_jar.part" && mv -f -- "$rc_jar.part" "$rc_jar"
+else
+  rm -f -- "$rc_jar.part"
+  echo 'Uploaded server.jar failed SHA-1 verification' >&2
+  exit 1
+fi"""
+PARTIAL_PATTERN = re.compile(r"partial=(\d+)")
+
+SessionFactory = Callable[[], AbstractContextManager[RemoteSession]]
+
+
+class JarMirror:
+    """Verified server jars kept under ``directory`` and uploaded to hosts over SFTP.
+
+    Each jar is downloaded from Mojang once, through the catalog, and named by its
+    SHA-1. Uploads land in the host's jar cache as ``<sha1>.jar.part`` and resume from
+    its size after an interruption; the host checks the hash before renaming it to
+    ``<sha1>.jar``, where provisioning picks it up instead of downloading.
+    """
+
+    def __init__(self, directory: Path, catalog: VersionCatalog, *, max_parallel: int = 4) -> None:
+        self.directory = directory
+        self.catalog = catalog
+        self.max_parallel = max_parallel
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, download: DownloadSpec) -> Path:
+        return self.directory / f"{download.sha1}.jar"
+
+    def _lock(self, sha1: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(sha1, threading.Lock())
+
+    def fetch(self, download: DownloadSpec, report: Report | None = None) -> Path:
+        """Return the local copy of a jar, downloading it first if needed."""
+        path = self.path(download)
+        # Concurrent provisions of one version share a single download.
+        with self._lock(download.sha1):
+            if not path.is_file():
+                self.directory.mkdir(parents=True, exist_ok=True)
+                progress = None
+                if report:
+
+                    def progress(done: int) -> None:
+                        report("downloading", done, download.size)
+
+                self.catalog.download_jar(download, path, progress=progress)
+        return path
+
+    def push(
+        self,
+        remote: RemoteSession,
+        download: DownloadSpec,
+        *,
+        cache: str,
+        report: Report | None = None,
+    ) -> bool:
+        """Place a verified jar in the host's cache; return whether anything was sent."""
+        local = self.fetch(download, report)
+        # Concurrent provisions of one version would otherwise write, resume or delete
+        # the same ``.part`` file; the later one finds the jar cached instead.
+        with self._lock(f"{download.sha1}.part"):
+            return self._upload(remote, download, local, cache=cache, report=report)
+
+    def _upload(
+        self,
+        remote: RemoteSession,
+        download: DownloadSpec,
+        local: Path,
+        *,
+        cache: str,
+        report: Report | None = None,
+    ) -> bool:
+        jar = str(PurePosixPath(cache) / f"{download.sha1}.jar")
+        values = {
+            "jar": shlex.quote(jar),
+            "sha1": shlex.quote(download.sha1),
+            "cache": shlex.quote(cache),
+        }
+        state = remote.run(PUSH_CHECK.format(**values)).stdout.strip()
+        if state == "cached":
+            return False
+        partial = PARTIAL_PATTERN.fullmatch(state)
+        if not partial:
+            raise RemoteCommandError("Remote host returned an unexpected cache state")
+        offset = int(partial.group(1))
+        if offset > download.size:
+            offset = 0
+        progress = None
+        if report:
+
+            def progress(sent: int) -> None:
+                report("uploading", sent, download.size)
+
+        remote.put(
+            local, f"{jar}.part", offset=offset, progress=progress, timeout=UPLOAD_TIMEOUT_SECONDS
+        )
+        remote.run(PUSH_COMMIT.format(**values))
+        return True
+
+    def push_all(
+        self, download: DownloadSpec, targets: Sequence[SessionFactory], *, cache: str
+    ) -> list[bool]:
+        """Push one jar to several hosts at once; raise the first failure after all finish."""
+        local = self.fetch(download)
+
+        def push_one(factory: SessionFactory) -> bool:
+            # Each target is another host with its own ``.part`` file, so no lock.
+            with factory() as remote:
+                return self._upload(remote, download, local, cache=cache)
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            futures = [executor.submit(push_one, factory) for factory in targets]
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error:
+                raise error
+        return [future.result() for future in futures]
@@ -6,6 +6,7 @@ from typing import Literal
 from pydantic import BaseModel, ConfigDict, Field
 
 ServerStatus = Literal["offline", "online", "starting", "stopping", "unknown"]
+BulkAction = Literal["start", "stop", "restart", "kill"]
 
 
 class ServerRecord(BaseModel):
@@ -33,9 +34,19 @@ class ServerView(BaseModel):
     ram_gb: int
     status: ServerStatus
     created_at: datetime
+    status_age_seconds: float | None = None
+    shutdown_seconds: float | None = None
+    lock_wait_seconds: float | None = None
 
     @classmethod
-    def from_record(cls, record: ServerRecord, status: ServerStatus | None = None) -> "ServerView":
+    def from_record(
+        cls,
+        record: ServerRecord,
+        status: ServerStatus | None = None,
+        *,
+        status_age_seconds: float | None = None,
+        shutdown_seconds: float | None = None,
+    ) -> "ServerView":
         return cls(
             id=record.id,
             name=record.name,
@@ -43,12 +54,54 @@ class ServerView(BaseModel):
             ram_gb=record.ram_gb,
             status=status or record.status,
             created_at=record.created_at,
+            status_age_seconds=status_age_seconds,
+            shutdown_seconds=shutdown_seconds,
         )
 
 
+class BulkResult(BaseModel):
+    """Outcome of one server's part in a bulk operation."""
+
+    id: str
+    ok: bool
+    server: ServerView | None = None
+    error: str | None = None
+    detail: str | None = None
+    boot_seconds: float | None = None
+
+
 class DownloadSpec(BaseModel):
     """Trusted Mojang download metadata."""
 
     url: str
     sha1: str = Field(pattern=r"^[0-9a-f]{40}$")
     size: int = Field(gt=0)
+
+
+JobState = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobProgress(BaseModel):
+    """Latest progress reported by a running job."""
+
+    model_config = ConfigDict(frozen=True)
+
+    stage: str
+    done: int | None = None
+    total: int | None = None
+
+
+class JobView(BaseModel):
+    """Public representation of a background job."""
+
+    model_config = ConfigDict(frozen=True)
+
+    id: str
+    kind: str
+    state: JobState = "queued"
+    progress: JobProgress = JobProgress(stage="queued")
+    result: ServerView | list[BulkResult] | None = None
+    error: str | None = None
+    error_code: str | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    finished_at: datetime | None = None
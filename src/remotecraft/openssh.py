@@ -0,0 +1,321 @@
+"""Remote sessions through the system OpenSSH client.
+
+Every command is a short-lived ``ssh`` process multiplexed over one ControlMaster
+connection, so key exchange and authentication happen once per idle period and the
+bulk cipher work runs in OpenSSH's native code instead of Paramiko's Python.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import selectors
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+from remotecraft.config import Settings
+from remotecraft.errors import ConfigurationError, RemoteCommandError
+from remotecraft.ssh import (
+    DEFAULT_OUTPUT_LIMIT,
+    READ_SIZE,
+    CommandStream,
+    StreamingSession,
+    StreamName,
+)
+
+
+class ProcessStream(CommandStream):
+    """Reads a local ``ssh`` process's pipes with the same cap and deadline as a channel."""
+
+    def __init__(
+        self,
+        process: subprocess.Popen[bytes],
+        *,
+        timeout: float,
+        max_bytes: int = DEFAULT_OUTPUT_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(max_bytes=max_bytes)
+        self.process = process
+        self.deadline = clock() + timeout
+        self.clock = clock
+
+    def _remaining(self) -> float:
+        remaining = self.deadline - self.clock()
+        if remaining <= 0:
+            self.close()
+            raise RemoteCommandError("Remote command timed out")
+        return remaining
+
+    def _read(self) -> Iterator[tuple[StreamName, bytes]]:
+        pipes: dict[StreamName, object] = {
+            "stdout": self.process.stdout,
+            "stderr": self.process.stderr,
+        }
+        with selectors.DefaultSelector() as selector:
+            for name, pipe in pipes.items():
+                selector.register(pipe, selectors.EVENT_READ, name)
+            while selector.get_map():
+                for key, _events in selector.select(min(self._remaining(), 0.5)):
+                    data = os.read(key.fd, READ_SIZE)
+                    if data:
+                        yield key.data, data
+                    else:
+                        selector.unregister(key.fileobj)
+        try:
+            self.exit_status = self.process.wait(timeout=self._remaining())
+        except subprocess.TimeoutExpired:
+            self.close()
+            raise RemoteCommandError("Remote command timed out") from None
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        for pipe in (self.process.stdout, self.process.stderr):
+            if pipe:
+                pipe.close()
+
+
+class ProcessChannel:
+    """Byte channel over the stdin and stdout of one long-lived ``ssh`` process.
+
+    Like a Paramiko channel with a timeout, ``recv`` raises :class:`TimeoutError` when
+    nothing arrives in time and returns ``b""`` once the remote side has exited.
+    """
+
+    def __init__(self, process: subprocess.Popen[bytes], *, timeout: float) -> None:
+        if process.stdin is None or process.stdout is None:
+            raise ValueError("The process needs piped stdin and stdout")
+        self.process = process
+        self.stdin = process.stdin
+        self.stdout = process.stdout
+        self.timeout = timeout
+
+    def sendall(self, data: bytes) -> None:
+        self.stdin.write(data)
+        self.stdin.flush()
+
+    def recv(self, size: int) -> bytes:
+        ready, _, _ = select.select([self.stdout], [], [], self.timeout)
+        if not ready:
+            raise TimeoutError("Timed out waiting for the remote process")
+        return os.read(self.stdout.fileno(), size)
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.stdin.close()
+        self.stdout.close()
+
+
+class OpenSSHMaster:
+    """Owns one ControlMaster connection and hands out sessions multiplexed over it.
+
+    The master is started on demand and exits by itself after
+    ``ssh_pool_idle_seconds`` without clients. Host keys are never learned: only the
+    configured known_hosts file is trusted and ``BatchMode`` rules out prompts.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        ssh_binary: str = "ssh",
+        sftp_binary: str = "sftp",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if settings.ssh_password:
+            raise ConfigurationError("The OpenSSH backend does not support password authentication")
+        if settings.known_hosts_path and not settings.known_hosts_path.is_file():
+            raise ConfigurationError(
+                f"Known-hosts file does not exist: {settings.known_hosts_path}"
+            )
+        self.settings = settings
+        self.ssh_binary = ssh_binary
+        self.sftp_binary = sftp_binary
+        self.clock = clock
+        # Short, private directory: control socket paths are limited to ~100 bytes.
+        self.control_dir = Path(tempfile.mkdtemp(prefix="rc-ssh-"))
+        self._checked_at: float | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> OpenSSHRemoteSession:
+        return OpenSSHRemoteSession(self)
+
+    def options(self) -> list[str]:
+        """Options shared by ``ssh`` and ``sftp``, which spell port and user differently."""
+        settings = self.settings
+        options = [
+            "-F",
+            "none",
+            "-o",
+            "BatchMode=yes",
+            "-o",
+            "StrictHostKeyChecking=yes",
+            "-o",
+            f"ControlPath={self.control_dir}/%C",
+            "-o",
+            f"ControlPersist={settings.ssh_pool_idle_seconds}",
+            "-o",
+            f"ConnectTimeout={settings.connect_timeout_seconds}",
+            "-o",
+            "ServerAliveInterval=15",
+            "-o",
+            "LogLevel=ERROR",
+            "-o",
+            f"Port={settings.ssh_port}",
+            "-o",
+            f"User={settings.ssh_user}",
+        ]
+        if settings.known_hosts_path:
+            options += ["-o", f'UserKnownHostsFile="{settings.known_hosts_path}"']
+        if settings.ssh_key_path:
+            options += ["-i", str(settings.ssh_key_path), "-o", "IdentitiesOnly=yes"]
+        if not settings.ssh_use_agent:
+            options += ["-o", "IdentityAgent=none"]
+        return options
+
+    def argv(self, *arguments: str) -> list[str]:
+        return [self.ssh_binary, "-T", *self.options(), *arguments]
+
+    def _control(self, *arguments: str) -> subprocess.CompletedProcess[bytes]:
+        # The backgrounded master inherits stderr, so it goes to a file rather than a
+        # pipe that would never reach EOF.
+        with tempfile.TemporaryFile() as errors:
+            completed = subprocess.run(  # noqa: S603 - fixed argv, no shell
+                self.argv(*arguments, "--", self.settings.ssh_host),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=errors,
+                timeout=self.settings.connect_timeout_seconds + 5,
+                check=False,
+            )
+            errors.seek(0)
+            completed.stderr = errors.read()
+        return completed
+
+    def ensure(self) -> None:
+        """Start the master connection unless one was used recently."""
+        with self._lock:
+            now = self.clock()
+            if (
+                self._checked_at is not None
+                and now - self._checked_at < self.settings.ssh_pool_idle_seconds / 2
+            ):
+                self._checked_at = now
+                return
+            try:
+                if self._control("-O", "check").returncode != 0:
+                    started = self._control("-M", "-N", "-f")
+                    if started.returncode != 0:
+                        detail = started.stderr.decode(errors="replace").strip()
+                        raise ConnectionError(detail[:500] or "ssh could not connect")
+            except subprocess.TimeoutExpired as exc:
+                raise ConnectionError("ssh timed out while connecting") from exc
+            self._checked_at = self.clock()
+
+    def popen(self, command: str) -> subprocess.Popen[bytes]:
+        return subprocess.Popen(  # noqa: S603 - fixed argv, the command is one argument
+            self.argv("--", self.settings.ssh_host, command),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def open_channel(self, command: str) -> ProcessChannel:
+        """Run ``command`` over the master with its stdin and stdout as a channel."""
+        self.ensure()
+        process = subprocess.Popen(  # noqa: S603 - fixed argv, the command is one argument
+            self.argv("--", self.settings.ssh_host, command),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return ProcessChannel(process, timeout=self.settings.command_timeout_seconds)
+
+    def upload(self, local_path: Path, remote_path: str, *, resume: bool, timeout: int) -> None:
+        """Copy one file with ``sftp`` over the master connection."""
+        command = "reput" if resume else "put"
+        batch = f"{command} {_sftp_quote(str(local_path))} {_sftp_quote(remote_path)}\n"
+        try:
+            completed = subprocess.run(  # noqa: S603 - fixed argv, paths are quoted for sftp
+                [self.sftp_binary, *self.options(), "-b", "-", self.settings.ssh_host],
+                input=batch.encode(),
+                capture_output=True,
+                timeout=timeout,
+                check=False,
+            )
+        except subprocess.TimeoutExpired as exc:
+            raise RemoteCommandError("SFTP upload timed out") from exc
+        if completed.returncode != 0:
+            detail = completed.stderr.decode(errors="replace").strip()
+            raise RemoteCommandError(detail[:500] or "SFTP upload failed")
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._control("-O", "exit")
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            self._checked_at = None
+            shutil.rmtree(self.control_dir, ignore_errors=True)
+
+
+def _sftp_quote(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+class OpenSSHRemoteSession(StreamingSession):
+    def __init__(self, master: OpenSSHMaster) -> None:
+        self.master = master
+        self.settings = master.settings
+
+    def __enter__(self) -> Self:
+        self.master.ensure()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        return None
+
+    def stream(
+        self, command: str, *, timeout: int | None = None, max_bytes: int = DEFAULT_OUTPUT_LIMIT
+    ) -> CommandStream:
+        return ProcessStream(
+            self.master.popen(command),
+            timeout=timeout or self.settings.command_timeout_seconds,
+            max_bytes=max_bytes,
+        )
+
+    def put(
+        self,
+        local_path: Path,
+        remote_path: str,
+        *,
+        offset: int = 0,
+        progress: Callable[[int], None] | None = None,
+        timeout: int | None = None,
+    ) -> None:
+        # ``reput`` resumes from the remote file's current size, which is ``offset``.
+        self.master.upload(
+            local_path,
+            remote_path,
+            resume=offset > 0,
+            timeout=timeout or self.settings.command_timeout_seconds,
+        )
+        if progress:
+            progress(local_path.stat().st_size)
@@ -0,0 +1,120 @@
+"""Background task that keeps recorded server state in step with the host."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+import anyio
+
+from remotecraft.errors import RemoteCraftError, StoreError
+from remotecraft.models import ServerStatus, ServerView
+from remotecraft.service import MinecraftService
+from remotecraft.shared import FileLock
+from remotecraft.ssh import TRANSPORT_ERRORS
+
+logger = logging.getLogger(__name__)
+
+
+def next_status(recorded: ServerStatus, running: bool) -> ServerStatus:
+    """Derive a server's state from its recorded state and whether its session runs."""
+    if not running:
+        return "offline"
+    # A stopping server keeps its session until Java exits.
+    return "stopping" if recorded == "stopping" else "online"
+
+
+class StatusReconciler:
+    """Polls the host with one status probe and persists real transitions.
+
+    Each pass fetches the running sessions once, then moves ``starting`` servers to
+    ``online``, and ``stopping`` or crashed servers to ``offline``, through
+    :meth:`RecordStore.update`. A pass that overlapped a lifecycle operation is dropped,
+    so it can never overwrite that operation's transition. :meth:`list_servers` answers
+    from the store and the last pass without touching SSH.
+
+    With several worker processes only the one holding ``leader`` polls the host; the
+    others keep trying the lock, so a new leader takes over when that process exits.
+    """
+
+    def __init__(
+        self,
+        service: MinecraftService,
+        *,
+        interval_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        leader: FileLock | None = None,
+    ) -> None:
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self.clock = clock
+        self.leader = leader
+        self._observed: dict[str, tuple[ServerStatus, float]] = {}
+
+    def reconcile(self) -> bool:
+        """Run one pass; return whether its result was applied."""
+        store = self.service.store
+        if not store.list():
+            self._observed = {}
+            return True
+        snapshot = self.service.status.get(max_age=0)
+        with self.service.status.settled(snapshot) as settled:
+            if not settled:
+                return False
+            observed: dict[str, tuple[ServerStatus, float]] = {}
+            for record in store.list():
+                status = next_status(record.status, record.screen_name in snapshot.sessions)
+                if status != record.status:
+                    record = store.update(record.id, status=status)
+                observed[record.id] = (status, snapshot.taken_at)
+            self._observed = observed
+        return True
+
+    def list_servers(self) -> list[ServerView]:
+        now = self.clock()
+        views: list[ServerView] = []
+        for record in self.service.store.list():
+            seen = self._observed.get(record.id)
+            # A status written by a lifecycle operation since the last pass is newer.
+            age = round(now - seen[1], 1) if seen and seen[0] == record.status else None
+            views.append(ServerView.from_record(record, status_age_seconds=age))
+        return views
+
+    async def run(
+        self,
+        limiter: anyio.CapacityLimiter | None = None,
+        *,
+        after_pass: Callable[[bool], Awaitable[None]] | None = None,
+    ) -> None:
+        """Reconcile forever; ``after_pass`` learns whether the host answered."""
+        try:
+            while True:
+                if self.leader is None or self.leader.acquire(blocking=False):
+                    await self._pass(limiter, after_pass)
+                await anyio.sleep(self.interval_seconds)
+        finally:
+            if self.leader:
+                self.leader.release()
+
+    async def _pass(
+        self,
+        limiter: anyio.CapacityLimiter | None,
+        after_pass: Callable[[bool], Awaitable[None]] | None,
+    ) -> None:
+        try:
+            await anyio.to_thread.run_sync(self.reconcile, limiter=limiter)
+            reachable = True
+        except StoreError:
+            # Local metadata failed, which says nothing about the host.
+            logger.exception("Reconciler pass could not use the server metadata")
+            return
+        except (RemoteCraftError, *TRANSPORT_ERRORS):
+            # The recorded state stays and the circuit breaker reports the outage.
+            reachable = False
+        if after_pass:
+            try:
+                await after_pass(reachable)
+            except Exception:
+                # Publishing must not stop the loop; the next pass publishes again.
+                logger.exception("Could not publish the reconciled server state")
@@ -2,43 +2,199 @@
 
 from __future__ import annotations
 
+import contextlib
+import functools
 import re
 import shlex
-import time
 import uuid
-from collections.abc import Callable
-from contextlib import AbstractContextManager
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import PurePosixPath
+from typing import ParamSpec, TypeVar
+
+import anyio
 
 from remotecraft.config import Settings
-from remotecraft.errors import ConflictError, InvalidRequestError, RemoteCommandError
-from remotecraft.models import ServerRecord, ServerStatus, ServerView
-from remotecraft.ssh import ParamikoRemoteSession, RemoteSession
-from remotecraft.store import ServerStore
+from remotecraft.errors import (
+    ConflictError,
+    InvalidRequestError,
+    NotFoundError,
+    RemoteCommandError,
+    RemoteCraftError,
+)
+from remotecraft.helper import RemoteHelper
+from remotecraft.jobs import Report
+from remotecraft.locks import ServerLocks
+from remotecraft.mirror import JarMirror
+from remotecraft.models import BulkAction, BulkResult, ServerRecord, ServerStatus, ServerView
+from remotecraft.shared import SharedState
+from remotecraft.ssh import (
+    TRANSPORT_ERRORS,
+    BatchStep,
+    CommandResult,
+    ParamikoRemoteSession,
+    RemoteSession,
+    check_result,
+)
+from remotecraft.status import StatusCache
+from remotecraft.store import DUPLICATE_NAME, RecordStore
 from remotecraft.versions import VersionCatalog
 
 NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{1,31}$")
 VERSION_PATTERN = re.compile(r"^[0-9A-Za-z][0-9A-Za-z._-]{0,31}$")
 CONTROL_PATTERN = re.compile(r"[\x00-\x1f\x7f]")
+SCREEN_LIST_PATTERN = re.compile(r"^\s*\d+\.(\S+)\s", re.MULTILINE)
+SCREEN_NAME_PATTERN = re.compile(r"rc-[0-9a-f]{12}")
+LOG_OUTPUT_LIMIT = 2 * 1024 * 1024
+REQUIRED_TOOLS = ("java", "screen", "curl", "sha1sum")
+# Prints one ``tool=ok|missing`` line per tool and exits non-zero if any is missing.
+TOOL_PROBE = (
+    f"for tool in {' '.join(REQUIRED_TOOLS)}; do "
+    'if command -v "$tool" >/dev/null 2>&1; then '
+    "printf '%s=ok\\n' \"$tool\"; else printf '%s=missing\\n' \"$tool\"; rc_missing=1; fi; done; "
+    'test -z "${rc_missing:-}"'
+)
+
+JAR_CACHE_DIR = ".jars"
+JAR_CACHE_GRACE_MINUTES = 60
+# Fills ``<cache>/<sha1>.jar`` once, verified with sha1sum, and gives the new server a
+# reflink or hardlink of it. curl runs in the background so the size of the partial
+# file can be reported once a second; a verified cache hit prints ``cached`` instead.
+DOWNLOAD_SCRIPT = r"""rc_jar={cache}/{sha1}.jar
+mkdir -p -m 0750 {cache} || exit
+if printf '%s  %s\n' {sha1} "$rc_jar" | sha1sum --check --status 2>/dev/null; then
+  touch -c "$rc_jar"
+  echo cached
+else
+  rc_part="$rc_jar.part.$$"
+  curl --fail --location --proto '=https' --tlsv1.2 --silent --show-error \
+    --output "$rc_part" {url} &
+  rc_curl=$!
+  while kill -0 "$rc_curl" 2>/dev/null; do
+    printf 'bytes=%s\n' "$(stat -c %s "$rc_part" 2>/dev/null || echo 0)"
+    sleep 1
+  done
+  if ! wait "$rc_curl"; then
+    rm -f -- "$rc_part"
+    exit 1
+  fi
+  if ! printf '%s  %s\n' {sha1} "$rc_part" | sha1sum --check --status; then
+    rm -f -- "$rc_part"
+    echo 'Downloaded server.jar failed SHA-1 verification' >&2
+    exit 1
+  fi
+  chmod 0444 "$rc_part" && mv -f -- "$rc_part" "$rc_jar" || exit
+fi
+cd {path} && {{
+  cp --reflink=always -- "$rc_jar" server.jar 2>/dev/null ||
+    ln -- "$rc_jar" server.jar 2>/dev/null ||
+    cp -- "$rc_jar" server.jar
+}} && printf 'eula=true\n' > eula.txt"""
+# Removes cached jars that no server references, and abandoned partial downloads.
+# Files touched within the grace period are kept so a concurrent provision that has
+# just filled or reused an entry cannot lose it before linking.
+JAR_CACHE_GC = r"""cd {cache} 2>/dev/null || exit 0
+rc_keep=' {keep} '
+find . -maxdepth 1 -type f -name '*.jar*' -mmin +{grace} | while IFS= read -r rc_file; do
+  rc_file=${{rc_file#./}}
+  case "$rc_file" in
+    *.jar) case "$rc_keep" in *" ${{rc_file%.jar}} "*) continue ;; esac ;;
+  esac
+  rm -f -- "$rc_file" && echo "removed=$rc_file"
+done"""
+DOWNLOAD_PROGRESS_PATTERN = re.compile(r"bytes=(\d+)")
+STOP_WAIT_SECONDS = 30
+STOP_TIMED_OUT = 124  # exit status of coreutils ``timeout``
+# Asks one session to stop and blocks on the host until its process exits. Prints
+# ``waited_ms=<n>`` if it was running and exits 124 if it outlives the wait.
+STOP_AND_WAIT = r"""rc_pid=$(screen -ls |
+  sed -n 's/^[[:space:]]*\([0-9][0-9]*\)\.{name}[[:space:]].*/\1/p' | head -n 1)
+[ -n "$rc_pid" ] || exit 0
+rc_started=$(date +%s%N)
+screen -S {screen} -X stuff {payload} || exit
+timeout {seconds} tail --pid="$rc_pid" -s 0.2 -f /dev/null
+rc_status=$?
+printf 'waited_ms=%s\n' "$(( ($(date +%s%N) - rc_started) / 1000000 ))"
+exit "$rc_status"
+"""
+STOP_WAIT_PATTERN = re.compile(r"^waited_ms=(\d+)$", re.MULTILINE)
+BULK_PARALLELISM = 4
+# Channels opened at once for side-by-side probes; sshd allows 10 per connection.
+PROBE_CHANNELS = 8
+BOOT_WAIT_SECONDS = 180
+BOOT_EXITED = 3
+# Blocks on the host until a freshly started server logs ``Done (``. The log must be a
+# new file, with another inode than ``{before}``, so the previous run's line does not
+# count. Prints ``booted_s=<n>``; exits 3 if the session ends and 124 after the wait.
+BOOT_WAIT = r"""rc_log={log}
+rc_waited=0
+while [ "$rc_waited" -lt {seconds} ]; do
+  if [ "$(stat -c %i -- "$rc_log" 2>/dev/null)" != {before} ] &&
+    grep -qF ']: Done (' -- "$rc_log"; then
+    printf 'booted_s=%s\n' "$rc_waited"
+    exit 0
+  fi
+  screen -S {screen} -Q select . >/dev/null 2>&1 || exit 3
+  sleep 1
+  rc_waited=$((rc_waited + 1))
+done
+exit 124"""
+BOOT_WAIT_PATTERN = re.compile(r"^booted_s=(\d+)$", re.MULTILINE)
 
 SessionFactory = Callable[[], AbstractContextManager[RemoteSession]]
 
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+def _server_operation(method: Callable[..., ServerView]) -> Callable[..., ServerView]:
+    """Serialize a lifecycle operation per server and keep overlapping snapshots unused.
+
+    Identical calls, with the same keyword arguments, that overlap share one run. The
+    returned view reports how long the call waited for the server's lock.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: MinecraftService, server_id: str, **kwargs: object) -> ServerView:
+        # Unknown ids fail before they get a lock entry or lock file.
+        self.store.get(server_id)
+
+        def run() -> ServerView:
+            with self.status.changing():
+                return method(self, server_id, **kwargs)
+
+        # A bulk call's shared session does not make it a different request.
+        key = (method.__name__, *sorted(item for item in kwargs.items() if item[0] != "remote"))
+        view, waited = self.locks.run(server_id, key, run)
+        return view.model_copy(update={"lock_wait_seconds": round(waited, 3)})
+
+    return wrapper
+
 
 class MinecraftService:
     def __init__(
         self,
         settings: Settings,
-        store: ServerStore,
+        store: RecordStore,
         catalog: VersionCatalog,
         *,
         session_factory: SessionFactory | None = None,
-        sleeper: Callable[[float], None] = time.sleep,
+        helper: RemoteHelper | None = None,
+        mirror: JarMirror | None = None,
+        shared: SharedState | None = None,
     ) -> None:
         self.settings = settings
         self.store = store
         self.catalog = catalog
         self.session_factory = session_factory or (lambda: ParamikoRemoteSession(settings))
-        self.sleeper = sleeper
+        self.helper = helper
+        self.mirror = mirror
+        self.shared = shared
+        self.status = StatusCache(
+            self._running_sessions, ttl_seconds=settings.status_cache_seconds, shared=shared
+        )
+        self.locks = ServerLocks(settings.data_dir / "locks" if shared else None)
 
     @staticmethod
     def _quote(value: str) -> str:
@@ -64,54 +220,114 @@ class MinecraftService:
         return ram_gb
 
     @staticmethod
-    def _tool_status(remote: RemoteSession) -> dict[str, bool]:
-        command = (
-            "for tool in java screen curl sha1sum; do "
-            'if command -v "$tool" >/dev/null 2>&1; then '
-            "printf '%s=ok\\n' \"$tool\"; else printf '%s=missing\\n' \"$tool\"; fi; done"
-        )
-        output = remote.run(command).stdout
-        return {
+    def _parse_tools(output: str) -> dict[str, bool]:
+        tools = {
             line.split("=", 1)[0]: line.endswith("=ok")
             for line in output.splitlines()
             if "=" in line
         }
+        return {name: tools.get(name, False) for name in REQUIRED_TOOLS}
 
     def check_host(self) -> dict[str, object]:
         with self.session_factory() as remote:
-            tools = self._tool_status(remote)
-        required = {name: tools.get(name, False) for name in ("java", "screen", "curl", "sha1sum")}
-        return {"ready": all(required.values()), "tools": required}
+            tools = self._parse_tools(remote.run(TOOL_PROBE, check=False).stdout)
+        return {"ready": all(tools.values()), "tools": tools}
+
+    @staticmethod
+    def _session_probe(screen_name: str) -> str:
+        return f"screen -S {shlex.quote(screen_name)} -Q select . >/dev/null 2>&1"
+
+    @classmethod
+    def _session_running(cls, remote: RemoteSession, screen_name: str) -> bool:
+        return remote.run(cls._session_probe(screen_name), check=False).exit_status == 0
 
     @staticmethod
-    def _session_running(remote: RemoteSession, screen_name: str) -> bool:
-        command = f"screen -S {shlex.quote(screen_name)} -Q select . >/dev/null 2>&1"
-        return remote.run(command, check=False).exit_status == 0
+    def _stop_and_wait(screen_name: str) -> str:
+        # The name goes unquoted into a sed expression, so only generated names are allowed.
+        if not SCREEN_NAME_PATTERN.fullmatch(screen_name):
+            raise RemoteCommandError("Refusing to stop a session with an invalid screen name")
+        return STOP_AND_WAIT.format(
+            name=screen_name,
+            screen=shlex.quote(screen_name),
+            payload=shlex.quote("stop\n"),
+            seconds=STOP_WAIT_SECONDS,
+        )
+
+    @classmethod
+    def _start_command(cls, record: ServerRecord) -> str:
+        inner = (
+            f"cd {cls._quote(record.path)} && "
+            f"exec java -Xms1G -Xmx{record.ram_gb}G -jar server.jar nogui"
+        )
+        return f"screen -DmS {cls._quote(record.screen_name)} bash -lc {cls._quote(inner)}"
+
+    def _stop_blocking(
+        self, remote: RemoteSession, record: ServerRecord, *then: BatchStep
+    ) -> tuple[float | None, list[CommandResult]]:
+        """Stop and wait in one exec; return the shutdown seconds and later step results."""
+        stopped, *results = remote.run_batch(
+            [BatchStep(self._stop_and_wait(record.screen_name)), *then],
+            timeout=max(self.settings.command_timeout_seconds, STOP_WAIT_SECONDS + 15),
+        )
+        if stopped.exit_status == STOP_TIMED_OUT:
+            raise ConflictError(f"Server did not stop within {STOP_WAIT_SECONDS} seconds")
+        check_result(stopped)
+        waited = STOP_WAIT_PATTERN.search(stopped.stdout)
+        return (int(waited.group(1)) / 1000 if waited else None), results
 
     def list_servers(self) -> list[ServerView]:
         records = self.store.list()
         if not records:
             return []
-        with self.session_factory() as remote:
-            screen_output = remote.run("screen -ls", check=False).stdout
+        snapshot = self.status.get()
+        age = round(self.status.age(snapshot), 1)
         views: list[ServerView] = []
         for record in records:
-            pattern = rf"\d+\.{re.escape(record.screen_name)}\s"
-            status: ServerStatus = "online" if re.search(pattern, screen_output) else "offline"
-            views.append(ServerView.from_record(record, status=status))
+            status: ServerStatus = (
+                "online" if record.screen_name in snapshot.sessions else "offline"
+            )
+            views.append(ServerView.from_record(record, status=status, status_age_seconds=age))
         return views
 
-    def create_server(
+    def get_server(self, server_id: str) -> ServerView:
+        """Return one server's stored metadata without asking the host for its status."""
+        return ServerView.from_record(self.store.get(server_id))
+
+    def _running_sessions(self) -> set[str]:
+        if self.helper:
+            return set(self.helper.call("status-all")["sessions"])
+        with self.session_factory() as remote:
+            screen_output = remote.run("screen -ls", check=False).stdout
+        return set(SCREEN_LIST_PATTERN.findall(screen_output))
+
+    def validate_new_server(
         self, *, name: str, version: str, ram_gb: int, accept_eula: bool
-    ) -> ServerView:
+    ) -> tuple[str, str, int]:
+        """Reject a create request before any remote work is queued for it."""
         if not accept_eula:
             raise InvalidRequestError("You must explicitly accept the Minecraft EULA")
         name = self._validate_name(name)
         version = self._validate_version(version)
         ram_gb = self._validate_ram(ram_gb)
-        if any(record.name.casefold() == name.casefold() for record in self.store.list()):
-            raise ConflictError("A server with this name already exists")
+        if self.store.find_by_name(name):
+            raise ConflictError(DUPLICATE_NAME)
+        return name, version, ram_gb
+
+    def create_server(
+        self,
+        *,
+        name: str,
+        version: str,
+        ram_gb: int,
+        accept_eula: bool,
+        progress: Report | None = None,
+    ) -> ServerView:
+        name, version, ram_gb = self.validate_new_server(
+            name=name, version=version, ram_gb=ram_gb, accept_eula=accept_eula
+        )
+        report: Report = progress or (lambda _stage, _done=None, _total=None: None)
 
+        report("resolving version", None, None)
         download = self.catalog.get_vanilla_download(version)
         server_id = uuid.uuid4().hex
         directory_name = f"{name}-{server_id[:8]}"
@@ -119,98 +335,144 @@ class MinecraftService:
         screen_name = f"rc-{server_id[:12]}"
         quoted_path = self._quote(server_path)
 
+        create_directory = (
+            f"install -d -m 0750 {self._quote(self.settings.servers_root)} && "
+            f"test ! -e {quoted_path} && install -d -m 0750 {quoted_path}"
+        )
+        setup = DOWNLOAD_SCRIPT.format(
+            cache=self._quote(self._jar_cache),
+            path=quoted_path,
+            url=self._quote(download.url),
+            sha1=self._quote(download.sha1),
+        )
+        if self.mirror:
+            # Fetched before a connection is taken, so a slow download holds no session.
+            self.mirror.fetch(download, report)
+        report("checking host", None, None)
         with self.session_factory() as remote:
-            tools = self._tool_status(remote)
-            required_tools = ("java", "screen", "curl", "sha1sum")
-            missing = [tool for tool in required_tools if not tools.get(tool)]
+            probe, *created = remote.run_batch([BatchStep(TOOL_PROBE), BatchStep(create_directory)])
+            tools = self._parse_tools(probe.stdout)
+            missing = [tool for tool, present in tools.items() if not present]
             if missing:
                 raise ConflictError(f"Remote host is missing required tools: {', '.join(missing)}")
+            check_result(probe)
+            check_result(created[0])
 
-            create_directory = (
-                f"install -d -m 0750 {self._quote(self.settings.servers_root)} && "
-                f"test ! -e {quoted_path} && install -d -m 0750 {quoted_path}"
-            )
-            remote.run(create_directory)
+            errors: list[str] = []
             try:
-                setup = (
-                    f"cd {quoted_path} && "
-                    "curl --fail --location --proto '=https' --tlsv1.2 --silent --show-error "
-                    f"--output server.jar {self._quote(download.url)} && "
-                    f"printf '%s  %s\\n' {self._quote(download.sha1)} server.jar "
-                    "| sha1sum --check --status && "
-                    "printf 'eula=true\\n' > eula.txt"
+                if self.mirror:
+                    self.mirror.push(remote, download, cache=self._jar_cache, report=report)
+                else:
+                    report("downloading", 0, download.size)
+                with remote.stream(
+                    setup, timeout=max(self.settings.command_timeout_seconds, 300)
+                ) as output:
+                    for chunk in output.lines():
+                        received = DOWNLOAD_PROGRESS_PATTERN.fullmatch(chunk.text)
+                        if chunk.stream == "stdout" and received:
+                            done = min(int(received.group(1)), download.size)
+                            report("downloading", done, download.size)
+                        elif chunk.stream == "stdout" and chunk.text == "cached":
+                            report("using cached jar", download.size, download.size)
+                        elif chunk.stream == "stderr":
+                            errors.append(chunk.text)
+                status = output.exit_status if output.exit_status is not None else -1
+                check_result(CommandResult("", "\n".join(errors), status))
+                record = ServerRecord(
+                    id=server_id,
+                    name=name,
+                    version=version,
+                    ram_gb=ram_gb,
+                    path=server_path,
+                    screen_name=screen_name,
+                    jar_sha1=download.sha1,
                 )
-                remote.run(setup, timeout=max(self.settings.command_timeout_seconds, 300))
+                # The name is claimed here; a create that lost the race cleans up.
+                self.store.add(record)
             except Exception:
-                remote.run(f"rm -rf -- {quoted_path}", check=False)
+                # Any failure, including SFTP, transport and store errors, leaves a
+                # half-built directory. Removing it is best effort: a dead transport
+                # must not hide the original error.
+                with contextlib.suppress(Exception):
+                    remote.run(f"rm -rf -- {quoted_path}", check=False)
                 raise
-
-        record = ServerRecord(
-            id=server_id,
-            name=name,
-            version=version,
-            ram_gb=ram_gb,
-            path=server_path,
-            screen_name=screen_name,
-            jar_sha1=download.sha1,
-        )
-        self.store.add(record)
         return ServerView.from_record(record)
 
-    def start_server(self, server_id: str) -> ServerView:
+    def _session(self, remote: RemoteSession | None) -> AbstractContextManager[RemoteSession]:
+        """Use ``remote`` when a bulk operation shares one, otherwise open a session."""
+        return nullcontext(remote) if remote else self.session_factory()
+
+    @_server_operation
+    def start_server(self, server_id: str, *, remote: RemoteSession | None = None) -> ServerView:
         record = self.store.get(server_id)
-        with self.session_factory() as remote:
+        if self.helper:
+            started = self.helper.call(
+                "start", screen=record.screen_name, path=record.path, ram_gb=record.ram_gb
+            )["started"]
+            if not started:
+                return ServerView.from_record(record, status="online")
+            return ServerView.from_record(self.store.update(server_id, status="starting"))
+        with self._session(remote) as remote:
             if self._session_running(remote, record.screen_name):
                 return ServerView.from_record(record, status="online")
-            inner = (
-                f"cd {self._quote(record.path)} && "
-                f"exec java -Xms1G -Xmx{record.ram_gb}G -jar server.jar nogui"
-            )
-            command = f"screen -DmS {self._quote(record.screen_name)} bash -lc {self._quote(inner)}"
-            remote.run(command)
+            remote.run(self._start_command(record))
         updated = self.store.update(server_id, status="starting")
         return ServerView.from_record(updated)
 
-    def stop_server(self, server_id: str) -> ServerView:
+    @_server_operation
+    def stop_server(
+        self, server_id: str, *, wait: bool = False, remote: RemoteSession | None = None
+    ) -> ServerView:
+        """Ask the server to stop; with ``wait``, block until it exits on the host."""
         record = self.store.get(server_id)
-        with self.session_factory() as remote:
-            if not self._session_running(remote, record.screen_name):
-                updated = self.store.update(server_id, status="offline")
-                return ServerView.from_record(updated)
-            payload = self._quote("stop\n")
-            remote.run(f"screen -S {self._quote(record.screen_name)} -X stuff {payload}")
+        if wait:
+            with self._session(remote) as remote:
+                seconds, _ = self._stop_blocking(remote, record)
+            updated = self.store.update(server_id, status="offline")
+            return ServerView.from_record(updated, shutdown_seconds=seconds)
+        if self.helper:
+            if not self.helper.call("stop", screen=record.screen_name)["sent"]:
+                return ServerView.from_record(self.store.update(server_id, status="offline"))
+            return ServerView.from_record(self.store.update(server_id, status="stopping"))
+        payload = self._quote("stop\n")
+        with self._session(remote) as remote:
+            probe, *sent = remote.run_batch(
+                [
+                    BatchStep(self._session_probe(record.screen_name)),
+                    BatchStep(f"screen -S {self._quote(record.screen_name)} -X stuff {payload}"),
+                ]
+            )
+        if probe.exit_status != 0:
+            updated = self.store.update(server_id, status="offline")
+            return ServerView.from_record(updated)
+        check_result(sent[0])
         updated = self.store.update(server_id, status="stopping")
         return ServerView.from_record(updated)
 
-    def restart_server(self, server_id: str) -> ServerView:
+    @_server_operation
+    def restart_server(self, server_id: str, *, remote: RemoteSession | None = None) -> ServerView:
         record = self.store.get(server_id)
-        with self.session_factory() as remote:
-            if self._session_running(remote, record.screen_name):
-                stop_payload = self._quote("stop\n")
-                remote.run(f"screen -S {self._quote(record.screen_name)} -X stuff {stop_payload}")
-                for _ in range(30):
-                    if not self._session_running(remote, record.screen_name):
-                        break
-                    self.sleeper(1)
-                else:
-                    raise ConflictError("Server did not stop within 30 seconds")
-            inner = (
-                f"cd {self._quote(record.path)} && "
-                f"exec java -Xms1G -Xmx{record.ram_gb}G -jar server.jar nogui"
-            )
-            remote.run(
-                f"screen -DmS {self._quote(record.screen_name)} bash -lc {self._quote(inner)}"
+        with self._session(remote) as remote:
+            # Stopping, waiting for the old process and starting again take one exec.
+            seconds, started = self._stop_blocking(
+                remote, record, BatchStep(self._start_command(record))
             )
+        check_result(started[0])
         updated = self.store.update(server_id, status="starting")
-        return ServerView.from_record(updated)
+        return ServerView.from_record(updated, shutdown_seconds=seconds)
 
-    def kill_server(self, server_id: str) -> ServerView:
+    @_server_operation
+    def kill_server(self, server_id: str, *, remote: RemoteSession | None = None) -> ServerView:
         record = self.store.get(server_id)
-        with self.session_factory() as remote:
-            remote.run(f"screen -S {self._quote(record.screen_name)} -X quit", check=False)
+        if self.helper:
+            self.helper.call("quit", screen=record.screen_name)
+        else:
+            with self._session(remote) as remote:
+                remote.run(f"screen -S {self._quote(record.screen_name)} -X quit", check=False)
         updated = self.store.update(server_id, status="offline")
         return ServerView.from_record(updated)
 
+    @_server_operation
     def delete_server(self, server_id: str, *, confirm: str) -> ServerView:
         record = self.store.get(server_id)
         if confirm != record.name:
@@ -223,31 +485,265 @@ class MinecraftService:
             if target.parent != expected_parent:
                 raise RemoteCommandError("Refusing to delete a path outside the servers root")
             remote.run(f"rm -rf -- {self._quote(record.path)}")
-        removed = self.store.remove(server_id)
+            removed = self.store.remove(server_id)
+            # The server is gone either way; a failed cleanup is retried on the next delete.
+            self._collect_jar_cache(remote)
         return ServerView.from_record(removed, status="offline")
 
+    def run_bulk(
+        self,
+        action: BulkAction,
+        server_ids: Sequence[str],
+        *,
+        parallel: int = BULK_PARALLELISM,
+        stagger: int | None = None,
+        on_result: Callable[[BulkResult], None] | None = None,
+    ) -> list[BulkResult]:
+        """Apply one lifecycle action to many servers over one shared session.
+
+        At most ``parallel`` servers are handled at once and each gets its own result;
+        one server's failure does not stop the others. With ``stagger``, which only
+        starts accept, at most that many servers boot at once: a slot is held until its
+        server logs that it is done loading, exits, or :data:`BOOT_WAIT_SECONDS` pass.
+        ``on_result`` sees each result, from a worker thread, as soon as it is known.
+        """
+        self.validate_bulk(action, stagger=stagger)
+        operations: dict[BulkAction, Callable[..., ServerView]] = {
+            "start": self.start_server,
+            "stop": self.stop_server,
+            "restart": self.restart_server,
+            "kill": self.kill_server,
+        }
+        ids = list(dict.fromkeys(server_ids))
+        if not ids:
+            return []
+        with self.session_factory() as remote:
+            # Offline servers do not touch their logs, so every inode the boot wait
+            # compares against can be taken up front in one round trip.
+            inodes = self._log_inodes(remote, ids) if stagger else {}
+
+            def attempt(server_id: str) -> BulkResult:
+                try:
+                    if stagger:
+                        return self._start_and_boot(remote, server_id, inodes.get(server_id, ""))
+                    view = operations[action](server_id, remote=remote)
+                except RemoteCraftError as exc:
+                    return BulkResult(id=server_id, ok=False, error=exc.code, detail=str(exc))
+                except TRANSPORT_ERRORS as exc:
+                    # A refused channel, e.g. past sshd's MaxSessions, fails this server only.
+                    return BulkResult(
+                        id=server_id,
+                        ok=False,
+                        error=RemoteCommandError.code,
+                        detail=f"SSH channel failed: {exc}",
+                    )
+                return BulkResult(id=server_id, ok=True, server=view)
+
+            def apply(server_id: str) -> BulkResult:
+                result = attempt(server_id)
+                if on_result:
+                    on_result(result)
+                return result
+
+            workers = min(stagger or parallel, len(ids))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk") as pool:
+                return list(pool.map(apply, ids))
+
+    def validate_bulk(self, action: BulkAction, *, stagger: int | None = None) -> None:
+        """Reject a bulk request before it is queued as a job."""
+        if stagger is not None and action != "start":
+            raise InvalidRequestError("Only starts can be staggered")
+
+    @classmethod
+    def _latest_log(cls, record: ServerRecord) -> str:
+        return cls._quote(str(PurePosixPath(record.path) / "logs" / "latest.log"))
+
+    def _log_inodes(self, remote: RemoteSession, server_ids: Sequence[str]) -> dict[str, str]:
+        logs: dict[str, str] = {}
+        for server_id in server_ids:
+            with contextlib.suppress(NotFoundError):
+                logs[server_id] = self._latest_log(self.store.get(server_id))
+        ids = list(logs)
+        inodes: dict[str, str] = {}
+        for first in range(0, len(ids), PROBE_CHANNELS):
+            chunk = ids[first : first + PROBE_CHANNELS]
+            results = remote.run_many(
+                [f"stat -c %i -- {logs[server_id]} 2>/dev/null" for server_id in chunk],
+                check=False,
+            )
+            inodes.update(
+                (server_id, result.stdout.strip())
+                for server_id, result in zip(chunk, results, strict=True)
+            )
+        return inodes
+
+    def _start_and_boot(self, remote: RemoteSession, server_id: str, before: str) -> BulkResult:
+        record = self.store.get(server_id)
+        log = self._latest_log(record)
+        view = self.start_server(server_id, remote=remote)
+        if view.status != "starting":
+            return BulkResult(id=server_id, ok=True, server=view)  # It was already running.
+        waited = remote.run(
+            BOOT_WAIT.format(
+                log=log,
+                before=self._quote(before),
+                screen=self._quote(record.screen_name),
+                seconds=BOOT_WAIT_SECONDS,
+            ),
+            check=False,
+            timeout=max(self.settings.command_timeout_seconds, BOOT_WAIT_SECONDS + 15),
+        )
+        if waited.exit_status == BOOT_EXITED:
+            return BulkResult(
+                id=server_id,
+                ok=False,
+                server=view,
+                error=ConflictError.code,
+                detail="Server exited while starting",
+            )
+        booted = BOOT_WAIT_PATTERN.search(waited.stdout)
+        if booted is None:
+            detail = f"Server did not finish starting within {BOOT_WAIT_SECONDS} seconds"
+            return BulkResult(id=server_id, ok=True, server=view, detail=detail)
+        return BulkResult(id=server_id, ok=True, server=view, boot_seconds=float(booted.group(1)))
+
+    @property
+    def _jar_cache(self) -> str:
+        return str(PurePosixPath(self.settings.servers_root) / JAR_CACHE_DIR)
+
+    def _collect_jar_cache(self, remote: RemoteSession) -> list[str]:
+        keep = sorted({record.jar_sha1 for record in self.store.list()})
+        result = remote.run(
+            JAR_CACHE_GC.format(
+                cache=self._quote(self._jar_cache),
+                keep=" ".join(keep),
+                grace=JAR_CACHE_GRACE_MINUTES,
+            ),
+            check=False,
+        )
+        return [line[8:] for line in result.stdout.splitlines() if line.startswith("removed=")]
+
+    def collect_jar_cache(self) -> list[str]:
+        """Delete cached server jars that no recorded server uses; return their names."""
+        with self.session_factory() as remote:
+            return self._collect_jar_cache(remote)
+
     def send_command(self, server_id: str, command: str) -> dict[str, str]:
         record = self.store.get(server_id)
         command = command.strip()
         if not command or len(command) > 512 or CONTROL_PATTERN.search(command):
             raise InvalidRequestError("Command must be 1-512 printable characters")
-        with self.session_factory() as remote:
-            if not self._session_running(remote, record.screen_name):
+        if self.helper:
+            if not self.helper.call("stuff", screen=record.screen_name, text=command)["sent"]:
                 raise ConflictError("Server is offline")
-            payload = self._quote(command + "\n")
-            remote.run(f"screen -S {self._quote(record.screen_name)} -X stuff {payload}")
+            return {"status": "sent"}
+        payload = self._quote(command + "\n")
+        with self.session_factory() as remote:
+            probe, *sent = remote.run_batch(
+                [
+                    BatchStep(self._session_probe(record.screen_name)),
+                    BatchStep(f"screen -S {self._quote(record.screen_name)} -X stuff {payload}"),
+                ]
+            )
+        if probe.exit_status != 0:
+            raise ConflictError("Server is offline")
+        check_result(sent[0])
         return {"status": "sent"}
 
     def get_logs(self, server_id: str, lines: int = 100) -> dict[str, object]:
         record = self.store.get(server_id)
         if not 1 <= lines <= 500:
             raise InvalidRequestError("Log line count must be between 1 and 500")
+        if self.helper:
+            return dict(self.helper.call("tail", path=record.path, lines=lines))
         log_path = str(PurePosixPath(record.path) / "logs" / "latest.log")
-        with self.session_factory() as remote:
-            result = remote.run(
-                f"test -f {self._quote(log_path)} && tail -n {lines} -- {self._quote(log_path)}",
-                check=False,
-            )
-        if result.exit_status != 0:
+        command = f"test -f {self._quote(log_path)} && tail -n {lines} -- {self._quote(log_path)}"
+        with (
+            self.session_factory() as remote,
+            remote.stream(command, max_bytes=LOG_OUTPUT_LIMIT) as output,
+        ):
+            log_lines = [chunk.text for chunk in output.lines() if chunk.stream == "stdout"]
+        if output.exit_status != 0:
             return {"lines": [], "available": False}
-        return {"lines": result.stdout.splitlines(), "available": True}
+        return {"lines": log_lines, "available": True}
+
+
+class AsyncMinecraftService:
+    """Awaitable facade over :class:`MinecraftService` for the event loop.
+
+    Blocking SSH work runs on worker threads gated by a dedicated limiter sized to the
+    SSH connection pool, so concurrency is bounded by sockets and routes that never
+    touch SSH, such as health checks, are not queued behind slow remote commands.
+    """
+
+    def __init__(self, service: MinecraftService, *, concurrency: int) -> None:
+        self.service = service
+        self.catalog = service.catalog
+        self.limiter = anyio.CapacityLimiter(concurrency)
+
+    async def _call(self, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+        return await anyio.to_thread.run_sync(
+            functools.partial(func, *args, **kwargs), limiter=self.limiter
+        )
+
+    async def _call_local(self, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+        # Catalog and store work uses anyio's default limiter, not an SSH slot.
+        return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs))
+
+    async def check_host(self) -> dict[str, object]:
+        return await self._call(self.service.check_host)
+
+    async def list_releases(self, limit: int) -> list[str]:
+        return await self._call_local(self.catalog.list_releases, limit)
+
+    async def list_servers(self) -> list[ServerView]:
+        return await self._call(self.service.list_servers)
+
+    async def get_server(self, server_id: str) -> ServerView:
+        return await self._call_local(self.service.get_server, server_id)
+
+    async def validate_new_server(
+        self, *, name: str, version: str, ram_gb: int, accept_eula: bool
+    ) -> tuple[str, str, int]:
+        return await self._call_local(
+            self.service.validate_new_server,
+            name=name,
+            version=version,
+            ram_gb=ram_gb,
+            accept_eula=accept_eula,
+        )
+
+    async def create_server(
+        self, *, name: str, version: str, ram_gb: int, accept_eula: bool
+    ) -> ServerView:
+        return await self._call(
+            self.service.create_server,
+            name=name,
+            version=version,
+            ram_gb=ram_gb,
+            accept_eula=accept_eula,
+        )
+
+    async def start_server(self, server_id: str) -> ServerView:
+        return await self._call(self.service.start_server, server_id)
+
+    async def stop_server(self, server_id: str, *, wait: bool = False) -> ServerView:
+        return await self._call(self.service.stop_server, server_id, wait=wait)
+
+    async def restart_server(self, server_id: str) -> ServerView:
+        return await self._call(self.service.restart_server, server_id)
+
+    async def kill_server(self, server_id: str) -> ServerView:
+        return await self._call(self.service.kill_server, server_id)
+
+    async def delete_server(self, server_id: str, *, confirm: str) -> ServerView:
+        return await self._call(self.service.delete_server, server_id, confirm=confirm)
+
+    async def collect_jar_cache(self) -> list[str]:
+        return await self._call(self.service.collect_jar_cache)
+
+    async def send_command(self, server_id: str, command: str) -> dict[str, str]:
+        return await self._call(self.service.send_command, server_id, command)
+
+    async def get_logs(self, server_id: str, lines: int = 100) -> dict[str, object]:
+        return await self._call(self.service.get_logs, server_id, lines)
@@ -0,0 +1,222 @@
+"""State shared by every worker process of one installation.
+
+Running ``REMOTECRAFT_WORKERS`` uvicorn processes against one data directory needs
+three things per-process memory cannot give: advisory file locks, one status snapshot
+and job table, and a relay for dashboard events. All of it lives on the local disk
+next to the server metadata, so every worker must run on the same machine.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from remotecraft.errors import StoreError
+from remotecraft.models import JobView
+
+EVENT_RETENTION_SECONDS = 60
+
+
+class FileLock:
+    """An ``flock`` advisory lock on ``path``, released when its process exits.
+
+    Locks belong to one open file, so two instances in the same process exclude each
+    other just as two processes do. One instance must not be shared between threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fd: int | None = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, *, shared: bool = False, blocking: bool = True) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            fcntl.flock(fd, operation if blocking else operation | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.release()
+
+
+class SharedState:
+    """The status snapshot, job table and event log that all workers read and write.
+
+    The snapshot carries a generation that every lifecycle operation, in any worker,
+    bumps on entry and exit; a snapshot is only trusted while its generation is
+    current. Operations also hold a shared lock on ``operations.lock`` for their
+    duration, so :meth:`quiescent` can tell when no worker is changing a server.
+    """
+
+    def __init__(self, data_dir: Path, *, clock: Callable[[], float] = time.monotonic) -> None:
+        # CLOCK_MONOTONIC is system-wide on Linux, so timestamps compare across workers.
+        self.clock = clock
+        self.data_dir = data_dir
+        self.origin = uuid.uuid4().hex
+        self._operations_path = data_dir / "operations.lock"
+        self._lock = threading.Lock()
+        self._appended = 0
+        data_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            self._connection = sqlite3.connect(
+                data_dir / "state.sqlite3",
+                timeout=10,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in (
+                "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)",
+                """CREATE TABLE IF NOT EXISTS status (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    sessions TEXT NOT NULL,
+                    taken_at REAL NOT NULL,
+                    generation INTEGER NOT NULL
+                )""",
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    job TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )""",
+                """CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    origin TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )""",
+                "INSERT OR IGNORE INTO counters (name, value) VALUES ('generation', 0)",
+            ):
+                self._connection.execute(statement)
+        except sqlite3.Error as exc:
+            raise StoreError("Could not open the shared state database") from exc
+
+    def _execute(self, query: str, *parameters: object) -> list[tuple[Any, ...]]:
+        try:
+            with self._lock:
+                return self._connection.execute(query, parameters).fetchall()
+        except sqlite3.Error as exc:
+            raise StoreError("Could not access the shared state database") from exc
+
+    # Status snapshot
+
+    def generation(self) -> int:
+        return self._execute("SELECT value FROM counters WHERE name = 'generation'")[0][0]
+
+    def bump_generation(self) -> None:
+        self._execute("UPDATE counters SET value = value + 1 WHERE name = 'generation'")
+
+    def snapshot(self) -> tuple[frozenset[str], float, int] | None:
+        rows = self._execute("SELECT sessions, taken_at, generation FROM status WHERE id = 1")
+        if not rows:
+            return None
+        sessions, taken_at, generation = rows[0]
+        return frozenset(json.loads(sessions)), taken_at, generation
+
+    def publish_snapshot(self, sessions: frozenset[str], taken_at: float, generation: int) -> None:
+        """Store a snapshot unless a lifecycle operation has started since it was taken."""
+        self._execute(
+            """INSERT INTO status (id, sessions, taken_at, generation)
+            SELECT 1, ?, ?, value FROM counters WHERE name = 'generation' AND value = ?
+            ON CONFLICT (id) DO UPDATE SET
+                sessions = excluded.sessions,
+                taken_at = excluded.taken_at,
+                generation = excluded.generation""",
+            json.dumps(sorted(sessions)),
+            taken_at,
+            generation,
+        )
+
+    @contextmanager
+    def operation(self) -> Iterator[None]:
+        """Hold the shared operations lock while a lifecycle operation runs."""
+        lock = FileLock(self._operations_path)
+        lock.acquire(shared=True)
+        try:
+            yield
+        finally:
+            lock.release()
+
+    @contextmanager
+    def quiescent(self) -> Iterator[bool]:
+        """Yield whether no operation runs in any worker; none can start meanwhile."""
+        lock = FileLock(self._operations_path)
+        try:
+            yield lock.acquire(blocking=False)
+        finally:
+            lock.release()
+
+    # Jobs
+
+    def save_job(self, job: JobView) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO jobs (id, job, updated_at) VALUES (?, ?, ?)",
+            job.id,
+            job.model_dump_json(),
+            self.clock(),
+        )
+
+    def load_job(self, job_id: str) -> JobView | None:
+        rows = self._execute("SELECT job FROM jobs WHERE id = ?", job_id)
+        return JobView.model_validate_json(rows[0][0]) if rows else None
+
+    # Events
+
+    def append_event(self, event: dict[str, Any]) -> None:
+        now = self.clock()
+        self._execute(
+            "INSERT INTO events (origin, event, created_at) VALUES (?, ?, ?)",
+            self.origin,
+            json.dumps(event, separators=(",", ":")),
+            now,
+        )
+        self._appended += 1
+        if self._appended % 100 == 0:
+            self._execute("DELETE FROM events WHERE created_at < ?", now - EVENT_RETENTION_SECONDS)
+
+    def last_event(self) -> int:
+        return self._execute("SELECT COALESCE(MAX(seq), 0) FROM events")[0][0]
+
+    def events_since(self, seq: int) -> list[tuple[int, dict[str, Any]]]:
+        """Events other instances appended after ``seq``, oldest first."""
+        rows = self._execute(
+            "SELECT seq, event FROM events WHERE seq > ? AND origin != ? ORDER BY seq",
+            seq,
+            self.origin,
+        )
+        return [(number, json.loads(event)) for number, event in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
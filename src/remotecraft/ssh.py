@@ -2,15 +2,33 @@
 
 from __future__ import annotations
 
+import base64
+import binascii
+import codecs
+import select
+import shlex
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass
+from pathlib import Path
 from types import TracebackType
-from typing import Protocol, Self
+from typing import Literal, Protocol, Self
 
 import paramiko
 
 from remotecraft.config import Settings
 from remotecraft.errors import ConfigurationError, RemoteCommandError
 
+# Failures that mean the transport itself is gone rather than the command failing.
+TRANSPORT_ERRORS = (paramiko.SSHException, EOFError, OSError)
+DEFAULT_OUTPUT_LIMIT = 16 * 1024 * 1024
+READ_SIZE = 32 * 1024
+
+StreamName = Literal["stdout", "stderr"]
+
 
 @dataclass(frozen=True, slots=True)
 class CommandResult:
@@ -19,45 +37,536 @@ class CommandResult:
     exit_status: int
 
 
+def check_result(result: CommandResult) -> CommandResult:
+    if result.exit_status != 0:
+        detail = result.stderr.strip() or result.stdout.strip() or "remote command failed"
+        raise RemoteCommandError(detail[:500])
+    return result
+
+
+@dataclass(frozen=True, slots=True)
+class BatchStep:
+    """One command in a batch; later steps only run if a ``required`` step succeeds."""
+
+    command: str
+    required: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class OutputChunk:
+    stream: StreamName
+    text: str
+
+
+class CommandStream(ABC):
+    """Incremental, size-capped reader for one running remote command.
+
+    Output is only pulled from the transport when the consumer asks for more, so a
+    slow consumer holds the SSH window closed instead of buffering without bound.
+    ``exit_status`` is set once iteration finishes.
+    """
+
+    def __init__(self, *, max_bytes: int = DEFAULT_OUTPUT_LIMIT) -> None:
+        self.max_bytes = max_bytes
+        self.exit_status: int | None = None
+        self._received = 0
+
+    @abstractmethod
+    def _read(self) -> Iterator[tuple[StreamName, bytes]]:
+        """Yield raw output frames and set ``exit_status`` once the command ends."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stop the command and release its channel."""
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[OutputChunk]:
+        decoders = {
+            name: codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for name in ("stdout", "stderr")
+        }
+        for name, data in self._read():
+            self._received += len(data)
+            if self._received > self.max_bytes:
+                self.close()
+                raise RemoteCommandError(f"Remote output exceeded {self.max_bytes} bytes")
+            text = decoders[name].decode(data)
+            if text:
+                yield OutputChunk(name, text)
+        for name, decoder in decoders.items():
+            text = decoder.decode(b"", final=True)
+            if text:
+                yield OutputChunk(name, text)  # type: ignore[arg-type]
+
+    def lines(self) -> Iterator[OutputChunk]:
+        """Yield complete lines without their terminators, per output stream."""
+        pending: dict[StreamName, str] = {"stdout": "", "stderr": ""}
+        for chunk in self:
+            *complete, pending[chunk.stream] = (pending[chunk.stream] + chunk.text).split("\n")
+            for line in complete:
+                yield OutputChunk(chunk.stream, line)
+        for name, rest in pending.items():
+            if rest:
+                yield OutputChunk(name, rest)
+
+    def result(self, *, check: bool = True) -> CommandResult:
+        parts: dict[StreamName, list[str]] = {"stdout": [], "stderr": []}
+        for chunk in self:
+            parts[chunk.stream].append(chunk.text)
+        result = CommandResult(
+            stdout="".join(parts["stdout"]),
+            stderr="".join(parts["stderr"]),
+            exit_status=self.exit_status if self.exit_status is not None else -1,
+        )
+        return check_result(result) if check else result
+
+
+class ChannelStream(CommandStream):
+    def __init__(
+        self,
+        channel: paramiko.Channel,
+        *,
+        timeout: float,
+        max_bytes: int = DEFAULT_OUTPUT_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(max_bytes=max_bytes)
+        self.channel = channel
+        self.deadline = clock() + timeout
+        self.clock = clock
+
+    def _read(self) -> Iterator[tuple[StreamName, bytes]]:
+        # Both buffers are drained as data arrives so a chatty stderr can never fill
+        # its window while we block on stdout, or the reverse.
+        channel = self.channel
+        while True:
+            if channel.recv_ready():
+                yield "stdout", channel.recv(READ_SIZE)
+            elif channel.recv_stderr_ready():
+                yield "stderr", channel.recv_stderr(READ_SIZE)
+            elif channel.eof_received or channel.closed:
+                # The exit status can arrive before the last data frames, so it is only
+                # taken once the server has sent EOF. EOF closes both buffers, so these
+                # reads return b"" instead of blocking once they are empty.
+                while data := channel.recv(READ_SIZE):
+                    yield "stdout", data
+                while data := channel.recv_stderr(READ_SIZE):
+                    yield "stderr", data
+                while not channel.exit_status_ready():
+                    self._wait()
+                self.exit_status = channel.recv_exit_status()
+                return
+            else:
+                self._wait()
+
+    def _wait(self) -> None:
+        remaining = self.deadline - self.clock()
+        if remaining <= 0:
+            self.close()
+            raise RemoteCommandError("Remote command timed out")
+        select.select([self.channel], [], [], min(remaining, 0.5))
+
+    def close(self) -> None:
+        self.channel.close()
+
+
 class RemoteSession(Protocol):
     def run(self, command: str, *, check: bool = True, timeout: int | None = None) -> CommandResult:
         """Execute one command on the configured host."""
 
+    def run_many(
+        self, commands: Sequence[str], *, check: bool = True, timeout: int | None = None
+    ) -> list[CommandResult]:
+        """Execute independent commands concurrently and return results in order."""
+
+    def stream(
+        self, command: str, *, timeout: int | None = None, max_bytes: int = DEFAULT_OUTPUT_LIMIT
+    ) -> CommandStream:
+        """Start one command and read its output incrementally."""
+
+    def run_batch(
+        self, steps: Sequence[BatchStep], *, timeout: int | None = None
+    ) -> list[CommandResult]:
+        """Run steps in order in one remote shell and return results for the steps that ran."""
+
+    def put(
+        self,
+        local_path: Path,
+        remote_path: str,
+        *,
+        offset: int = 0,
+        progress: Callable[[int], None] | None = None,
+        timeout: int | None = None,
+    ) -> None:
+        """Upload a file over SFTP, continuing after the first ``offset`` bytes."""
+
+
+def compose_batch(steps: Sequence[BatchStep], marker: str) -> str:
+    """Build one script that runs every step in a subshell and frames its results.
+
+    Each step's stdout and stderr are captured to files and emitted base64-encoded on
+    a single ``<marker> <index> <status> <stdout> <stderr>`` line, so arbitrary output
+    can never be confused with a frame.
+    """
+    lines = [
+        "rc_batch=$(mktemp -d) || exit 1",
+        """trap 'rm -rf -- "$rc_batch"' EXIT""",
+    ]
+    for index, step in enumerate(steps):
+        lines += [
+            f'( {step.command}\n) >"$rc_batch/out" 2>"$rc_batch/err" </dev/null',
+            "rc_status=$?",
+            f"printf '%s %s %s %s %s\\n' {shlex.quote(marker)} {index} \"$rc_status\" "
+            '"$(base64 -w0 <"$rc_batch/out")" "$(base64 -w0 <"$rc_batch/err")"',
+        ]
+        if step.required:
+            lines.append('[ "$rc_status" -eq 0 ] || exit 0')
+    return "\n".join(lines)
+
+
+def parse_batch(output: str, marker: str, count: int) -> list[CommandResult]:
+    results: list[CommandResult] = []
+    for line in output.splitlines():
+        fields = line.split(" ")
+        if fields[0] != marker:
+            continue
+        try:
+            _marker, index, status, stdout, stderr = fields
+            if int(index) != len(results) or len(results) >= count:
+                raise ValueError(index)
+            results.append(
+                CommandResult(
+                    stdout=base64.b64decode(stdout).decode("utf-8", errors="replace"),
+                    stderr=base64.b64decode(stderr).decode("utf-8", errors="replace"),
+                    exit_status=int(status),
+                )
+            )
+        except (ValueError, binascii.Error) as exc:
+            raise RemoteCommandError("Remote batch returned malformed output") from exc
+    return results
+
+
+def execute_batch(
+    session: RemoteSession, steps: Sequence[BatchStep], *, timeout: int | None = None
+) -> list[CommandResult]:
+    """Run a batch through ``session.run`` as one exec and demultiplex the results."""
+    if not steps:
+        return []
+    marker = f"rc-batch-{uuid.uuid4().hex}"
+    script = compose_batch(steps, marker)
+    result = session.run(f"sh -c {shlex.quote(script)}", check=False, timeout=timeout)
+    results = parse_batch(result.stdout, marker, len(steps))
+    if result.exit_status != 0 or not results:
+        check_result(CommandResult("", result.stderr, result.exit_status or 1))
+    return results
+
+
+class KnownHostsCache:
+    """Parsed known_hosts files shared by every connection.
+
+    A file is re-parsed only when its mtime, size or inode changes, so connecting no
+    longer reads and parses potentially large files each time.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Path, tuple[tuple[int, int, int], paramiko.HostKeys]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: Path, *, required: bool = False) -> paramiko.HostKeys:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            if required:
+                raise ConfigurationError(f"Known-hosts file does not exist: {path}") from None
+            return paramiko.HostKeys()
+        if required and not path.is_file():
+            raise ConfigurationError(f"Known-hosts file does not exist: {path}")
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached and cached[0] == signature:
+                return cached[1]
+        keys = paramiko.HostKeys(str(path))
+        with self._lock:
+            self._entries[path] = (signature, keys)
+        return keys
+
+
+HOST_KEYS = KnownHostsCache()
+SYSTEM_KNOWN_HOSTS = Path("~/.ssh/known_hosts")
+
+
+def connect_client(
+    settings: Settings, *, host_keys: KnownHostsCache = HOST_KEYS
+) -> paramiko.SSHClient:
+    """Open an authenticated client that only trusts known host keys."""
+    client = paramiko.SSHClient()
+    # Paramiko has no public setter for preloaded key sets. They are shared read-only:
+    # RejectPolicy never adds keys and nothing here calls save_host_keys.
+    client._system_host_keys = host_keys.load(SYSTEM_KNOWN_HOSTS.expanduser())
+    if settings.known_hosts_path:
+        client._host_keys = host_keys.load(settings.known_hosts_path, required=True)
+    client.set_missing_host_key_policy(paramiko.RejectPolicy())
+    try:
+        client.connect(
+            hostname=settings.ssh_host,
+            port=settings.ssh_port,
+            username=settings.ssh_user,
+            password=settings.ssh_password,
+            key_filename=str(settings.ssh_key_path) if settings.ssh_key_path else None,
+            allow_agent=settings.ssh_use_agent,
+            look_for_keys=settings.ssh_use_agent,
+            timeout=settings.connect_timeout_seconds,
+            banner_timeout=settings.connect_timeout_seconds,
+            auth_timeout=settings.connect_timeout_seconds,
+        )
+    except Exception:
+        client.close()
+        raise
+    return client
+
+
+def client_is_active(client: paramiko.SSHClient) -> bool:
+    transport = client.get_transport()
+    return transport is not None and transport.is_active()
+
+
+class StreamingSession(ABC):
+    """``run``, ``run_many`` and ``run_batch`` for any session that implements ``stream``."""
 
-class ParamikoRemoteSession:
+    @abstractmethod
+    def stream(
+        self, command: str, *, timeout: int | None = None, max_bytes: int = DEFAULT_OUTPUT_LIMIT
+    ) -> CommandStream:
+        """Start ``command`` and return a reader for its output."""
+
+    def run(self, command: str, *, check: bool = True, timeout: int | None = None) -> CommandResult:
+        with self.stream(command, timeout=timeout) as output:
+            return output.result(check=check)
+
+    def run_many(
+        self, commands: Sequence[str], *, check: bool = True, timeout: int | None = None
+    ) -> list[CommandResult]:
+        # Every command is started before any is read, so they run side by side and
+        # the batch takes roughly as long as its slowest member.
+        streams: list[CommandStream] = []
+        try:
+            for command in commands:
+                streams.append(self.stream(command, timeout=timeout))
+            results = [output.result(check=False) for output in streams]
+        finally:
+            for output in streams:
+                output.close()
+        if check:
+            for result in results:
+                check_result(result)
+        return results
+
+    def run_batch(
+        self, steps: Sequence[BatchStep], *, timeout: int | None = None
+    ) -> list[CommandResult]:
+        return execute_batch(self, steps, timeout=timeout)
+
+    @abstractmethod
+    def put(
+        self,
+        local_path: Path,
+        remote_path: str,
+        *,
+        offset: int = 0,
+        progress: Callable[[int], None] | None = None,
+        timeout: int | None = None,
+    ) -> None:
+        """Upload ``local_path`` to ``remote_path``, resuming at ``offset``."""
+
+
+class _ClientSession(StreamingSession):
+    """Command execution shared by every session that owns a connected client."""
+
+    settings: Settings
+    client: paramiko.SSHClient | None
+
+    def _exec(self, command: str, timeout: int) -> paramiko.Channel:
+        if not self.client:
+            raise RemoteCommandError("SSH session is not connected")
+        _stdin, stdout, _stderr = self.client.exec_command(command, timeout=timeout)
+        return stdout.channel
+
+    def stream(
+        self, command: str, *, timeout: int | None = None, max_bytes: int = DEFAULT_OUTPUT_LIMIT
+    ) -> CommandStream:
+        command_timeout = timeout or self.settings.command_timeout_seconds
+        channel = self._exec(command, command_timeout)
+        return ChannelStream(channel, timeout=command_timeout, max_bytes=max_bytes)
+
+    def put(
+        self,
+        local_path: Path,
+        remote_path: str,
+        *,
+        offset: int = 0,
+        progress: Callable[[int], None] | None = None,
+        timeout: int | None = None,
+    ) -> None:
+        if not self.client:
+            raise RemoteCommandError("SSH session is not connected")
+        with self.client.open_sftp() as sftp:
+            sftp.get_channel().settimeout(timeout or self.settings.command_timeout_seconds)
+            # ``r+`` rather than append: not every SFTP server honours the append flag.
+            with (
+                local_path.open("rb") as source,
+                sftp.open(remote_path, "r+b" if offset else "wb") as target,
+            ):
+                source.seek(offset)
+                target.seek(offset)
+                target.set_pipelined(True)
+                sent = offset
+                while chunk := source.read(READ_SIZE):
+                    target.write(chunk)
+                    sent += len(chunk)
+                    if progress:
+                        progress(sent)
+
+
+class ParamikoRemoteSession(_ClientSession):
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
         self.client: paramiko.SSHClient | None = None
 
     def __enter__(self) -> Self:
-        client = paramiko.SSHClient()
-        client.load_system_host_keys()
-        if self.settings.known_hosts_path:
-            if not self.settings.known_hosts_path.is_file():
-                raise ConfigurationError(
-                    f"Known-hosts file does not exist: {self.settings.known_hosts_path}"
-                )
-            client.load_host_keys(str(self.settings.known_hosts_path))
-        client.set_missing_host_key_policy(paramiko.RejectPolicy())
+        self.client = connect_client(self.settings)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.client:
+            self.client.close()
+            self.client = None
+
+
+class SSHConnectionPool:
+    """Keeps authenticated transports alive and hands out one per session.
+
+    Each command still gets its own exec channel; only the TCP connection, key
+    exchange and authentication are reused. Idle transports are closed after
+    ``max_idle_seconds`` and at most ``max_size`` transports exist at once.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        connect: Callable[[Settings], paramiko.SSHClient] = connect_client,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.settings = settings
+        self.max_size = settings.ssh_pool_size
+        self.max_idle_seconds = settings.ssh_pool_idle_seconds
+        self.connect = connect
+        self.clock = clock
+        self._idle: list[tuple[paramiko.SSHClient, float]] = []
+        self._total = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __call__(self) -> PooledRemoteSession:
+        return PooledRemoteSession(self)
+
+    def _usable(self, client: paramiko.SSHClient, released_at: float) -> bool:
+        return self.clock() - released_at < self.max_idle_seconds and client_is_active(client)
+
+    def _discard(self, client: paramiko.SSHClient) -> None:
+        client.close()
+        with self._condition:
+            self._total -= 1
+            self._condition.notify()
+
+    def acquire(self) -> paramiko.SSHClient:
+        deadline = self.clock() + self.settings.command_timeout_seconds
+        stale: list[paramiko.SSHClient] = []
         try:
-            client.connect(
-                hostname=self.settings.ssh_host,
-                port=self.settings.ssh_port,
-                username=self.settings.ssh_user,
-                password=self.settings.ssh_password,
-                key_filename=(
-                    str(self.settings.ssh_key_path) if self.settings.ssh_key_path else None
-                ),
-                allow_agent=self.settings.ssh_use_agent,
-                look_for_keys=self.settings.ssh_use_agent,
-                timeout=self.settings.connect_timeout_seconds,
-                banner_timeout=self.settings.connect_timeout_seconds,
-                auth_timeout=self.settings.connect_timeout_seconds,
-            )
-        except Exception:
-            client.close()
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RemoteCommandError("SSH connection pool is closed")
+                    while self._idle:
+                        client, released_at = self._idle.pop()
+                        if self._usable(client, released_at):
+                            return client
+                        stale.append(client)
+                        self._total -= 1
+                    if self._total < self.max_size:
+                        self._total += 1
+                        break
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        raise RemoteCommandError("All SSH connections are busy")
+                    self._condition.wait(remaining)
+        finally:
+            for client in stale:
+                client.close()
+        try:
+            return self.connect(self.settings)
+        except BaseException:
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, client: paramiko.SSHClient, *, reusable: bool = True) -> None:
+        with self._condition:
+            if reusable and not self._closed and client_is_active(client):
+                self._idle.append((client, self.clock()))
+                self._condition.notify()
+                return
+        self._discard(client)
+
+    def replace(self, client: paramiko.SSHClient) -> paramiko.SSHClient:
+        """Drop a broken transport and connect a fresh one in its slot."""
+        client.close()
+        try:
+            return self.connect(self.settings)
+        except BaseException:
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
             raise
-        self.client = client
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._condition.notify_all()
+        for client, _released_at in idle:
+            client.close()
+
+
+class PooledRemoteSession(_ClientSession):
+    def __init__(self, pool: SSHConnectionPool) -> None:
+        self.pool = pool
+        self.settings = pool.settings
+        self.client: paramiko.SSHClient | None = None
+        self._broken = False
+        self._reconnecting = threading.Lock()
+
+    def __enter__(self) -> Self:
+        self.client = self.pool.acquire()
+        self._broken = False
         return self
 
     def __exit__(
@@ -67,21 +576,27 @@ class ParamikoRemoteSession:
         traceback: TracebackType | None,
     ) -> None:
         if self.client:
-            self.client.close()
+            reusable = not self._broken and not isinstance(exc_value, TRANSPORT_ERRORS)
+            self.pool.release(self.client, reusable=reusable)
             self.client = None
 
-    def run(self, command: str, *, check: bool = True, timeout: int | None = None) -> CommandResult:
-        if not self.client:
-            raise RemoteCommandError("SSH session is not connected")
-        command_timeout = timeout or self.settings.command_timeout_seconds
-        _stdin, stdout, stderr = self.client.exec_command(command, timeout=command_timeout)
-        exit_status = stdout.channel.recv_exit_status()
-        result = CommandResult(
-            stdout=stdout.read().decode("utf-8", errors="replace"),
-            stderr=stderr.read().decode("utf-8", errors="replace"),
-            exit_status=exit_status,
-        )
-        if check and exit_status != 0:
-            detail = result.stderr.strip() or result.stdout.strip() or "remote command failed"
-            raise RemoteCommandError(detail[:500])
-        return result
+    def _exec(self, command: str, timeout: int) -> paramiko.Channel:
+        client = self.client
+        try:
+            return super()._exec(command, timeout)
+        except TRANSPORT_ERRORS:
+            # A dead transport cannot have started the command, so one retry is safe.
+            if not client or client_is_active(client):
+                raise
+            # Threads sharing this session all see the same dead transport; only the
+            # first replaces it and the rest retry on the fresh client.
+            with self._reconnecting:
+                if self.client is client:
+                    self._broken = True
+                    try:
+                        self.client = self.pool.replace(client)
+                    except BaseException:
+                        self.client = None
+                        raise
+                    self._broken = False
+            return super()._exec(command, timeout)
@@ -0,0 +1,167 @@
+"""Short-lived snapshot of which Screen sessions are running on the managed host."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from typing import TypeGuard
+
+from remotecraft.errors import RemoteCommandError
+from remotecraft.shared import SharedState
+
+
+@dataclass(frozen=True, slots=True)
+class StatusSnapshot:
+    sessions: frozenset[str]
+    taken_at: float
+    generation: int
+
+
+@dataclass(slots=True)
+class _Flight:
+    generation: int
+    done: threading.Event = field(default_factory=threading.Event)
+    snapshot: StatusSnapshot | None = None
+    error: BaseException | None = None
+
+
+class StatusCache:
+    """Caches the host's running sessions for ``ttl_seconds`` with singleflight refreshes.
+
+    A service talks to exactly one host, so one cache per service is keyed on that host.
+    Callers that arrive while a refresh is running wait for it and share its result
+    instead of each running ``screen -ls``. :meth:`invalidate` drops the snapshot after a
+    lifecycle operation; a refresh that was already running is then neither stored nor
+    joined by new callers, because it may predate the change.
+
+    With ``shared`` the snapshot and its generation also live in :class:`SharedState`,
+    so worker processes reuse each other's snapshots and an operation in one worker
+    invalidates the snapshots of all of them.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], set[str]],
+        *,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        shared: SharedState | None = None,
+    ) -> None:
+        self.fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.shared = shared
+        self._snapshot: StatusSnapshot | None = None
+        self._flight: _Flight | None = None
+        self._generation = 0
+        self._changing = 0
+        self._lock = threading.Lock()
+
+    def get(self, *, max_age: float | None = None) -> StatusSnapshot:
+        """Return a snapshot at most ``max_age`` seconds old, by default the TTL."""
+        max_age = self.ttl_seconds if max_age is None else max_age
+        with self._lock:
+            generation = self._current_generation()
+            snapshot = self._snapshot
+            if self.shared and not self._usable(snapshot, generation, max_age):
+                snapshot = self._shared_snapshot()
+            if self._usable(snapshot, generation, max_age):
+                self._snapshot = snapshot
+                return snapshot
+            flight = self._flight
+            if flight and flight.generation != generation:
+                flight = None  # Another worker's operation began after it started.
+            leader = flight is None
+            if flight is None:
+                flight = self._flight = _Flight(generation)
+        if not leader:
+            flight.done.wait()
+            if flight.snapshot is None:
+                raise flight.error or RemoteCommandError("Could not read server status")
+            return flight.snapshot
+        try:
+            sessions = frozenset(self.fetch())
+            flight.snapshot = StatusSnapshot(sessions, self.clock(), flight.generation)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._flight is flight:
+                    self._flight = None
+                if flight.snapshot and flight.generation == self._current_generation():
+                    self._snapshot = flight.snapshot
+                    if self.shared:
+                        snapshot = flight.snapshot
+                        self.shared.publish_snapshot(
+                            snapshot.sessions, snapshot.taken_at, snapshot.generation
+                        )
+            flight.done.set()
+        return flight.snapshot
+
+    def _usable(
+        self, snapshot: StatusSnapshot | None, generation: int, max_age: float
+    ) -> TypeGuard[StatusSnapshot]:
+        return (
+            snapshot is not None
+            and snapshot.generation == generation
+            and self.clock() - snapshot.taken_at < max_age
+        )
+
+    def _current_generation(self) -> int:
+        return self.shared.generation() if self.shared else self._generation
+
+    def _shared_snapshot(self) -> StatusSnapshot | None:
+        stored = self.shared.snapshot() if self.shared else None
+        return StatusSnapshot(*stored) if stored else None
+
+    def age(self, snapshot: StatusSnapshot) -> float:
+        return max(0.0, self.clock() - snapshot.taken_at)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._snapshot = None
+        self._flight = None
+        self._generation += 1
+        if self.shared:
+            self.shared.bump_generation()
+
+    @contextmanager
+    def changing(self) -> Iterator[None]:
+        """Mark a lifecycle operation; snapshots overlapping it are never cached or settled."""
+        with ExitStack() as stack:
+            if self.shared:
+                # Waits while another worker persists a settled snapshot.
+                stack.enter_context(self.shared.operation())
+            with self._lock:
+                self._changing += 1
+                self._invalidate()
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._changing -= 1
+                    self._invalidate()
+
+    @contextmanager
+    def settled(self, snapshot: StatusSnapshot) -> Iterator[bool]:
+        """Yield whether ``snapshot`` still reflects every lifecycle operation.
+
+        While the block runs no operation can begin, so state derived from a settled
+        snapshot can be persisted without racing one. The block must not call
+        :meth:`get`.
+        """
+        with self._lock:
+            if self.shared is None:
+                yield not self._changing and snapshot.generation == self._generation
+                return
+            with self.shared.quiescent() as quiet:
+                yield (
+                    quiet and not self._changing and snapshot.generation == self.shared.generation()
+                )
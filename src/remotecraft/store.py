@@ -1,92 +1,534 @@
-"""Thread-safe JSON persistence for managed server metadata."""
+"""Thread-safe persistence for managed server metadata."""
 
 from __future__ import annotations
 
 import json
 import os
+import sqlite3
 import tempfile
 import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Protocol
 
 from pydantic import ValidationError
 
-from remotecraft.errors import NotFoundError, StoreError
+from remotecraft.errors import ConflictError, NotFoundError, StoreError
 from remotecraft.models import ServerRecord
+from remotecraft.shared import FileLock
+
+DUPLICATE_NAME = "A server with this name already exists"
+
+
+class RecordStore(Protocol):
+    def list(self) -> list[ServerRecord]:
+        """Return every record in creation order."""
+
+    def get(self, server_id: str) -> ServerRecord:
+        """Return one record or raise :class:`NotFoundError`."""
+
+    def find_by_name(self, name: str) -> ServerRecord | None:
+        """Return the record whose name matches ``name`` ignoring case, if any."""
+
+    def add(self, record: ServerRecord) -> ServerRecord:
+        """Insert a record; names are unique ignoring case."""
+
+    def update(self, server_id: str, **changes: object) -> ServerRecord:
+        """Apply validated field changes and return the new record."""
+
+    def remove(self, server_id: str) -> ServerRecord:
+        """Delete a record and return it."""
+
+
+def _changed(record: ServerRecord, changes: dict[str, object]) -> ServerRecord:
+    try:
+        return ServerRecord.model_validate({**record.model_dump(), **changes})
+    except ValidationError as exc:
+        raise StoreError("Invalid server metadata update") from exc
+
+
+def read_json_records(path: Path) -> list[ServerRecord]:
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(raw, list):
+            raise StoreError("Server metadata must contain a JSON array")
+        return [ServerRecord.model_validate(item) for item in raw]
+    except (OSError, json.JSONDecodeError, ValidationError) as exc:
+        raise StoreError("Could not read server metadata") from exc
+
+
+def replace_durably(path: Path, text: str) -> None:
+    """Atomically replace ``path`` so that neither its content nor the rename is lost."""
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, delete=False
+    ) as handle:
+        handle.write(text)
+        handle.flush()
+        os.fsync(handle.fileno())
+        temp_path = Path(handle.name)
+    os.replace(temp_path, path)
+    directory = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def _snapshot(records: Iterable[ServerRecord]) -> str:
+    return (
+        json.dumps([record.model_dump(mode="json") for record in records], indent=2, sort_keys=True)
+        + "\n"
+    )
 
 
 class ServerStore:
+    """Keeps every record in one ``servers.json`` array and a validated copy in memory.
+
+    The file is re-read only when its inode, mtime or size differs from the last read
+    or write, so reads cost one ``stat`` and no parsing. Changes are written through
+    to disk before the in-memory copy moves on. Writers in other processes are excluded
+    by an advisory lock on ``servers.json.lock``, and every change starts from the file
+    as it is once that lock is held, so no process overwrites another's change.
+    """
+
     def __init__(self, data_dir: Path) -> None:
         self.data_dir = data_dir
         self.path = data_dir / "servers.json"
         self._lock = threading.RLock()
+        self._records: dict[str, ServerRecord] = {}
+        self._payloads: dict[str, dict[str, object]] = {}
+        self._names: dict[str, str] = {}
+        self._stamp: tuple[int, int, int] | None = None
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._file_lock = FileLock(data_dir / "servers.json.lock")
+        with self._lock, self._file_lock:
+            if not self.path.exists():
+                self._write({})
+
+    def _file_stamp(self) -> tuple[int, int, int] | None:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load(self, records: dict[str, ServerRecord], stamp: tuple[int, int, int] | None) -> None:
+        self._records = records
+        self._payloads = {
+            server_id: record.model_dump(mode="json") for server_id, record in records.items()
+        }
+        self._names = {record.name.casefold(): server_id for server_id, record in records.items()}
+        self._stamp = stamp
+
+    def _current(self) -> dict[str, ServerRecord]:
+        """Return the records, re-reading the file if another writer replaced it."""
+        stamp = self._file_stamp()
+        if stamp is None or stamp != self._stamp:
+            records = read_json_records(self.path)
+            self._load({record.id: record for record in records}, stamp)
+        return self._records
+
+    def _write(self, records: dict[str, ServerRecord]) -> None:
+        payloads = {
+            server_id: self._payloads.get(server_id) or record.model_dump(mode="json")
+            for server_id, record in records.items()
+        }
+        payload = json.dumps(list(payloads.values()), indent=2, sort_keys=True)
+        try:
+            replace_durably(self.path, payload + "\n")
+        except OSError as exc:
+            raise StoreError("Could not write server metadata") from exc
+        self._load(records, self._file_stamp())
+
+    def list(self) -> list[ServerRecord]:
+        with self._lock:
+            return list(self._current().values())
+
+    def get(self, server_id: str) -> ServerRecord:
+        with self._lock:
+            record = self._current().get(server_id)
+        if record is None:
+            raise NotFoundError("Server not found")
+        return record
+
+    def find_by_name(self, name: str) -> ServerRecord | None:
+        with self._lock:
+            records = self._current()
+            server_id = self._names.get(name.casefold())
+            return records[server_id] if server_id else None
+
+    def add(self, record: ServerRecord) -> ServerRecord:
+        with self._lock, self._file_lock:
+            records = self._current()
+            if record.id in records:
+                raise StoreError("Duplicate server identifier")
+            if record.name.casefold() in self._names:
+                raise ConflictError(DUPLICATE_NAME)
+            self._write({**records, record.id: record})
+        return record
+
+    def update(self, server_id: str, **changes: object) -> ServerRecord:
+        with self._lock, self._file_lock:
+            records = self._current()
+            if server_id not in records:
+                raise NotFoundError("Server not found")
+            updated = _changed(records[server_id], changes)
+            owner = self._names.get(updated.name.casefold(), server_id)
+            if owner != server_id:
+                raise ConflictError(DUPLICATE_NAME)
+            self._payloads.pop(server_id)
+            self._write({**records, server_id: updated})
+        return updated
+
+    def remove(self, server_id: str) -> ServerRecord:
+        with self._lock, self._file_lock:
+            records = dict(self._current())
+            removed = records.pop(server_id, None)
+            if removed is None:
+                raise NotFoundError("Server not found")
+            self._write(records)
+        return removed
+
+
+class JournaledServerStore:
+    """Keeps records in memory and appends every change to ``servers.journal``.
+
+    A change is one small JSON line holding the whole new record, or the id of a removed
+    one. It is fsynced before the call returns, and writers that queue up behind an fsync
+    share the next one. After ``compact_after`` changes the records are written
+    to ``servers.json``, in the JSON store's format, and the journal is truncated. On open
+    the journal is replayed onto that snapshot. Replaying a line twice has no further
+    effect, so a crash between the two steps of a compaction loses nothing. One process
+    owns a data directory at a time, enforced by an advisory lock on
+    ``servers.journal.lock``; a second one fails to open the store.
+    """
+
+    def __init__(self, data_dir: Path, *, compact_after: int = 1000) -> None:
+        self.data_dir = data_dir
+        self.path = data_dir / "servers.json"
+        self.journal_path = data_dir / "servers.journal"
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._records: dict[str, ServerRecord] = {}
+        self._names: dict[str, str] = {}
+        self._written = 0
+        self._synced = 0
+        self._entries = 0
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self._write([])
+        self._owner = FileLock(data_dir / "servers.journal.lock")
+        if not self._owner.acquire(blocking=False):
+            raise StoreError("Another process is using the server metadata journal")
+        try:
+            self._open()
+        except BaseException:
+            self._owner.release()
+            raise
+
+    def _open(self) -> None:
+        if self.path.exists():
+            for record in read_json_records(self.path):
+                self._put(record)
+        self._replay()
+        try:
+            self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            self._compact()
+        except OSError as exc:
+            raise StoreError("Could not write server metadata") from exc
+
+    def _put(self, record: ServerRecord) -> None:
+        previous = self._records.get(record.id)
+        if previous:
+            self._names.pop(previous.name.casefold(), None)
+        self._records[record.id] = record
+        self._names[record.name.casefold()] = record.id
 
-    def _read(self) -> list[ServerRecord]:
+    def _drop(self, server_id: str) -> None:
+        removed = self._records.pop(server_id, None)
+        if removed:
+            self._names.pop(removed.name.casefold(), None)
+
+    def _replay(self) -> None:
         try:
-            raw = json.loads(self.path.read_text(encoding="utf-8"))
-            if not isinstance(raw, list):
-                raise StoreError("Server metadata must contain a JSON array")
-            return [ServerRecord.model_validate(item) for item in raw]
-        except (OSError, json.JSONDecodeError, ValidationError) as exc:
+            lines = self.journal_path.read_bytes().splitlines()
+        except FileNotFoundError:
+            return
+        except OSError as exc:
             raise StoreError("Could not read server metadata") from exc
+        for number, line in enumerate(lines, start=1):
+            try:
+                entry = json.loads(line)
+                if "remove" in entry:
+                    self._drop(entry["remove"])
+                else:
+                    self._put(ServerRecord.model_validate(entry["put"]))
+            except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                if number == len(lines):
+                    break  # A write torn by a crash; its caller was never told it succeeded.
+                raise StoreError("Could not read the server metadata journal") from exc
+            except (KeyError, TypeError, ValidationError) as exc:
+                raise StoreError("Could not read the server metadata journal") from exc
 
-    def _write(self, records: list[ServerRecord]) -> None:
-        payload = json.dumps(
-            [record.model_dump(mode="json") for record in records], indent=2, sort_keys=True
-        )
+    def _append(self, entry: dict[str, object]) -> int:
+        line = json.dumps(entry, separators=(",", ":"), sort_keys=True) + "\n"
         try:
-            with tempfile.NamedTemporaryFile(
-                "w", encoding="utf-8", dir=self.data_dir, delete=False
-            ) as handle:
-                handle.write(payload + "\n")
-                temp_path = Path(handle.name)
-            os.replace(temp_path, self.path)
+            os.write(self._fd, line.encode())
         except OSError as exc:
             raise StoreError("Could not write server metadata") from exc
+        self._written += 1
+        self._entries += 1
+        return self._written
+
+    def _compact(self) -> None:
+        # Callers hold both locks, or own the store exclusively while opening it.
+        replace_durably(self.path, _snapshot(self._records.values()))
+        os.ftruncate(self._fd, 0)
+        os.fsync(self._fd)
+        self._entries = 0
+        self._synced = self._written
+
+    def _commit(self, sequence: int) -> None:
+        """Return once the journal line numbered ``sequence`` is on disk."""
+        with self._sync_lock:
+            if self._synced >= sequence:
+                return  # Another writer's fsync covered this line.
+            with self._lock:
+                target = self._written
+            try:
+                os.fsync(self._fd)
+                self._synced = target
+                if self._entries >= self.compact_after:
+                    with self._lock:
+                        self._compact()
+            except OSError as exc:
+                raise StoreError("Could not write server metadata") from exc
 
     def list(self) -> list[ServerRecord]:
         with self._lock:
-            return self._read()
+            return list(self._records.values())
 
     def get(self, server_id: str) -> ServerRecord:
         with self._lock:
-            for record in self._read():
-                if record.id == server_id:
-                    return record
-        raise NotFoundError("Server not found")
+            record = self._records.get(server_id)
+        if record is None:
+            raise NotFoundError("Server not found")
+        return record
+
+    def find_by_name(self, name: str) -> ServerRecord | None:
+        with self._lock:
+            server_id = self._names.get(name.casefold())
+            return self._records[server_id] if server_id else None
 
     def add(self, record: ServerRecord) -> ServerRecord:
         with self._lock:
-            records = self._read()
-            if any(existing.id == record.id for existing in records):
+            if record.id in self._records:
                 raise StoreError("Duplicate server identifier")
-            records.append(record)
-            self._write(records)
+            if record.name.casefold() in self._names:
+                raise ConflictError(DUPLICATE_NAME)
+            sequence = self._append({"put": record.model_dump(mode="json")})
+            self._put(record)
+        self._commit(sequence)
         return record
 
     def update(self, server_id: str, **changes: object) -> ServerRecord:
         with self._lock:
-            records = self._read()
-            for index, record in enumerate(records):
-                if record.id == server_id:
-                    try:
-                        records[index] = ServerRecord.model_validate(
-                            {**record.model_dump(), **changes}
-                        )
-                    except ValidationError as exc:
-                        raise StoreError("Invalid server metadata update") from exc
-                    self._write(records)
-                    return records[index]
-        raise NotFoundError("Server not found")
+            current = self._records.get(server_id)
+            if current is None:
+                raise NotFoundError("Server not found")
+            updated = _changed(current, changes)
+            if self._names.get(updated.name.casefold(), server_id) != server_id:
+                raise ConflictError(DUPLICATE_NAME)
+            sequence = self._append({"put": updated.model_dump(mode="json")})
+            self._put(updated)
+        self._commit(sequence)
+        return updated
+
+    def remove(self, server_id: str) -> ServerRecord:
+        with self._lock:
+            removed = self._records.get(server_id)
+            if removed is None:
+                raise NotFoundError("Server not found")
+            sequence = self._append({"remove": server_id})
+            self._drop(server_id)
+        self._commit(sequence)
+        return removed
+
+    def close(self) -> None:
+        with self._sync_lock, self._lock:
+            os.close(self._fd)
+            self._owner.release()
+
+
+# Each entry upgrades the schema by one version; ``PRAGMA user_version`` records the
+# last one applied. Append new migrations, never edit released ones.
+MIGRATIONS: tuple[tuple[str, ...], ...] = (
+    (
+        """CREATE TABLE servers (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            record TEXT NOT NULL
+        )""",
+        "CREATE UNIQUE INDEX servers_name ON servers (name COLLATE NOCASE)",
+    ),
+)
+
+
+class SqliteServerStore:
+    """Keeps records in a SQLite database in WAL mode, one row per server.
+
+    Lookups by id and by name go through indexes and an update rewrites one row. A
+    new database imports ``servers.json`` from the same directory when it exists.
+    """
+
+    def __init__(self, data_dir: Path) -> None:
+        self.data_dir = data_dir
+        self.path = data_dir / "servers.sqlite3"
+        self._lock = threading.RLock()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            self._connection = sqlite3.connect(
+                self.path, timeout=10, isolation_level=None, check_same_thread=False
+            )
+            try:
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+                self._migrate(data_dir / "servers.json")
+            except BaseException:
+                self._connection.close()
+                raise
+        except sqlite3.Error as exc:
+            raise StoreError("Could not open server metadata database") from exc
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def _migrate(self, legacy: Path) -> None:
+        """Apply pending migrations; a new database also imports ``legacy``.
+
+        The import shares the migration's transaction, so a failed import leaves the
+        database new and it is retried on the next open.
+        """
+        with self._transaction() as connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version > len(MIGRATIONS):
+                raise StoreError("Server metadata was written by a newer RemoteCraft")
+            for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in statements:
+                    connection.execute(statement)
+                connection.execute(f"PRAGMA user_version = {number}")
+            if version == 0 and legacy.exists():
+                for record in read_json_records(legacy):
+                    self._insert(connection, record)
+
+    @staticmethod
+    def _record(row: tuple[str] | None) -> ServerRecord | None:
+        if row is None:
+            return None
+        try:
+            return ServerRecord.model_validate_json(row[0])
+        except ValidationError as exc:
+            raise StoreError("Could not read server metadata") from exc
+
+    def _one(self, query: str, *parameters: str) -> ServerRecord | None:
+        try:
+            with self._lock:
+                row = self._connection.execute(query, parameters).fetchone()
+        except sqlite3.Error as exc:
+            raise StoreError("Could not read server metadata") from exc
+        return self._record(row)
+
+    def _insert(self, connection: sqlite3.Connection, record: ServerRecord) -> None:
+        try:
+            connection.execute(
+                "INSERT INTO servers (id, name, record) VALUES (?, ?, ?)",
+                (record.id, record.name, record.model_dump_json()),
+            )
+        except sqlite3.IntegrityError as exc:
+            if "servers.id" in str(exc):
+                raise StoreError("Duplicate server identifier") from exc
+            raise ConflictError(DUPLICATE_NAME) from exc
+
+    def import_json(self, path: Path) -> int:
+        """Copy every record from a ``servers.json`` file; return how many were added."""
+        records = read_json_records(path)
+        try:
+            with self._transaction() as connection:
+                for record in records:
+                    self._insert(connection, record)
+        except sqlite3.Error as exc:
+            raise StoreError("Could not write server metadata") from exc
+        return len(records)
+
+    def list(self) -> list[ServerRecord]:
+        try:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT record FROM servers ORDER BY rowid"
+                ).fetchall()
+        except sqlite3.Error as exc:
+            raise StoreError("Could not read server metadata") from exc
+        return [record for row in rows if (record := self._record(row))]
+
+    def get(self, server_id: str) -> ServerRecord:
+        record = self._one("SELECT record FROM servers WHERE id = ?", server_id)
+        if record is None:
+            raise NotFoundError("Server not found")
+        return record
+
+    def find_by_name(self, name: str) -> ServerRecord | None:
+        return self._one("SELECT record FROM servers WHERE name = ? COLLATE NOCASE", name)
+
+    def add(self, record: ServerRecord) -> ServerRecord:
+        try:
+            with self._transaction() as connection:
+                self._insert(connection, record)
+        except sqlite3.Error as exc:
+            raise StoreError("Could not write server metadata") from exc
+        return record
+
+    def update(self, server_id: str, **changes: object) -> ServerRecord:
+        try:
+            with self._transaction() as connection:
+                row = connection.execute(
+                    "SELECT record FROM servers WHERE id = ?", (server_id,)
+                ).fetchone()
+                current = self._record(row)
+                if current is None:
+                    raise NotFoundError("Server not found")
+                updated = _changed(current, changes)
+                try:
+                    connection.execute(
+                        "UPDATE servers SET name = ?, record = ? WHERE id = ?",
+                        (updated.name, updated.model_dump_json(), server_id),
+                    )
+                except sqlite3.IntegrityError as exc:
+                    raise ConflictError(DUPLICATE_NAME) from exc
+        except sqlite3.Error as exc:
+            raise StoreError("Could not write server metadata") from exc
+        return updated
 
     def remove(self, server_id: str) -> ServerRecord:
+        try:
+            with self._transaction() as connection:
+                rows = connection.execute(
+                    "DELETE FROM servers WHERE id = ? RETURNING record", (server_id,)
+                ).fetchall()
+        except sqlite3.Error as exc:
+            raise StoreError("Could not write server metadata") from exc
+        removed = self._record(rows[0] if rows else None)
+        if removed is None:
+            raise NotFoundError("Server not found")
+        return removed
+
+    def close(self) -> None:
         with self._lock:
-            records = self._read()
-            for index, record in enumerate(records):
-                if record.id == server_id:
-                    removed = records.pop(index)
-                    self._write(records)
-                    return removed
-        raise NotFoundError("Server not found")
+            self._connection.close()
@@ -2,18 +2,26 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
+import threading
 import time
 from collections.abc import Callable
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any
+from urllib.error import HTTPError
 from urllib.parse import urlsplit
 from urllib.request import Request, urlopen
 
 from remotecraft.errors import NotFoundError, UpstreamError
 from remotecraft.models import DownloadSpec
 
+USER_AGENT = "RemoteCraft/0.2"
+READ_SIZE = 64 * 1024
+SHA1_PATTERN = re.compile(r"[0-9a-f]{40}")
 MANIFEST_URL = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"
 ALLOWED_MOJANG_HOSTS = {
     "launcher.mojang.com",
@@ -23,19 +31,79 @@ ALLOWED_MOJANG_HOSTS = {
 }
 
 
+def _start_thread(target: Callable[[], None]) -> None:
+    threading.Thread(target=target, name="manifest-refresh", daemon=True).start()
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data, usedforsecurity=False).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class ManifestIndex:
+    """Release entries of one manifest, by id and newest first."""
+
+    releases: tuple[str, ...]
+    entries: dict[str, dict[str, Any]]
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @classmethod
+    def build(
+        cls,
+        manifest: dict[str, Any],
+        fetched_at: float,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> ManifestIndex:
+        entries: dict[str, dict[str, Any]] = {}
+        for item in manifest.get("versions", []):
+            if (
+                isinstance(item, dict)
+                and item.get("type") == "release"
+                and isinstance(item.get("id"), str)
+            ):
+                entries.setdefault(item["id"], item)
+        return cls(tuple(entries), entries, fetched_at, etag, last_modified)
+
+    def validators(self) -> dict[str, str]:
+        headers = {"If-None-Match": self.etag, "If-Modified-Since": self.last_modified}
+        return {name: value for name, value in headers.items() if value}
+
+
 class VersionCatalog:
+    """Mojang's release list, parsed and indexed in memory.
+
+    The manifest is re-read only when the cache file changes and revalidated only once
+    ``ttl_seconds`` have passed, so lookups between refreshes touch neither the disk
+    nor the network. A stale manifest is still served while ``spawn`` revalidates it
+    with ``If-None-Match``/``If-Modified-Since``; only a catalog with nothing cached at
+    all makes its caller wait for Mojang.
+    """
+
     def __init__(
         self,
         cache_path: Path,
         *,
         ttl_seconds: int = 3600,
+        releases_dir: Path | None = None,
         opener: Callable[..., Any] = urlopen,
         clock: Callable[[], float] = time.time,
+        spawn: Callable[[Callable[[], None]], None] | None = None,
     ) -> None:
         self.cache_path = cache_path
         self.ttl_seconds = ttl_seconds
+        self.releases_dir = releases_dir or cache_path.parent / "releases"
         self.opener = opener
         self.clock = clock
+        self._index: ManifestIndex | None = None
+        self._stamp: tuple[int, int, int] | None = None
+        self.spawn = spawn or _start_thread
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
 
     @staticmethod
     def _validate_url(url: str) -> None:
@@ -45,79 +113,194 @@ class VersionCatalog:
         if parsed.username or parsed.password or parsed.fragment:
             raise UpstreamError("Mojang returned an invalid URL")
 
-    def _fetch_json(self, url: str) -> dict[str, Any]:
+    def _fetch(self, url: str) -> bytes:
         self._validate_url(url)
         request = Request(  # noqa: S310 - _validate_url permits trusted HTTPS hosts only.
-            url, headers={"User-Agent": "RemoteCraft/0.2"}
+            url, headers={"User-Agent": USER_AGENT}
         )
         try:
             with self.opener(request, timeout=10) as response:
-                payload = json.loads(response.read().decode("utf-8"))
+                return response.read()
         except Exception as exc:
             raise UpstreamError("Could not reach Mojang's version service") from exc
+
+    @staticmethod
+    def _parse(body: bytes) -> dict[str, Any]:
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise UpstreamError("Mojang returned an unexpected response") from exc
         if not isinstance(payload, dict):
             raise UpstreamError("Mojang returned an unexpected response")
         return payload
 
-    def _read_cache(self) -> tuple[dict[str, Any] | None, bool]:
+    def _fetch_json(self, url: str) -> dict[str, Any]:
+        return self._parse(self._fetch(url))
+
+    def _release_details(self, version: str, entry: dict[str, Any]) -> dict[str, Any]:
+        """Return a release's metadata document, from disk when it was fetched before.
+
+        Release documents never change, and the manifest names each by its SHA-1, so a
+        cached copy is used only if it still hashes to that value and names the release.
+        """
+        detail_url = entry.get("url")
+        if not isinstance(detail_url, str):
+            raise UpstreamError("Mojang did not provide release metadata")
+        sha1 = entry.get("sha1")
+        if not isinstance(sha1, str) or not SHA1_PATTERN.fullmatch(sha1):
+            return self._fetch_json(detail_url)
+        path = self.releases_dir / f"{sha1}.json"
+        try:
+            body = path.read_bytes()
+            if _sha1(body) == sha1:
+                details = self._parse(body)
+                if details.get("id") == version:
+                    return details
+        except (OSError, UpstreamError):
+            pass
+        body = self._fetch(detail_url)
+        if _sha1(body) != sha1:
+            raise UpstreamError("Mojang returned release metadata that fails its checksum")
+        details = self._parse(body)
+        try:
+            self.releases_dir.mkdir(parents=True, exist_ok=True)
+            partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            partial.write_bytes(body)
+            os.replace(partial, path)
+        except OSError:
+            pass  # The cache only saves a round trip.
+        return details
+
+    def _read_cache(self) -> ManifestIndex | None:
         try:
             cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
             manifest = cache.get("manifest")
             timestamp = float(cache.get("timestamp", 0))
             if isinstance(manifest, dict):
-                return manifest, self.clock() - timestamp < self.ttl_seconds
-        except (OSError, ValueError, TypeError, json.JSONDecodeError):
+                return ManifestIndex.build(
+                    manifest,
+                    timestamp,
+                    etag=cache.get("etag") or None,
+                    last_modified=cache.get("last_modified") or None,
+                )
+        except (OSError, ValueError, TypeError, AttributeError, json.JSONDecodeError):
             pass
-        return None, False
+        return None
 
-    def _write_cache(self, manifest: dict[str, Any]) -> None:
+    def _write_cache(self, manifest: dict[str, Any], index: ManifestIndex) -> None:
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        payload = {"timestamp": self.clock(), "manifest": manifest}
-        self.cache_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        payload = {
+            "timestamp": index.fetched_at,
+            "etag": index.etag,
+            "last_modified": index.last_modified,
+            "manifest": manifest,
+        }
+        partial = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        partial.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        os.replace(partial, self.cache_path)
 
-    def _manifest(self) -> dict[str, Any]:
-        cached, fresh = self._read_cache()
-        if fresh and cached:
-            return cached
+    def _cache_stamp(self) -> tuple[int, int, int] | None:
         try:
-            manifest = self._fetch_json(MANIFEST_URL)
-            self._write_cache(manifest)
-            return manifest
-        except UpstreamError:
-            if cached:
-                return cached
-            raise
+            stat = self.cache_path.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _fresh(self, index: ManifestIndex) -> bool:
+        return self.clock() - index.fetched_at < self.ttl_seconds
+
+    def _load(self) -> ManifestIndex | None:
+        # Re-read only on first use or when another process has replaced the file.
+        with self._lock:
+            stamp = self._cache_stamp()
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self._index = self._read_cache() or self._index
+            return self._index
+
+    def _fetch_manifest(self, current: ManifestIndex | None) -> ManifestIndex:
+        """Fetch the manifest, or confirm ``current`` with a conditional request."""
+        self._validate_url(MANIFEST_URL)
+        validators = current.validators() if current else {}
+        request = Request(  # noqa: S310 - _validate_url permits trusted HTTPS hosts only.
+            MANIFEST_URL, headers={"User-Agent": USER_AGENT, **validators}
+        )
+        try:
+            with self.opener(request, timeout=10) as response:
+                body = response.read()
+                headers = response.headers
+        except HTTPError as exc:
+            if exc.code == 304 and current:
+                return replace(current, fetched_at=self.clock())
+            raise UpstreamError("Could not reach Mojang's version service") from exc
+        except Exception as exc:
+            raise UpstreamError("Could not reach Mojang's version service") from exc
+        manifest = self._parse(body)
+        index = ManifestIndex.build(
+            manifest,
+            self.clock(),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        self._write_cache(manifest, index)
+        return index
+
+    def refresh(self) -> ManifestIndex:
+        """Bring the manifest up to date now unless it is still within its TTL."""
+        with self._refresh_lock:
+            index = self._load()
+            if index and self._fresh(index):
+                return index
+            try:
+                index = self._fetch_manifest(index)
+            except UpstreamError:
+                if index:
+                    return index
+                raise
+            with self._lock:
+                self._index = index
+                self._stamp = self._cache_stamp()
+            return index
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh() -> None:
+            try:
+                self.refresh()
+            except UpstreamError:
+                pass  # The stale manifest keeps being served until Mojang answers.
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        self.spawn(refresh)
+
+    def _manifest(self) -> ManifestIndex:
+        index = self._index
+        if index and self._fresh(index):
+            return index
+        index = self._load()
+        if index is None:
+            # Nothing to serve yet, so this caller has to wait for Mojang.
+            return self.refresh()
+        if not self._fresh(index):
+            self._refresh_in_background()
+        return index
 
     def list_releases(self, limit: int = 30) -> list[str]:
         if not 1 <= limit <= 100:
             raise ValueError("limit must be between 1 and 100")
-        versions = self._manifest().get("versions", [])
-        return [
-            item["id"]
-            for item in versions
-            if isinstance(item, dict)
-            and item.get("type") == "release"
-            and isinstance(item.get("id"), str)
-        ][:limit]
+        return list(self._manifest().releases[:limit])
 
     def get_vanilla_download(self, version: str) -> DownloadSpec:
-        versions = self._manifest().get("versions", [])
-        entry = next(
-            (
-                item
-                for item in versions
-                if isinstance(item, dict)
-                and item.get("id") == version
-                and item.get("type") == "release"
-            ),
-            None,
-        )
+        entry = self._manifest().entries.get(version)
         if not entry:
             raise NotFoundError("Minecraft release not found")
-        detail_url = entry.get("url")
-        if not isinstance(detail_url, str):
-            raise UpstreamError("Mojang did not provide release metadata")
-        details = self._fetch_json(detail_url)
+        details = self._release_details(version, entry)
         server = details.get("downloads", {}).get("server")
         if not isinstance(server, dict):
             raise UpstreamError("This release does not include a server download")
@@ -127,6 +310,39 @@ class VersionCatalog:
         if not isinstance(url, str) or not isinstance(sha1, str) or not isinstance(size, int):
             raise UpstreamError("Mojang returned incomplete server metadata")
         self._validate_url(url)
-        if not re.fullmatch(r"[0-9a-f]{40}", sha1):
+        if not SHA1_PATTERN.fullmatch(sha1):
             raise UpstreamError("Mojang returned an invalid server checksum")
         return DownloadSpec(url=url, sha1=sha1, size=size)
+
+    def download_jar(
+        self,
+        download: DownloadSpec,
+        destination: Path,
+        *,
+        progress: Callable[[int], None] | None = None,
+    ) -> None:
+        """Stream a server jar to ``destination``; it appears only once its SHA-1 matches."""
+        self._validate_url(download.url)
+        request = Request(  # noqa: S310 - _validate_url permits trusted HTTPS hosts only.
+            download.url, headers={"User-Agent": USER_AGENT}
+        )
+        partial = destination.with_name(
+            f"{destination.name}.part.{os.getpid()}.{threading.get_ident()}"
+        )
+        digest = hashlib.sha1(usedforsecurity=False)
+        received = 0
+        try:
+            with self.opener(request, timeout=30) as response, partial.open("wb") as target:
+                while chunk := response.read(READ_SIZE):
+                    digest.update(chunk)
+                    target.write(chunk)
+                    received += len(chunk)
+                    if progress:
+                        progress(received)
+        except Exception as exc:
+            partial.unlink(missing_ok=True)
+            raise UpstreamError("Could not download the server jar from Mojang") from exc
+        if digest.hexdigest() != download.sha1:
+            partial.unlink(missing_ok=True)
+            raise UpstreamError("Mojang's server jar failed SHA-1 verification")
+        os.replace(partial, destination)
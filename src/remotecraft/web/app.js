@@ -4,7 +4,10 @@ const state = {
   token: sessionStorage.getItem("remotecraft-token") || "",
   servers: [],
   activeServer: null,
-  poller: null,
+  events: null,
+  reconnect: null,
+  retryDelay: 1000,
+  jobs: new Map(),
 };
 
 const elements = {
@@ -17,6 +20,7 @@ const elements = {
   tokenInput: document.querySelector("#api-token"),
   forgetToken: document.querySelector("#forget-token"),
   refreshButton: document.querySelector("#refresh-button"),
+  startOfflineButton: document.querySelector("#start-offline-button"),
   createForm: document.querySelector("#create-form"),
   serverRows: document.querySelector("#server-rows"),
   emptyState: document.querySelector("#empty-state"),
@@ -114,6 +118,9 @@ function renderServers() {
     const badge = document.createElement("span");
     badge.className = `status-badge ${server.status}`;
     badge.textContent = server.status;
+    if (server.status_age_seconds !== null && server.status_age_seconds !== undefined) {
+      badge.title = `Checked ${Math.round(server.status_age_seconds)}s ago`;
+    }
     status.append(badge);
 
     const actions = document.createElement("td");
@@ -145,6 +152,25 @@ async function loadVersions() {
   }
 }
 
+function renderHost(host) {
+  if (!host.reachable) {
+    elements.hostState.textContent = "Unavailable";
+    elements.hostState.style.color = "";
+    return;
+  }
+  elements.hostState.textContent = host.ready ? "Ready" : "Tools missing";
+  elements.hostState.style.color = host.ready ? "var(--green-strong)" : "var(--amber)";
+}
+
+function forgetSession() {
+  sessionStorage.removeItem("remotecraft-token");
+  state.token = "";
+  unsubscribe();
+  if (!elements.credentialsDialog.open) {
+    elements.credentialsDialog.showModal();
+  }
+}
+
 async function refresh({ quiet = false } = {}) {
   if (!state.token) {
     setConnection(false);
@@ -157,19 +183,14 @@ async function refresh({ quiet = false } = {}) {
   try {
     const [servers, host] = await Promise.all([api("/api/servers"), api("/api/host")]);
     state.servers = servers;
-    elements.hostState.textContent = host.ready ? "Ready" : "Tools missing";
-    elements.hostState.style.color = host.ready ? "var(--green-strong)" : "var(--amber)";
+    renderHost({ reachable: true, ...host });
     renderServers();
     setConnection(true);
   } catch (error) {
     setConnection(false);
     elements.hostState.textContent = "Unavailable";
     if (error.status === 401) {
-      sessionStorage.removeItem("remotecraft-token");
-      state.token = "";
-      if (!elements.credentialsDialog.open) {
-        elements.credentialsDialog.showModal();
-      }
+      forgetSession();
     } else if (!quiet) {
       toast(error.message, "error");
     }
@@ -185,8 +206,8 @@ async function connectWithToken(token) {
     await api("/api/servers");
     sessionStorage.setItem("remotecraft-token", state.token);
     elements.credentialsDialog.close();
-    await Promise.all([loadVersions(), refresh()]);
-    startPolling();
+    await loadVersions();
+    subscribe();
   } catch (error) {
     state.token = "";
     setConnection(false);
@@ -202,14 +223,37 @@ async function runAction(server, action) {
     kill: "Killing server process",
   };
   try {
-    await api(`/api/servers/${server.id}/${action}`, { method: "POST" });
+    // Restarts wait for the old process, so they run as a job; the outcome arrives as an operation event.
+    const query = action === "restart" ? "?background=true" : "";
+    await api(`/api/servers/${server.id}/${action}${query}`, { method: "POST" });
     toast(`${labels[action]}: ${server.name}`);
-    await refresh({ quiet: true });
   } catch (error) {
     toast(error.message, "error");
   }
 }
 
+async function startOffline() {
+  const offline = state.servers.filter((server) => server.status === "offline");
+  if (!offline.length) {
+    toast("Every server is already running");
+    return;
+  }
+  elements.startOfflineButton.disabled = true;
+  try {
+    // The job finishes once every server has booted, exited, or outlived the boot wait.
+    const job = await api("/api/servers/bulk/start", {
+      method: "POST",
+      body: JSON.stringify({ ids: offline.map((server) => server.id), stagger: 2 }),
+    });
+    state.jobs.set(job.id, "start offline");
+    toast(`Starting ${offline.length} servers, two booting at a time`);
+  } catch (error) {
+    toast(error.message, "error");
+  } finally {
+    elements.startOfflineButton.disabled = false;
+  }
+}
+
 async function deleteServer(server) {
   const confirmed = window.confirm(
     `Delete ${server.name} and its remote files? This cannot be undone.`,
@@ -221,7 +265,6 @@ async function deleteServer(server) {
     const query = new URLSearchParams({ confirm: server.name });
     await api(`/api/servers/${server.id}?${query}`, { method: "DELETE" });
     toast(`Deleted ${server.name}`);
-    await refresh({ quiet: true });
   } catch (error) {
     toast(error.message, "error");
   }
@@ -248,9 +291,156 @@ async function openConsole(server) {
   }
 }
 
-function startPolling() {
-  window.clearInterval(state.poller);
-  state.poller = window.setInterval(() => refresh({ quiet: true }), 10000);
+function applyEvent(event) {
+  if (event.type === "snapshot") {
+    state.servers = event.servers;
+    if (event.host) {
+      renderHost(event.host);
+    } else {
+      api("/api/host")
+        .then((host) => renderHost({ reachable: true, ...host }))
+        .catch(() => renderHost({ reachable: false }));
+    }
+  } else if (event.type === "servers") {
+    const changed = new Map(event.changed.map((server) => [server.id, server]));
+    state.servers = state.servers
+      .filter((server) => !event.removed.includes(server.id))
+      .map((server) => changed.get(server.id) || server);
+    for (const server of event.changed) {
+      if (!state.servers.some((item) => item.id === server.id)) {
+        state.servers.push(server);
+      }
+    }
+  } else if (event.type === "host") {
+    renderHost(event.host);
+    return;
+  } else if (event.type === "job") {
+    applyJob(event.job);
+    return;
+  } else if (event.type === "operation" && event.action === "restart") {
+    const server = state.servers.find((item) => item.id === event.server_id);
+    const name = server ? server.name : event.server_id.slice(0, 12);
+    toast(event.ok ? `Restarted ${name}` : `Restart of ${name} failed: ${event.detail}`,
+      event.ok ? "success" : "error");
+    return;
+  } else {
+    return;
+  }
+  renderServers();
+  if (state.activeServer) {
+    const active = state.servers.find((server) => server.id === state.activeServer.id);
+    if (active) {
+      state.activeServer = active;
+      elements.consoleServerState.textContent = active.status.toUpperCase();
+      elements.commandInput.disabled = active.status !== "online";
+      elements.commandForm.querySelector("button").disabled = active.status !== "online";
+    }
+  }
+}
+
+function applyJob(job) {
+  const name = state.jobs.get(job.id);
+  if (name === undefined) {
+    return;
+  }
+  if (job.kind === "bulk-start") {
+    applyBulkStart(job);
+    return;
+  }
+  const submit = elements.createForm.querySelector("button[type='submit']");
+  if (job.state === "succeeded") {
+    state.jobs.delete(job.id);
+    submit.textContent = "Create";
+    if (!state.servers.some((server) => server.id === job.result.id)) {
+      state.servers.push(job.result);
+      renderServers();
+    }
+    toast(`Created ${name}`);
+  } else if (job.state === "failed") {
+    state.jobs.delete(job.id);
+    submit.textContent = "Create";
+    toast(`Could not create ${name}: ${job.error}`, "error");
+  } else if (["downloading", "uploading"].includes(job.progress.stage) && job.progress.total) {
+    const percent = Math.floor((job.progress.done * 100) / job.progress.total);
+    const verb = job.progress.stage === "uploading" ? "Uploading" : "Downloading";
+    submit.textContent = `${verb} ${percent}%`;
+  }
+}
+
+function applyBulkStart(job) {
+  if (job.state === "succeeded") {
+    state.jobs.delete(job.id);
+    const failed = job.result.filter((result) => !result.ok).length;
+    toast(
+      failed ? `${failed} of ${job.result.length} servers failed to start` : "All servers started",
+      failed ? "error" : "success",
+    );
+  } else if (job.state === "failed") {
+    state.jobs.delete(job.id);
+    toast(`Could not start offline servers: ${job.error}`, "error");
+  }
+}
+
+function unsubscribe() {
+  window.clearTimeout(state.reconnect);
+  if (state.events) {
+    state.events.abort();
+    state.events = null;
+  }
+}
+
+// EventSource cannot send an Authorization header, so the stream is read with fetch.
+async function subscribe() {
+  unsubscribe();
+  const controller = new AbortController();
+  state.events = controller;
+  try {
+    const response = await fetch("/api/events", {
+      headers: { Authorization: `Bearer ${state.token}` },
+      signal: controller.signal,
+    });
+    if (response.status === 401) {
+      setConnection(false);
+      forgetSession();
+      return;
+    }
+    if (!response.ok) {
+      throw new ApiError(`Request failed (${response.status})`, response.status);
+    }
+    setConnection(true);
+    state.retryDelay = 1000;
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) {
+        break;
+      }
+      buffer += value;
+      let boundary = buffer.indexOf("\n\n");
+      while (boundary !== -1) {
+        const data = buffer
+          .slice(0, boundary)
+          .split("\n")
+          .filter((line) => line.startsWith("data: "))
+          .map((line) => line.slice(6))
+          .join("\n");
+        buffer = buffer.slice(boundary + 2);
+        if (data) {
+          applyEvent(JSON.parse(data));
+        }
+        boundary = buffer.indexOf("\n\n");
+      }
+    }
+  } catch (_error) {
+    // Network errors and aborted streams are handled below.
+  }
+  if (controller.signal.aborted) {
+    return;
+  }
+  setConnection(false);
+  state.reconnect = window.setTimeout(subscribe, state.retryDelay);
+  state.retryDelay = Math.min(state.retryDelay * 2, 30000);
 }
 
 elements.credentialsButton.addEventListener("click", () => {
@@ -271,6 +461,7 @@ elements.credentialsForm.addEventListener("submit", (event) => {
 elements.forgetToken.addEventListener("click", () => {
   sessionStorage.removeItem("remotecraft-token");
   state.token = "";
+  unsubscribe();
   state.servers = [];
   renderServers();
   setConnection(false);
@@ -278,6 +469,7 @@ elements.forgetToken.addEventListener("click", () => {
 });
 
 elements.refreshButton.addEventListener("click", () => refresh());
+elements.startOfflineButton.addEventListener("click", () => startOffline());
 
 elements.createForm.addEventListener("submit", async (event) => {
   event.preventDefault();
@@ -291,10 +483,10 @@ elements.createForm.addEventListener("submit", async (event) => {
   const submit = elements.createForm.querySelector("button[type='submit']");
   submit.disabled = true;
   try {
-    await api("/api/servers", { method: "POST", body: JSON.stringify(payload) });
-    toast(`Created ${payload.name}`);
+    const job = await api("/api/servers", { method: "POST", body: JSON.stringify(payload) });
+    state.jobs.set(job.id, payload.name);
+    toast(`Provisioning ${payload.name}`);
     elements.createForm.reset();
-    await refresh({ quiet: true });
   } catch (error) {
     toast(error.message, "error");
   } finally {
@@ -346,7 +538,8 @@ elements.commandForm.addEventListener("submit", async (event) => {
 
 renderServers();
 if (state.token) {
-  Promise.all([loadVersions(), refresh()]).then(startPolling).catch(() => refresh());
+  loadVersions().catch(() => refresh());
+  subscribe();
 } else {
   elements.credentialsDialog.showModal();
 }
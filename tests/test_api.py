@@ -1,11 +1,22 @@
+import io
+import threading
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime
 
 from fastapi.testclient import TestClient
 
 from remotecraft.api import create_app
+from remotecraft.breaker import CircuitBreaker, GuardedSessionFactory
 from remotecraft.config import Settings
-from remotecraft.errors import ConflictError
-from remotecraft.models import ServerView
+from remotecraft.errors import (
+    ConflictError,
+    HostUnavailableError,
+    InvalidRequestError,
+    NotFoundError,
+)
+from remotecraft.models import BulkResult, ServerView
+from remotecraft.versions import VersionCatalog
 
 
 class Catalog:
@@ -33,7 +44,17 @@ class FakeService:
     def list_servers(self) -> list[ServerView]:
         return [self.server]
 
-    def create_server(self, **payload: object) -> ServerView:
+    def get_server(self, server_id: str) -> ServerView:
+        if server_id != self.server.id:
+            raise NotFoundError("Server not found")
+        return self.server
+
+    def validate_new_server(self, **payload: object) -> tuple[str, str, int]:
+        self.calls.append(("validate", payload))
+        return str(payload["name"]), str(payload["version"]), int(payload["ram_gb"])  # type: ignore[call-overload]
+
+    def create_server(self, *, progress: Callable[..., None], **payload: object) -> ServerView:
+        progress("downloading", 1234, 1234)
         self.calls.append(("create", payload))
         return self.server
 
@@ -41,7 +62,7 @@ class FakeService:
         self.calls.append(("start", server_id))
         return self.server
 
-    def stop_server(self, server_id: str) -> ServerView:
+    def stop_server(self, server_id: str, *, wait: bool = False) -> ServerView:
         self.calls.append(("stop", server_id))
         return self.server
 
@@ -57,6 +78,31 @@ class FakeService:
         self.calls.append(("delete", (server_id, confirm)))
         return self.server
 
+    def validate_bulk(self, action: str, *, stagger: int | None = None) -> None:
+        if stagger is not None and action != "start":
+            raise InvalidRequestError("Only starts can be staggered")
+
+    def run_bulk(
+        self,
+        action: str,
+        server_ids: list[str],
+        *,
+        stagger: int | None = None,
+        on_result: Callable[[BulkResult], None],
+    ) -> list[BulkResult]:
+        self.calls.append(("bulk", (action, server_ids, stagger)))
+        results = [
+            BulkResult(id=server_ids[0], ok=True, server=self.server),
+            BulkResult(id=server_ids[1], ok=False, error="not_found", detail="Server not found"),
+        ]
+        for result in results:
+            on_result(result)
+        return results
+
+    def collect_jar_cache(self) -> list[str]:
+        self.calls.append(("collect", None))
+        return ["b" * 40 + ".jar"]
+
     def send_command(self, server_id: str, command: str) -> dict[str, str]:
         self.calls.append(("command", (server_id, command)))
         return {"status": "sent"}
@@ -92,6 +138,7 @@ def test_protected_routes_require_valid_bearer_token(settings: Settings) -> None
     client, _service, headers = build_client(settings)
 
     assert client.get("/api/servers").status_code == 401
+    assert client.get("/api/events").status_code == 401
     assert (
         client.get("/api/servers", headers={"Authorization": "Bearer incorrect"}).status_code == 401
     )
@@ -104,6 +151,9 @@ def test_inventory_host_and_versions_routes(settings: Settings) -> None:
     assert client.get("/api/host", headers=headers).json()["ready"] is True
     assert client.get("/api/versions?limit=1", headers=headers).json() == {"versions": ["1.21.5"]}
     assert client.get("/api/versions?limit=101", headers=headers).status_code == 422
+    assert client.post("/api/host/jar-cache/collect", headers=headers).json() == {
+        "removed": ["b" * 40 + ".jar"]
+    }
 
 
 def test_create_validates_eula_and_calls_service(settings: Settings) -> None:
@@ -119,8 +169,16 @@ def test_create_validates_eula_and_calls_service(settings: Settings) -> None:
     payload["accept_eula"] = True
     response = client.post("/api/servers", headers=headers, json=payload)
 
-    assert response.status_code == 201
-    assert service.calls == [("create", payload)]
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    for _ in range(100):
+        job = client.get(f"/api/jobs/{job_id}", headers=headers).json()
+        if job["state"] == "succeeded":
+            break
+        time.sleep(0.01)
+    assert job["result"]["id"] == "a" * 32
+    assert service.calls == [("validate", payload), ("create", payload)]
+    assert client.get(f"/api/jobs/{'b' * 32}", headers=headers).status_code == 404
 
 
 def test_lifecycle_console_logs_and_delete_routes(settings: Settings) -> None:
@@ -142,6 +200,18 @@ def test_lifecycle_console_logs_and_delete_routes(settings: Settings) -> None:
         client.delete(f"/api/servers/{server_id}?confirm=survival", headers=headers).status_code
         == 200
     )
+    unknown = client.post(f"/api/servers/{'b' * 32}/restart?background=true", headers=headers)
+    assert unknown.status_code == 404
+    background = client.post(f"/api/servers/{server_id}/restart?background=true", headers=headers)
+    assert background.status_code == 202
+    assert background.json()["kind"] == "restart"
+    job_id = background.json()["id"]
+    for _ in range(100):
+        job = client.get(f"/api/jobs/{job_id}", headers=headers).json()
+        if job["state"] == "succeeded":
+            break
+        time.sleep(0.01)
+    assert job["result"]["id"] == server_id
 
     assert [name for name, _ in service.calls] == [
         "start",
@@ -151,9 +221,40 @@ def test_lifecycle_console_logs_and_delete_routes(settings: Settings) -> None:
         "command",
         "logs",
         "delete",
+        "restart",
     ]
 
 
+def test_bulk_route_runs_as_a_job_with_per_server_results(settings: Settings) -> None:
+    client, service, headers = build_client(settings)
+    payload = {"ids": ["a" * 32, "b" * 32], "stagger": 2}
+
+    response = client.post("/api/servers/bulk/start", headers=headers, json=payload)
+
+    assert response.status_code == 202
+    assert response.json()["kind"] == "bulk-start"
+    job_id = response.json()["id"]
+    for _ in range(100):
+        job = client.get(f"/api/jobs/{job_id}", headers=headers).json()
+        if job["state"] == "succeeded":
+            break
+        time.sleep(0.01)
+    results = job["result"]
+    assert [(result["id"], result["ok"]) for result in results] == [
+        ("a" * 32, True),
+        ("b" * 32, False),
+    ]
+    assert results[1]["error"] == "not_found"
+    assert service.calls == [("bulk", ("start", payload["ids"], 2))]
+    assert client.post("/api/servers/bulk/delete", headers=headers, json=payload).status_code == 422
+    assert client.post("/api/servers/bulk/stop", headers=headers, json=payload).status_code == 422
+    too_many = {**payload, "stagger": 9}
+    assert client.post("/api/servers/bulk/start", headers=headers, json=too_many).status_code == 422
+    assert (
+        client.post("/api/servers/bulk/stop", headers=headers, json={"ids": []}).status_code == 422
+    )
+
+
 def test_domain_errors_have_stable_json_shape(settings: Settings) -> None:
     client, service, headers = build_client(settings)
 
@@ -165,3 +266,40 @@ def test_domain_errors_have_stable_json_shape(settings: Settings) -> None:
 
     assert response.status_code == 409
     assert response.json() == {"error": "conflict", "detail": "server is busy"}
+
+
+def test_health_reports_ssh_circuit_and_unreachable_host_is_503(settings: Settings) -> None:
+    service = FakeService()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    service.session_factory = GuardedSessionFactory(lambda: None, breaker)  # type: ignore[attr-defined, arg-type]
+
+    def unreachable() -> list[ServerView]:
+        breaker.before_call()
+        return []
+
+    service.list_servers = unreachable  # type: ignore[method-assign]
+    client = TestClient(create_app(settings, service))  # type: ignore[arg-type]
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+
+    health = client.get("/api/health").json()
+    assert health["status"] == "ok"
+    assert health["ssh"]["state"] == "open"
+    response = client.get("/api/servers", headers=headers)
+    assert response.status_code == 503
+    assert response.json()["error"] == "host_unavailable"
+    assert HostUnavailableError.code == "host_unavailable"
+
+
+def test_startup_warms_the_version_catalog(settings: Settings) -> None:
+    fetched = threading.Event()
+
+    def opener(request, timeout: int):  # type: ignore[no-untyped-def]
+        fetched.set()
+        return io.BytesIO(b'{"versions": [{"id": "1.21.5", "type": "release"}]}')
+
+    service = FakeService()
+    service.catalog = VersionCatalog(settings.data_dir / "versions.json", opener=opener)  # type: ignore[assignment]
+
+    with TestClient(create_app(settings, service)):  # type: ignore[arg-type]
+        assert fetched.wait(5)
@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+
+import paramiko
+import pytest
+
+from remotecraft.breaker import CircuitBreaker, GuardedSessionFactory
+from remotecraft.errors import ConfigurationError, HostUnavailableError
+
+
+class Host:
+    def __init__(self) -> None:
+        self.up = False
+        self.attempts = 0
+
+    @contextmanager
+    def session(self):  # type: ignore[no-untyped-def]
+        self.attempts += 1
+        if not self.up:
+            raise TimeoutError("timed out")
+        yield self
+
+
+def guarded(now: list[float]) -> tuple[GuardedSessionFactory, Host]:
+    host = Host()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    return GuardedSessionFactory(host.session, breaker), host
+
+
+def test_breaker_opens_after_threshold_and_fails_fast() -> None:
+    now = [0.0]
+    factory, host = guarded(now)
+
+    for _ in range(2):
+        with pytest.raises(HostUnavailableError, match="Could not connect"):
+            with factory():
+                pass
+    with pytest.raises(HostUnavailableError, match="retrying in 10s"):
+        with factory():
+            pass
+
+    assert host.attempts == 2
+    assert factory.breaker.snapshot() == {
+        "state": "open",
+        "consecutive_failures": 2,
+        "retry_in_seconds": 10.0,
+    }
+    assert HostUnavailableError.status_code == 503
+
+
+def test_half_open_trial_reopens_or_closes_the_circuit() -> None:
+    now = [0.0]
+    factory, host = guarded(now)
+    for _ in range(2):
+        assert factory.probe() is False
+
+    now[0] = 10.0
+    assert factory.probe() is False
+    assert factory.breaker.state == "open"
+    assert factory.probe() is False
+    assert host.attempts == 3
+
+    now[0] = 20.0
+    host.up = True
+    assert factory.probe() is True
+    assert factory.breaker.snapshot()["state"] == "closed"
+    with factory() as remote:
+        assert remote is host
+
+
+def test_non_transport_errors_do_not_count_as_host_failures() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+
+    def misconfigured() -> None:
+        raise ConfigurationError("Known-hosts file does not exist")
+
+    with pytest.raises(ConfigurationError):
+        breaker.call(misconfigured)
+    assert breaker.state == "closed"
+
+
+class Key:
+    def __init__(self, data: str) -> None:
+        self.data = data
+
+    def get_base64(self) -> str:
+        return self.data
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        paramiko.AuthenticationException("Authentication failed."),
+        paramiko.BadHostKeyException("mc.example", Key("new"), Key("old")),  # type: ignore[arg-type]
+        paramiko.SSHException("Server 'mc.example' not found in known_hosts"),
+    ],
+)
+def test_host_key_and_auth_rejections_do_not_trip_the_breaker(error: Exception) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+
+    def rejected() -> None:
+        raise error
+
+    with pytest.raises(ConfigurationError, match="rejected the connection"):
+        breaker.call(rejected)
+    assert breaker.snapshot()["consecutive_failures"] == 0
+    assert breaker.state == "closed"
@@ -20,6 +20,17 @@ ENV_KEYS = [
     "REMOTECRAFT_CONNECT_TIMEOUT",
     "REMOTECRAFT_COMMAND_TIMEOUT",
     "REMOTECRAFT_ALLOWED_ORIGINS",
+    "REMOTECRAFT_SSH_POOL_SIZE",
+    "REMOTECRAFT_SSH_POOL_IDLE",
+    "REMOTECRAFT_REMOTE_HELPER",
+    "REMOTECRAFT_SSH_FAILURE_THRESHOLD",
+    "REMOTECRAFT_SSH_RETRY_SECONDS",
+    "REMOTECRAFT_SSH_BACKEND",
+    "REMOTECRAFT_STATUS_CACHE_SECONDS",
+    "REMOTECRAFT_RECONCILE_SECONDS",
+    "REMOTECRAFT_JAR_SOURCE",
+    "REMOTECRAFT_STORE_BACKEND",
+    "REMOTECRAFT_WORKERS",
 ]
 
 
@@ -56,7 +67,13 @@ def test_settings_load_valid_environment(monkeypatch: pytest.MonkeyPatch, tmp_pa
         ("REMOTECRAFT_SSH_PORT", "70000", "between 1 and 65535"),
         ("REMOTECRAFT_MAX_RAM_GB", "0", "between 1 and 64"),
         ("REMOTECRAFT_SERVERS_ROOT", "/", "safe absolute Linux path"),
+        ("REMOTECRAFT_SSH_POOL_SIZE", "0", "between 1 and 32"),
         ("REMOTECRAFT_SSH_USE_AGENT", "sometimes", "Invalid boolean"),
+        ("REMOTECRAFT_SSH_BACKEND", "telnet", "paramiko or openssh"),
+        ("REMOTECRAFT_RECONCILE_SECONDS", "-1", "between 0 and 3600"),
+        ("REMOTECRAFT_JAR_SOURCE", "ftp", "host or mirror"),
+        ("REMOTECRAFT_STORE_BACKEND", "redis", "json, journal, or sqlite"),
+        ("REMOTECRAFT_WORKERS", "0", "between 1 and 32"),
     ],
 )
 def test_settings_reject_invalid_values(
@@ -87,3 +104,29 @@ def test_settings_require_an_ssh_authentication_method(
 
     with pytest.raises(ConfigurationError, match="SSH password, key path, or SSH agent"):
         Settings.from_env()
+
+
+def test_settings_reject_passwords_with_the_openssh_backend(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    configure(monkeypatch, tmp_path)
+    monkeypatch.setenv("REMOTECRAFT_SSH_BACKEND", "OpenSSH")
+    assert Settings.from_env().ssh_backend == "openssh"
+
+    monkeypatch.setenv("REMOTECRAFT_SSH_PASSWORD", "secret")
+
+    with pytest.raises(ConfigurationError, match="password authentication"):
+        Settings.from_env()
+
+
+def test_settings_reject_the_journal_store_with_several_workers(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    configure(monkeypatch, tmp_path)
+    monkeypatch.setenv("REMOTECRAFT_WORKERS", "4")
+    assert Settings.from_env().workers == 4
+
+    monkeypatch.setenv("REMOTECRAFT_STORE_BACKEND", "journal")
+
+    with pytest.raises(ConfigurationError, match="only one worker"):
+        Settings.from_env()
@@ -0,0 +1,169 @@
+import functools
+import json
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+
+import anyio
+
+from remotecraft.errors import StoreError
+from remotecraft.events import EventBus, StateFeed, event_stream, relay_events
+from remotecraft.models import ServerView
+from remotecraft.shared import SharedState
+
+
+def view(status: str = "offline", age: float | None = None) -> ServerView:
+    return ServerView(
+        id="a" * 32,
+        name="survival",
+        version="1.21.5",
+        ram_gb=4,
+        status=status,  # type: ignore[arg-type]
+        created_at=datetime(2026, 7, 17, tzinfo=UTC),
+        status_age_seconds=age,
+    )
+
+
+def test_feed_publishes_only_real_changes() -> None:
+    bus = EventBus()
+    feed = StateFeed(bus)
+
+    with bus.subscribe() as receive:
+        feed.servers([view("offline", 1.0)])
+        feed.servers([view("offline", 9.0)])
+        feed.servers([view("online", 0.0)])
+        feed.host_state({"reachable": True, "ready": True})
+        feed.host_state({"reachable": True, "ready": True})
+        feed.servers([])
+        feed.operation("start", "a" * 32, ok=False, detail="Server is offline")
+
+        events = []
+        while True:
+            try:
+                events.append(receive.receive_nowait())
+            except anyio.WouldBlock:
+                break
+
+    assert [event["type"] for event in events] == [
+        "servers",
+        "servers",
+        "host",
+        "servers",
+        "operation",
+    ]
+    assert events[1]["changed"][0]["status"] == "online"
+    assert events[3] == {"type": "servers", "changed": [], "removed": ["a" * 32]}
+    assert events[4]["detail"] == "Server is offline"
+    assert bus.subscribers == 0
+
+
+def test_slow_subscribers_are_disconnected_instead_of_buffered() -> None:
+    bus = EventBus(max_queued=2)
+
+    with bus.subscribe() as receive:
+        for index in range(3):
+            bus.publish({"type": "host", "index": index})
+        assert bus.subscribers == 0
+        assert receive.receive_nowait()["index"] == 0
+
+
+def test_event_stream_sends_snapshot_changes_and_keepalives() -> None:
+    bus = EventBus()
+    feed = StateFeed(bus)
+    feed.host = {"reachable": True, "ready": True, "tools": {}}
+
+    async def servers() -> list[ServerView]:
+        return [view()]
+
+    async def main() -> list[str]:
+        frames = []
+        stream = event_stream(bus, feed, servers, keepalive_seconds=0.05)
+        frames.append(await anext(stream))
+        feed.servers([view("online")])
+        frames.append(await anext(stream))
+        frames.append(await anext(stream))
+        await stream.aclose()
+        return frames
+
+    snapshot, change, keepalive = anyio.run(main)
+
+    assert snapshot.startswith("event: snapshot\n")
+    payload = json.loads(snapshot.split("data: ", 1)[1])
+    assert payload["servers"][0]["status"] == "offline"
+    assert payload["host"]["ready"] is True
+    assert change.startswith("event: servers\n")
+    assert keepalive == ": keepalive\n\n"
+    assert bus.subscribers == 0
+
+
+def test_relay_delivers_events_published_by_other_workers(tmp_path: Path) -> None:
+    publisher = StateFeed(EventBus(shared=SharedState(tmp_path)))
+    shared = SharedState(tmp_path)
+    feed = StateFeed(EventBus(shared=shared))
+
+    async def main() -> list[dict[str, object]]:
+        with anyio.fail_after(5), feed.bus.subscribe() as receive:
+            async with anyio.create_task_group() as tasks:
+                tasks.start_soon(
+                    functools.partial(relay_events, shared, feed, interval_seconds=0.01)
+                )
+                await anyio.sleep(0.05)
+                publisher.host_state({"reachable": True, "ready": True})
+                feed.operation("start", "a" * 32, ok=True)
+                events = [await receive.receive(), await receive.receive()]
+                tasks.cancel_scope.cancel()
+        return events
+
+    own, relayed = anyio.run(main)
+
+    assert own["type"] == "operation"
+    assert relayed == {"type": "host", "host": {"reachable": True, "ready": True}}
+    assert feed.host == {"reachable": True, "ready": True}
+    # The local operation event is stored for other workers but not relayed back.
+    assert [event["type"] for _seq, event in shared.events_since(0)] == ["host"]
+
+
+def test_shared_events_are_written_off_the_loop_and_relay_survives_errors(
+    tmp_path: Path,
+) -> None:
+    publisher_state = SharedState(tmp_path)
+    writers: list[str] = []
+    append = publisher_state.append_event
+
+    def record_writer(event: dict[str, object]) -> None:
+        writers.append(threading.current_thread().name)
+        append(event)
+
+    publisher_state.append_event = record_writer  # type: ignore[method-assign]
+    publisher = StateFeed(EventBus(shared=publisher_state))
+    shared = SharedState(tmp_path)
+    feed = StateFeed(EventBus(shared=shared))
+    failures = [1]
+    events_since = shared.events_since
+
+    def locked_once(seq: int) -> list[tuple[int, dict[str, object]]]:
+        if failures[0]:
+            failures[0] -= 1
+            raise StoreError("Could not access the shared state database")
+        return events_since(seq)
+
+    shared.events_since = locked_once  # type: ignore[method-assign]
+
+    async def main() -> dict[str, object]:
+        with anyio.fail_after(5), feed.bus.subscribe() as receive:
+            async with anyio.create_task_group() as tasks:
+                tasks.start_soon(
+                    functools.partial(relay_events, shared, feed, interval_seconds=0.01)
+                )
+                await anyio.sleep(0.05)
+                publisher.host_state({"reachable": True, "ready": True})
+                event = await receive.receive()
+                tasks.cancel_scope.cancel()
+        return event
+
+    try:
+        assert anyio.run(main) == {"type": "host", "host": {"reachable": True, "ready": True}}
+    finally:
+        publisher.bus.close()
+    assert failures == [0]
+    assert writers and all(name.startswith("events") for name in writers)
@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from remotecraft.config import Settings
+from remotecraft.errors import RemoteCommandError
+from remotecraft.helper import HELPER_PATH, HELPER_SCRIPT, RemoteHelper, install_command
+
+
+class PipeChannel:
+    """Runs the helper locally and talks to it over its stdin and stdout."""
+
+    def __init__(self, script: Path, root: str) -> None:
+        self.process = subprocess.Popen(  # noqa: S603 - runs the bundled helper script.
+            [sys.executable, "-I", str(script), root],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def sendall(self, data: bytes) -> None:
+        assert self.process.stdin is not None
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    def recv(self, size: int) -> bytes:
+        assert self.process.stdout is not None
+        return self.process.stdout.read1(size)
+
+    def close(self) -> None:
+        self.process.kill()
+        self.process.communicate(timeout=5)
+
+
+@pytest.fixture
+def helper(settings: Settings, tmp_path: Path):  # type: ignore[no-untyped-def]
+    script = tmp_path / "helper.py"
+    script.write_text(HELPER_SCRIPT, encoding="utf-8")
+    root = tmp_path / "servers"
+    channels: list[PipeChannel] = []
+
+    def open_channel() -> PipeChannel:
+        channels.append(PipeChannel(script, str(root)))
+        return channels[-1]
+
+    remote = RemoteHelper(settings, open_channel=open_channel)
+    yield remote, root, channels
+    remote.close()
+
+
+def test_helper_tails_logs_inside_the_servers_root(helper) -> None:  # type: ignore[no-untyped-def]
+    remote, root, channels = helper
+    logs = root / "survival-aaaaaaaa" / "logs"
+    logs.mkdir(parents=True)
+    (logs / "latest.log").write_text("".join(f"line {n}\n" for n in range(1000)), encoding="utf-8")
+
+    assert remote.call("tail", path=str(root / "survival-aaaaaaaa"), lines=2) == {
+        "available": True,
+        "lines": ["line 998", "line 999"],
+    }
+    assert remote.call("tail", path=str(root / "creative-bbbbbbbb"), lines=5) == {
+        "available": False,
+        "lines": [],
+    }
+    assert len(channels) == 1
+
+
+@pytest.mark.parametrize(
+    ("verb", "args", "message"),
+    [
+        ("exec", {"command": "id"}, "unknown verb"),
+        ("tail", {"path": "/etc", "lines": 5}, "outside the servers root"),
+        ("tail", {"path": "SERVERS/../etc", "lines": 5}, "outside the servers root"),
+        ("tail", {"path": "SERVERS/a", "lines": 501}, "between 1 and 500"),
+        ("quit", {"screen": "rc-x; reboot"}, "invalid screen name"),
+        ("stuff", {"screen": "rc-aaaaaaaaaaaa", "text": "say hi\nstop"}, "printable"),
+    ],
+)
+def test_helper_rejects_requests_outside_the_allow_list(
+    helper,  # type: ignore[no-untyped-def]
+    verb: str,
+    args: dict[str, object],
+    message: str,
+) -> None:
+    remote, root, _channels = helper
+    args = {
+        key: value.replace("SERVERS", str(root)) if isinstance(value, str) else value
+        for key, value in args.items()
+    }
+
+    with pytest.raises(RemoteCommandError, match=message):
+        remote.call(verb, **args)
+    assert remote.call("tail", path=str(root / "a"), lines=1)["available"] is False
+
+
+def test_helper_reconnects_after_the_channel_dies(helper) -> None:  # type: ignore[no-untyped-def]
+    remote, root, channels = helper
+    remote.call("tail", path=str(root / "a"), lines=1)
+    channels[0].process.kill()
+    channels[0].process.wait(timeout=5)
+
+    with pytest.raises(RemoteCommandError, match="Lost connection"):
+        remote.call("tail", path=str(root / "a"), lines=1)
+    assert remote.call("tail", path=str(root / "a"), lines=1)["available"] is False
+    assert len(channels) == 2
+
+
+def test_install_command_uploads_pinned_helper_once(tmp_path: Path) -> None:
+    def install() -> None:
+        subprocess.run(  # noqa: S602 - executes the generated installer locally.
+            install_command(), shell=True, cwd=tmp_path, check=True
+        )
+
+    install()
+    installed = tmp_path / HELPER_PATH
+    assert installed.read_text(encoding="utf-8") == HELPER_SCRIPT
+    first = installed.stat().st_mtime_ns
+    os.utime(installed, ns=(first - 10_000_000, first - 10_000_000))
+    install()
+    assert installed.stat().st_mtime_ns == first - 10_000_000
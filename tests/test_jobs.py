@@ -0,0 +1,129 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from remotecraft.errors import ConflictError, NotFoundError
+from remotecraft.jobs import JobManager, Report
+from remotecraft.models import JobView, ServerView
+from remotecraft.shared import SharedState
+
+
+def wait_for(manager: JobManager, job_id: str) -> JobView:
+    for _ in range(500):
+        job = manager.get(job_id)
+        if job.state in ("succeeded", "failed"):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_jobs_report_throttled_progress_and_results() -> None:
+    seen: list[JobView] = []
+    manager = JobManager(max_workers=1, listener=seen.append)
+    server = ServerView.model_validate(
+        {
+            "id": "a" * 32,
+            "name": "survival",
+            "version": "1.21.5",
+            "ram_gb": 4,
+            "status": "offline",
+            "created_at": "2026-07-17T00:00:00Z",
+        }
+    )
+
+    def provision(report: Report) -> ServerView:
+        for done in (0, 1, 5, 10, 500, 1000):
+            report("downloading", done, 1000)
+        return server
+
+    try:
+        job = wait_for(manager, manager.submit("create", provision).id)
+    finally:
+        manager.close()
+
+    assert job.state == "succeeded"
+    assert job.result == server
+    assert job.finished_at is not None
+    downloads = [view.progress.done for view in seen if view.progress.stage == "downloading"]
+    assert downloads == [0, 10, 500, 1000]
+    assert [view.state for view in seen][:2] == ["queued", "running"]
+
+
+def test_jobs_record_domain_errors_and_hide_unexpected_ones(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    manager = JobManager(max_workers=2, history=1)
+
+    def conflict(_report: Report) -> ServerView:
+        raise ConflictError("Remote host is missing required tools: screen")
+
+    def crash(_report: Report) -> ServerView:
+        raise ValueError("secret internals")
+
+    try:
+        failed = wait_for(manager, manager.submit("create", conflict).id)
+        crashed = wait_for(manager, manager.submit("create", crash).id)
+    finally:
+        manager.close()
+
+    assert (failed.error_code, failed.error) == (
+        "conflict",
+        "Remote host is missing required tools: screen",
+    )
+    assert (crashed.error_code, crashed.error) == ("internal_error", "The job failed unexpectedly")
+    # The details stay out of the job but reach the log.
+    [logged] = caplog.records
+    assert logged.getMessage() == f"Job {crashed.id} (create) failed unexpectedly"
+    assert logged.exc_info and "secret internals" in str(logged.exc_info[1])
+    # Only the newest finished job is kept.
+    with pytest.raises(NotFoundError):
+        manager.get(failed.id)
+
+
+def test_jobs_are_visible_to_other_worker_processes(tmp_path: Path) -> None:
+    runner = JobManager(max_workers=1, shared=SharedState(tmp_path))
+    other = JobManager(max_workers=1, shared=SharedState(tmp_path))
+
+    def fail(report: Report) -> ServerView:
+        raise ConflictError("Server is already running")
+
+    try:
+        job = wait_for(runner, runner.submit("create", fail).id)
+    finally:
+        runner.close()
+        other.close()
+
+    assert other.get(job.id) == job
+    with pytest.raises(NotFoundError):
+        other.get("0" * 32)
+
+
+def test_jobs_on_a_named_queue_do_not_block_the_default_queue() -> None:
+    manager = JobManager(max_workers=1, queues={"bulk": 1})
+    release = threading.Event()
+    server = ServerView.model_validate(
+        {
+            "id": "a" * 32,
+            "name": "survival",
+            "version": "1.21.5",
+            "ram_gb": 4,
+            "status": "offline",
+            "created_at": "2026-07-17T00:00:00Z",
+        }
+    )
+
+    def long_bulk(_report: Report) -> ServerView:
+        release.wait(5)
+        return server
+
+    try:
+        bulk = manager.submit("bulk-start", long_bulk, queue="bulk")
+        created = wait_for(manager, manager.submit("create", lambda _report: server).id)
+        assert created.state == "succeeded"
+        assert manager.get(bulk.id).finished_at is None
+        release.set()
+        assert wait_for(manager, bulk.id).state == "succeeded"
+    finally:
+        release.set()
+        manager.close()
@@ -0,0 +1,122 @@
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from remotecraft.errors import ConflictError
+from remotecraft.locks import ServerLocks
+
+
+def wait_until(condition: Callable[[], bool]) -> None:
+    for _ in range(500):
+        if condition():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("condition never became true")
+
+
+def test_calls_on_one_server_run_one_at_a_time() -> None:
+    locks = ServerLocks()
+    release = threading.Event()
+    order: list[str] = []
+    waits: dict[str, float] = {}
+
+    def call(name: str) -> None:
+        def work() -> str:
+            order.append(name)
+            if name == "start":
+                release.wait(5)
+            return name
+
+        _result, waits[name] = locks.run("a" * 32, name, work)
+
+    first = threading.Thread(target=call, args=("start",))
+    first.start()
+    wait_until(lambda: order == ["start"])
+    second = threading.Thread(target=call, args=("delete",))
+    second.start()
+    wait_until(lambda: locks.pending("a" * 32) == 2)
+    release.set()
+    first.join()
+    second.join()
+
+    assert order == ["start", "delete"]
+    assert waits["start"] < waits["delete"]
+    assert locks.pending("a" * 32) == 0
+
+
+def test_identical_overlapping_calls_share_one_run() -> None:
+    locks = ServerLocks()
+    release = threading.Event()
+    runs: list[int] = []
+    results: list[tuple[str, float]] = []
+
+    def work() -> str:
+        runs.append(1)
+        release.wait(5)
+        return "restarted"
+
+    threads = [
+        threading.Thread(target=lambda: results.append(locks.run("a" * 32, "restart", work)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: locks.pending("a" * 32) == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(runs) == 1
+    assert [result for result, _waited in results] == ["restarted"] * 3
+
+
+def test_joined_calls_share_the_error() -> None:
+    locks = ServerLocks()
+    release = threading.Event()
+    errors: list[BaseException] = []
+
+    def work() -> str:
+        release.wait(5)
+        raise ConflictError("Server did not stop within 30 seconds")
+
+    def call() -> None:
+        try:
+            locks.run("a" * 32, "restart", work)
+        except ConflictError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: locks.pending("a" * 32) == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 2
+    assert errors[0] is errors[1]
+    with pytest.raises(ValueError):
+        locks.run("a" * 32, "restart", lambda: int("x"))
+    assert locks.pending("a" * 32) == 0
+
+
+def test_different_servers_run_in_parallel(tmp_path: Path) -> None:
+    locks = ServerLocks(tmp_path / "locks")
+    both = threading.Barrier(2, timeout=5)
+
+    def call(server_id: str) -> None:
+        locks.run(server_id, "start", both.wait)
+
+    threads = [threading.Thread(target=call, args=(letter * 32,)) for letter in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not both.broken
+    assert sorted(path.name for path in (tmp_path / "locks").iterdir()) == [
+        f"{'a' * 32}.lock",
+        f"{'b' * 32}.lock",
+    ]
@@ -0,0 +1,158 @@
+import hashlib
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from remotecraft.errors import RemoteCommandError, UpstreamError
+from remotecraft.mirror import JarMirror
+from remotecraft.models import DownloadSpec
+from remotecraft.ssh import CommandResult, check_result
+
+CONTENT = b"minecraft server jar"
+DOWNLOAD = DownloadSpec(
+    url="https://piston-data.mojang.com/v1/objects/server.jar",
+    sha1=hashlib.sha1(CONTENT, usedforsecurity=False).hexdigest(),
+    size=len(CONTENT),
+)
+
+
+class Catalog:
+    def __init__(self, content: bytes = CONTENT) -> None:
+        self.content = content
+        self.downloads = 0
+
+    def download_jar(self, download: DownloadSpec, destination: Path, *, progress=None) -> None:  # type: ignore[no-untyped-def]
+        self.downloads += 1
+        if hashlib.sha1(self.content, usedforsecurity=False).hexdigest() != download.sha1:
+            raise UpstreamError("Mojang's server jar failed SHA-1 verification")
+        destination.write_bytes(self.content)
+        if progress:
+            progress(len(self.content))
+
+
+class LocalHost:
+    """Runs commands with the local shell and uploads by copying files.
+
+    ``/srv`` in commands and paths is moved under ``root`` so each host has its own disk.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = root
+        self.puts: list[int] = []
+
+    def _local(self, text: str) -> str:
+        return text.replace("/srv", str(self.root)) if self.root else text
+
+    def run(self, command: str, *, check: bool = True, timeout: int | None = None) -> CommandResult:
+        command = self._local(command)
+        completed = subprocess.run(  # noqa: S603 - fixed test script
+            ["/bin/sh", "-c", command], capture_output=True, text=True, timeout=20
+        )
+        result = CommandResult(completed.stdout, completed.stderr, completed.returncode)
+        return check_result(result) if check else result
+
+    def put(
+        self, local_path: Path, remote_path: str, *, offset: int = 0, progress=None, timeout=None
+    ) -> None:  # type: ignore[no-untyped-def]
+        self.puts.append(offset)
+        remote_path = self._local(remote_path)
+        with (
+            local_path.open("rb") as source,
+            open(remote_path, "r+b" if offset else "wb") as target,
+        ):
+            source.seek(offset)
+            target.seek(offset)
+            shutil.copyfileobj(source, target)
+        if progress:
+            progress(local_path.stat().st_size)
+
+
+def test_mirror_downloads_once_and_resumes_an_interrupted_upload(tmp_path: Path) -> None:
+    catalog = Catalog()
+    mirror = JarMirror(tmp_path / "mirror", catalog)  # type: ignore[arg-type]
+    cache = tmp_path / "host" / ".jars"
+    cache.mkdir(parents=True)
+    (cache / f"{DOWNLOAD.sha1}.jar.part").write_bytes(CONTENT[:8])
+    host = LocalHost()
+    progress: list[tuple[str, int | None, int | None]] = []
+
+    pushed = mirror.push(
+        host,  # type: ignore[arg-type]
+        DOWNLOAD,
+        cache=str(cache),
+        report=lambda stage, done, total: progress.append((stage, done, total)),
+    )
+    again = mirror.push(host, DOWNLOAD, cache=str(cache))  # type: ignore[arg-type]
+
+    assert (pushed, again) == (True, False)
+    assert host.puts == [8]
+    assert catalog.downloads == 1
+    assert (cache / f"{DOWNLOAD.sha1}.jar").read_bytes() == CONTENT
+    assert not (cache / f"{DOWNLOAD.sha1}.jar.part").exists()
+    assert progress == [
+        ("downloading", len(CONTENT), len(CONTENT)),
+        ("uploading", len(CONTENT), len(CONTENT)),
+    ]
+
+
+def test_mirror_discards_an_upload_that_fails_verification(tmp_path: Path) -> None:
+    mirror = JarMirror(tmp_path / "mirror", Catalog())  # type: ignore[arg-type]
+    cache = tmp_path / "host"
+    cache.mkdir()
+    # A stale partial from a different file: resuming it cannot produce the right hash.
+    (cache / f"{DOWNLOAD.sha1}.jar.part").write_bytes(b"corrupted")
+
+    with pytest.raises(RemoteCommandError, match="SHA-1"):
+        mirror.push(LocalHost(), DOWNLOAD, cache=str(cache))  # type: ignore[arg-type]
+
+    assert list(cache.iterdir()) == []
+
+
+def test_mirror_pushes_to_several_hosts_in_parallel(tmp_path: Path) -> None:
+    catalog = Catalog()
+    mirror = JarMirror(tmp_path / "mirror", catalog)  # type: ignore[arg-type]
+
+    def target(name: str):  # type: ignore[no-untyped-def]
+        @contextmanager
+        def session():  # type: ignore[no-untyped-def]
+            yield LocalHost(tmp_path / name)
+
+        return session
+
+    results = mirror.push_all(DOWNLOAD, [target("a"), target("b")], cache="/srv/minecraft/.jars")
+
+    assert results == [True, True]
+    assert catalog.downloads == 1
+    for name in ("a", "b"):
+        jar = tmp_path / name / "minecraft" / ".jars" / f"{DOWNLOAD.sha1}.jar"
+        assert jar.read_bytes() == CONTENT
+
+
+def test_concurrent_pushes_of_one_jar_to_one_host_upload_it_once(tmp_path: Path) -> None:
+    mirror = JarMirror(tmp_path / "mirror", Catalog())  # type: ignore[arg-type]
+    cache = tmp_path / "host"
+    host = LocalHost()
+    uploading = threading.Event()
+    original = host.put
+
+    def slow_put(*args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        uploading.set()
+        # Without the lock the second push would now truncate or delete this upload.
+        threading.Event().wait(0.1)
+        original(*args, **kwargs)
+
+    host.put = slow_put  # type: ignore[method-assign]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(mirror.push, host, DOWNLOAD, cache=str(cache))  # type: ignore[arg-type]
+        uploading.wait(5)
+        second = executor.submit(mirror.push, host, DOWNLOAD, cache=str(cache))  # type: ignore[arg-type]
+
+    assert (first.result(), second.result()) == (True, False)
+    assert host.puts == [0]
+    assert (cache / f"{DOWNLOAD.sha1}.jar").read_bytes() == CONTENT
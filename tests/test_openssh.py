@@ -0,0 +1,185 @@
+import dataclasses
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from remotecraft.config import Settings
+from remotecraft.errors import ConfigurationError, RemoteCommandError
+from remotecraft.helper import HELPER_PATH, RemoteHelper, helper_command, install_command
+from remotecraft.openssh import OpenSSHMaster
+from remotecraft.ssh import BatchStep
+
+FAKE_SSH = """#!{python}
+import json, os, subprocess, sys
+state = {state!r}
+args = sys.argv[1:]
+with open(os.path.join(state, "calls"), "a") as log:
+    log.write(json.dumps(args) + "\\n")
+split = args.index("--")
+options, rest = args[:split], args[split + 2:]
+master = os.path.join(state, "master")
+if "-O" in options:
+    action = options[options.index("-O") + 1]
+    if action == "exit" and os.path.exists(master):
+        os.remove(master)
+    sys.exit(0 if os.path.exists(master) or action == "exit" else 255)
+if "-M" in options:
+    if os.path.exists(os.path.join(state, "unreachable")):
+        sys.stderr.write("ssh: connect to host: Connection refused\\n")
+        sys.exit(255)
+    open(master, "w").close()
+    sys.exit(0)
+sys.exit(subprocess.call(["sh", "-c", rest[0]]))
+"""
+
+
+@pytest.fixture
+def fake_ssh(tmp_path: Path) -> tuple[Path, Path]:
+    state = tmp_path / "ssh-state"
+    state.mkdir()
+    script = tmp_path / "ssh"
+    script.write_text(FAKE_SSH.format(python=sys.executable, state=str(state)), encoding="utf-8")
+    script.chmod(0o755)
+    return script, state
+
+
+def calls(state: Path) -> list[list[str]]:
+    return [json.loads(line) for line in (state / "calls").read_text().splitlines()]
+
+
+def test_openssh_master_pins_host_keys_and_multiplexes(settings: Settings, fake_ssh) -> None:
+    script, state = fake_ssh
+    settings = dataclasses.replace(settings, ssh_port=2222, ssh_use_agent=False)
+    master = OpenSSHMaster(settings, ssh_binary=str(script))
+
+    try:
+        with master() as remote:
+            assert remote.run("printf hello").stdout == "hello"
+        with master() as remote:
+            assert remote.run("echo again").stdout == "again\n"
+
+        first = calls(state)[0]
+        assert "StrictHostKeyChecking=yes" in first
+        assert "BatchMode=yes" in first
+        assert f'UserKnownHostsFile="{settings.known_hosts_path}"' in first
+        assert f"ControlPath={master.control_dir}/%C" in first
+        assert "IdentityAgent=none" in first
+        assert "Port=2222" in first
+        assert "User=minecraft" in first
+        # One check and one master start, then both commands reuse the master.
+        assert [call[call.index("--") + 2 :] for call in calls(state)] == [
+            [],
+            [],
+            ["printf hello"],
+            ["echo again"],
+        ]
+        assert "check" in calls(state)[0] and "-M" in calls(state)[1]
+    finally:
+        master.close()
+    assert not master.control_dir.exists()
+    assert not (state / "master").exists()
+
+
+def test_openssh_sessions_stream_run_many_and_batch(settings: Settings, fake_ssh) -> None:
+    script, _state = fake_ssh
+    master = OpenSSHMaster(settings, ssh_binary=str(script))
+
+    try:
+        with master() as remote:
+            results = remote.run_many(["echo one", "echo two >&2; exit 3"], check=False)
+            assert [(r.stdout, r.stderr, r.exit_status) for r in results] == [
+                ("one\n", "", 0),
+                ("", "two\n", 3),
+            ]
+            lines = [chunk.text for chunk in remote.stream("printf 'a\\nb\\n'").lines()]
+            assert lines == ["a", "b"]
+            batch = remote.run_batch([BatchStep("echo probe"), BatchStep("false")])
+            assert [result.exit_status for result in batch] == [0, 1]
+            with pytest.raises(RemoteCommandError, match="exceeded 8 bytes"):
+                remote.stream("head -c 64 /dev/zero", max_bytes=8).result()
+            with pytest.raises(RemoteCommandError, match="timed out"):
+                remote.run("sleep 5", timeout=1)
+    finally:
+        master.close()
+
+
+def test_openssh_uploads_with_sftp_over_the_master(
+    settings: Settings, fake_ssh, tmp_path: Path
+) -> None:
+    script, _state = fake_ssh
+    fake_sftp = tmp_path / "sftp"
+    fake_sftp.write_text(
+        f"#!/bin/sh\nprintf '%s\\n' \"$@\" > {tmp_path}/argv\ncat > {tmp_path}/batch\n",
+        encoding="utf-8",
+    )
+    fake_sftp.chmod(0o755)
+    master = OpenSSHMaster(settings, ssh_binary=str(script), sftp_binary=str(fake_sftp))
+    local = tmp_path / 'my "server".jar'
+    local.write_bytes(b"jar")
+    sent: list[int] = []
+
+    try:
+        with master() as remote:
+            remote.put(local, "/srv/minecraft/.jars/a.jar.part", offset=2, progress=sent.append)
+    finally:
+        master.close()
+
+    argv = (tmp_path / "argv").read_text().splitlines()
+    assert argv[-3:] == ["-b", "-", settings.ssh_host]
+    assert f"ControlPath={master.control_dir}/%C" in argv
+    assert "-T" not in argv
+    assert (tmp_path / "batch").read_text() == (
+        f'reput "{tmp_path}/my \\"server\\".jar" "/srv/minecraft/.jars/a.jar.part"\n'
+    )
+    assert sent == [3]
+
+
+def test_remote_helper_runs_over_the_openssh_master(
+    settings: Settings, fake_ssh, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    script, state = fake_ssh
+    # The fake ssh runs commands in the working directory, which stands in for $HOME.
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "servers"
+    logs = root / "survival-aaaaaaaa" / "logs"
+    logs.mkdir(parents=True)
+    (logs / "latest.log").write_text("ready\n", encoding="utf-8")
+    settings = dataclasses.replace(settings, servers_root=str(root))
+    master = OpenSSHMaster(settings, ssh_binary=str(script))
+    helper = RemoteHelper(settings, master=master)
+
+    try:
+        for _ in range(2):
+            assert helper.call("tail", path=str(logs.parent), lines=1) == {
+                "available": True,
+                "lines": ["ready"],
+            }
+    finally:
+        helper.close()
+        master.close()
+    assert (tmp_path / HELPER_PATH).is_file()
+    # One install and one long-lived helper process serve both calls.
+    commands = [call[call.index("--") + 2 :] for call in calls(state)]
+    assert [command for command in commands if command] == [
+        [install_command()],
+        [helper_command(settings)],
+    ]
+
+
+def test_openssh_connection_failures_are_transport_errors(settings: Settings, fake_ssh) -> None:
+    script, state = fake_ssh
+    (state / "unreachable").touch()
+    master = OpenSSHMaster(settings, ssh_binary=str(script))
+
+    try:
+        with pytest.raises(ConnectionError, match="Connection refused"), master():
+            pass
+    finally:
+        master.close()
+
+
+def test_openssh_master_rejects_password_authentication(settings: Settings) -> None:
+    with pytest.raises(ConfigurationError, match="password authentication"):
+        OpenSSHMaster(dataclasses.replace(settings, ssh_password="secret"))
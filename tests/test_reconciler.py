@@ -0,0 +1,223 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+
+from remotecraft.api import create_app
+from remotecraft.config import Settings
+from remotecraft.errors import StoreError
+from remotecraft.models import ServerRecord
+from remotecraft.reconciler import StatusReconciler, next_status
+from remotecraft.service import MinecraftService
+from remotecraft.shared import FileLock
+from remotecraft.ssh import CommandResult
+from remotecraft.store import ServerStore
+
+
+class Host:
+    def __init__(self) -> None:
+        self.sessions: set[str] = set()
+        self.probes = 0
+        self.during_probe = lambda: None
+
+    def run(self, command: str, *, check: bool = True, timeout: int | None = None):
+        assert command == "screen -ls"
+        self.probes += 1
+        self.during_probe()
+        listing = "".join(f"\t123.{name}\t(Detached)\n" for name in sorted(self.sessions))
+        return CommandResult(listing, "", 0)
+
+
+def build(settings: Settings, host: Host) -> MinecraftService:
+    @contextmanager
+    def session_factory():
+        yield host
+
+    return MinecraftService(
+        settings,
+        ServerStore(settings.data_dir),
+        None,  # type: ignore[arg-type]
+        session_factory=session_factory,
+    )
+
+
+def add(store: ServerStore, letter: str, status: str) -> ServerRecord:
+    return store.add(
+        ServerRecord(
+            id=letter * 32,
+            name=f"server-{letter}",
+            version="1.21.5",
+            ram_gb=2,
+            path=f"/srv/minecraft/server-{letter}",
+            screen_name=f"rc-{letter * 12}",
+            jar_sha1="b" * 40,
+            status=status,  # type: ignore[arg-type]
+        )
+    )
+
+
+def test_next_status_keeps_stopping_until_the_session_exits() -> None:
+    assert next_status("starting", True) == "online"
+    assert next_status("stopping", True) == "stopping"
+    assert next_status("stopping", False) == "offline"
+    assert next_status("online", False) == "offline"
+
+
+def test_reconciler_persists_transitions_from_one_probe(settings: Settings) -> None:
+    host = Host()
+    service = build(settings, host)
+    now = [100.0]
+    reconciler = StatusReconciler(service, interval_seconds=10, clock=lambda: now[0])
+    add(service.store, "a", "starting")
+    add(service.store, "b", "stopping")
+    add(service.store, "c", "online")
+    host.sessions = {"rc-aaaaaaaaaaaa", "rc-bbbbbbbbbbbb"}
+
+    assert reconciler.reconcile()
+
+    assert host.probes == 1
+    assert [record.status for record in service.store.list()] == ["online", "stopping", "offline"]
+    now[0] = service.status.clock() + 2
+    views = reconciler.list_servers()
+    assert [view.status for view in views] == ["online", "stopping", "offline"]
+    assert all(view.status_age_seconds is not None for view in views)
+
+    service.store.update("a" * 32, status="stopping")
+    assert reconciler.list_servers()[0].status_age_seconds is None
+    assert host.probes == 1
+
+
+def test_reconciler_drops_passes_that_overlap_lifecycle_operations(settings: Settings) -> None:
+    host = Host()
+    service = build(settings, host)
+    reconciler = StatusReconciler(service, interval_seconds=10)
+    add(service.store, "a", "online")
+    host.sessions = {"rc-aaaaaaaaaaaa"}
+
+    def killed_during_probe() -> None:
+        with service.status.changing():
+            host.sessions.clear()
+            service.store.update("a" * 32, status="offline")
+
+    host.during_probe = killed_during_probe
+
+    assert not reconciler.reconcile()
+    assert service.store.get("a" * 32).status == "offline"
+
+
+def test_server_list_route_is_served_without_ssh(settings: Settings) -> None:
+    @contextmanager
+    def unreachable():
+        raise AssertionError("the request path must not open SSH")
+        yield
+
+    service = MinecraftService(
+        settings,
+        ServerStore(settings.data_dir),
+        None,  # type: ignore[arg-type]
+        session_factory=unreachable,
+    )
+    add(service.store, "a", "starting")
+    readers: list[str] = []
+    original = service.store.list
+
+    def list_records() -> list[ServerRecord]:
+        readers.append(threading.current_thread().name)
+        return original()
+
+    service.store.list = list_records  # type: ignore[method-assign]
+    client = TestClient(create_app(settings, service))
+
+    response = client.get("/api/servers", headers={"Authorization": f"Bearer {settings.api_token}"})
+
+    assert response.status_code == 200
+    assert response.json()[0]["status"] == "starting"
+    assert response.json()[0]["status_age_seconds"] is None
+    # Store reads run on worker threads, never on the event loop.
+    assert readers
+    assert all(name.startswith("AnyIO worker") for name in readers)
+
+
+def test_only_the_leader_worker_reconciles(settings: Settings) -> None:
+    host = Host()
+    service = build(settings, host)
+    add(service.store, "a", "starting")
+    lock_path = settings.data_dir / "reconciler.lock"
+    passes = {"leader": 0, "follower": 0}
+
+    def reconciler(name: str) -> functools.partial[object]:
+        async def after_pass(reachable: bool) -> None:
+            passes[name] += 1
+
+        worker = StatusReconciler(service, interval_seconds=0.01, leader=FileLock(lock_path))
+        return functools.partial(worker.run, after_pass=after_pass)
+
+    async def main() -> dict[str, int]:
+        leader_scope = anyio.CancelScope()
+
+        async def lead() -> None:
+            with leader_scope:
+                await reconciler("leader")()
+
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(lead)
+            await anyio.sleep(0.05)
+            tasks.start_soon(reconciler("follower"))
+            await anyio.sleep(0.1)
+            before = dict(passes)
+            # The leader's process exits; the follower takes over.
+            leader_scope.cancel()
+            await anyio.sleep(0.1)
+            tasks.cancel_scope.cancel()
+        return before
+
+    before = anyio.run(main)
+
+    assert before["leader"] > 0
+    assert before["follower"] == 0
+    assert passes["follower"] > 0
+
+
+def test_store_failures_do_not_stop_the_reconciler(
+    settings: Settings, caplog: pytest.LogCaptureFixture
+) -> None:
+    host = Host()
+    service = build(settings, host)
+    add(service.store, "a", "starting")
+    failures = {"reconcile": 1, "publish": 1}
+    original = service.store.list
+    reported: list[bool] = []
+
+    def flaky_list() -> list[ServerRecord]:
+        if failures["reconcile"]:
+            failures["reconcile"] -= 1
+            raise StoreError("Could not read server metadata")
+        return original()
+
+    async def after_pass(reachable: bool) -> None:
+        reported.append(reachable)
+        if failures["publish"]:
+            failures["publish"] -= 1
+            raise StoreError("Could not read server metadata")
+
+    service.store.list = flaky_list  # type: ignore[method-assign]
+    reconciler = StatusReconciler(service, interval_seconds=0.01)
+
+    async def main() -> None:
+        with anyio.move_on_after(0.2):
+            await reconciler.run(after_pass=after_pass)
+
+    anyio.run(main)
+
+    # The failed pass is not reported as an unreachable host, and neither failure
+    # stops later passes.
+    assert len(reported) >= 2
+    assert all(reported)
+    assert service.store.get("a" * 32).status == "offline"
+    assert [record.message for record in caplog.records] == [
+        "Reconciler pass could not use the server metadata",
+        "Could not publish the reconciled server state",
+    ]
@@ -1,14 +1,35 @@
+import hashlib
+import os
 import shlex
-from collections.abc import Callable
+import subprocess
+import threading
+import time
+from collections.abc import Callable, Iterator
 from contextlib import contextmanager
+from pathlib import Path
 
+import anyio
+import paramiko
 import pytest
 
 from remotecraft.config import Settings
-from remotecraft.errors import ConflictError, InvalidRequestError, RemoteCommandError
-from remotecraft.models import DownloadSpec, ServerRecord
-from remotecraft.service import MinecraftService
-from remotecraft.ssh import CommandResult
+from remotecraft.errors import (
+    ConflictError,
+    InvalidRequestError,
+    NotFoundError,
+    RemoteCommandError,
+    StoreError,
+)
+from remotecraft.models import BulkResult, DownloadSpec, ServerRecord, ServerView
+from remotecraft.service import (
+    BOOT_EXITED,
+    BOOT_WAIT,
+    DOWNLOAD_SCRIPT,
+    JAR_CACHE_GC,
+    AsyncMinecraftService,
+    MinecraftService,
+)
+from remotecraft.ssh import BatchStep, CommandResult, CommandStream, StreamName
 from remotecraft.store import ServerStore
 
 
@@ -22,12 +43,27 @@ class Catalog:
         )
 
 
+class FakeStream(CommandStream):
+    def __init__(self, result: CommandResult, max_bytes: int) -> None:
+        super().__init__(max_bytes=max_bytes)
+        self.outcome = result
+
+    def _read(self) -> Iterator[tuple[StreamName, bytes]]:
+        yield "stdout", self.outcome.stdout.encode()
+        yield "stderr", self.outcome.stderr.encode()
+        self.exit_status = self.outcome.exit_status
+
+    def close(self) -> None:
+        return None
+
+
 class FakeRemote:
     def __init__(
         self,
         responder: Callable[[str, bool, int | None], CommandResult] | None = None,
     ) -> None:
         self.commands: list[tuple[str, bool, int | None]] = []
+        self.batches: list[list[str]] = []
         self.responder = responder or self._default_response
 
     @staticmethod
@@ -45,13 +81,39 @@ class FakeRemote:
             raise RemoteCommandError(result.stderr or "command failed")
         return result
 
-
-def build_service(
-    settings: Settings,
-    remote: FakeRemote,
-    *,
-    sleeper: Callable[[float], None] = lambda _seconds: None,
-) -> MinecraftService:
+    def run_many(
+        self, commands: list[str], *, check: bool = True, timeout: int | None = None
+    ) -> list[CommandResult]:
+        self.batches.append(list(commands))
+        return [self.run(command, check=check, timeout=timeout) for command in commands]
+
+    def run_batch(
+        self, steps: list[BatchStep], *, timeout: int | None = None
+    ) -> list[CommandResult]:
+        self.batches.append([step.command for step in steps])
+        results: list[CommandResult] = []
+        for step in steps:
+            try:
+                result = self.run(step.command, check=False, timeout=timeout)
+            except RemoteCommandError as exc:
+                result = CommandResult("", str(exc), 1)
+            results.append(result)
+            if step.required and result.exit_status != 0:
+                break
+        return results
+
+    def stream(
+        self, command: str, *, timeout: int | None = None, max_bytes: int = 1024
+    ) -> FakeStream:
+        self.commands.append((command, False, timeout))
+        try:
+            result = self.responder(command, False, timeout)
+        except RemoteCommandError as exc:
+            result = CommandResult("", str(exc), 1)
+        return FakeStream(result, max_bytes)
+
+
+def build_service(settings: Settings, remote: FakeRemote) -> MinecraftService:
     @contextmanager
     def session_factory():
         yield remote
@@ -61,7 +123,6 @@ def build_service(
         ServerStore(settings.data_dir),
         Catalog(),  # type: ignore[arg-type]
         session_factory=session_factory,
-        sleeper=sleeper,
     )
 
 
@@ -101,6 +162,17 @@ def test_empty_inventory_does_not_open_ssh(settings: Settings) -> None:
     assert calls == 0
 
 
+def test_get_server_reads_metadata_without_opening_ssh(settings: Settings) -> None:
+    remote = FakeRemote()
+    service = build_service(settings, remote)
+    record = add_record(service.store)
+
+    assert service.get_server(record.id).name == "survival"
+    with pytest.raises(NotFoundError):
+        service.get_server("b" * 32)
+    assert remote.commands == []
+
+
 def test_host_check_reports_required_tools(settings: Settings) -> None:
     remote = FakeRemote()
     service = build_service(settings, remote)
@@ -112,18 +184,99 @@ def test_host_check_reports_required_tools(settings: Settings) -> None:
 
 
 def test_create_server_verifies_download_and_records_metadata(settings: Settings) -> None:
-    remote = FakeRemote()
-    service = build_service(settings, remote)
+    def respond(command: str, check: bool, timeout: int | None) -> CommandResult:
+        if "curl --fail" in command:
+            return CommandResult("bytes=0\nbytes=600\nbytes=1234\n", "", 0)
+        return FakeRemote._default_response(command, check, timeout)
 
-    created = service.create_server(name="survival", version="1.21.5", ram_gb=4, accept_eula=True)
+    remote = FakeRemote(respond)
+    service = build_service(settings, remote)
+    progress: list[tuple[str, int | None, int | None]] = []
+
+    created = service.create_server(
+        name="survival",
+        version="1.21.5",
+        ram_gb=4,
+        accept_eula=True,
+        progress=lambda stage, done=None, total=None: progress.append((stage, done, total)),
+    )
 
     record = service.store.get(created.id)
     assert created.status == "offline"
     assert record.path.startswith("/srv/minecraft/survival-")
     setup = next(command for command, _, _ in remote.commands if "curl --fail" in command)
+    assert len(remote.batches) == 1
+    assert remote.batches[0][0].startswith("for tool in")
     assert "sha1sum --check --status" in setup
     assert "eula=true" in setup
     assert "piston-data.mojang.com" in setup
+    assert ("downloading", 600, 1234) in progress
+    assert progress[-1] == ("downloading", 1234, 1234)
+
+
+def test_create_server_pushes_mirrored_jar_before_linking_it(settings: Settings) -> None:
+    events: list[str] = []
+
+    class Mirror:
+        def fetch(self, download: DownloadSpec, report: Callable[..., None]) -> None:
+            events.append("fetch")
+            report("downloading", download.size, download.size)
+
+        def push(self, remote: FakeRemote, download: DownloadSpec, *, cache: str, report) -> bool:  # type: ignore[no-untyped-def]
+            events.append(f"push {cache}")
+            return True
+
+    @contextmanager
+    def session_factory():  # type: ignore[no-untyped-def]
+        events.append("connect")
+        yield remote
+
+    remote = FakeRemote(
+        lambda command, check, timeout: (
+            CommandResult("cached\n", "", 0)
+            if "curl --fail" in command
+            else FakeRemote._default_response(command, check, timeout)
+        )
+    )
+    service = MinecraftService(
+        settings,
+        ServerStore(settings.data_dir),
+        Catalog(),  # type: ignore[arg-type]
+        session_factory=session_factory,
+        mirror=Mirror(),  # type: ignore[arg-type]
+    )
+    progress: list[str] = []
+
+    service.create_server(
+        name="survival",
+        version="1.21.5",
+        ram_gb=4,
+        accept_eula=True,
+        progress=lambda stage, done=None, total=None: progress.append(stage),
+    )
+
+    assert events == ["fetch", "connect", "push /srv/minecraft/.jars"]
+    assert progress == ["resolving version", "downloading", "checking host", "using cached jar"]
+
+
+def test_create_server_that_loses_the_name_race_removes_its_directory(
+    settings: Settings,
+) -> None:
+    def respond(command: str, check: bool, timeout: int | None) -> CommandResult:
+        if "curl --fail" in command:
+            # Another create of the same name finishes while this one downloads.
+            add_record(service.store)
+            return CommandResult("", "", 0)
+        return FakeRemote._default_response(command, check, timeout)
+
+    remote = FakeRemote(respond)
+    service = build_service(settings, remote)
+
+    with pytest.raises(ConflictError, match="already exists"):
+        service.create_server(name="Survival", version="1.21.5", ram_gb=4, accept_eula=True)
+
+    assert remote.commands[-1][0].startswith("rm -rf -- /srv/minecraft/Survival-")
+    assert [record.name for record in service.store.list()] == ["survival"]
 
 
 @pytest.mark.parametrize(
@@ -193,16 +346,51 @@ def test_create_rolls_back_remote_directory_on_setup_failure(settings: Settings)
     assert any(command.startswith("rm -rf --") for command, _, _ in remote.commands)
 
 
+def test_create_cleans_up_after_store_and_transport_failures(
+    settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    remote = FakeRemote()
+    service = build_service(settings, remote)
+
+    def fail_add(_record: ServerRecord) -> ServerRecord:
+        raise StoreError("disk full")
+
+    monkeypatch.setattr(service.store, "add", fail_add)
+    with pytest.raises(StoreError, match="disk full"):
+        service.create_server(name="survival", version="1.21.5", ram_gb=4, accept_eula=True)
+    assert remote.commands[-1][0].startswith("rm -rf --")
+
+    def drop(command: str, _check: bool, _timeout: int | None) -> CommandResult:
+        if "curl --fail" in command or command.startswith("rm -rf"):
+            raise OSError("Socket is closed")
+        return FakeRemote._default_response(command, True, None)
+
+    remote.responder = drop
+    # The failed cleanup is swallowed so the transport error is what surfaces.
+    with pytest.raises(OSError, match="Socket is closed"):
+        service.create_server(name="survival", version="1.21.5", ram_gb=4, accept_eula=True)
+    assert remote.commands[-1][0].startswith("rm -rf --")
+
+
 def test_list_servers_uses_screen_inventory(settings: Settings) -> None:
     def respond(command: str, _check: bool, _timeout: int | None) -> CommandResult:
         if command == "screen -ls":
             return CommandResult("123.rc-aaaaaaaaaaaa (Detached)\n", "", 0)
         return CommandResult("", "", 0)
 
-    service = build_service(settings, FakeRemote(respond))
-    add_record(service.store)
+    remote = FakeRemote(respond)
+    service = build_service(settings, remote)
+    record = add_record(service.store)
 
+    view = service.list_servers()[0]
+    assert view.status == "online"
+    assert view.status_age_seconds is not None
     assert service.list_servers()[0].status == "online"
+    assert [command for command, _, _ in remote.commands].count("screen -ls") == 1
+
+    service.kill_server(record.id)
+    service.list_servers()
+    assert [command for command, _, _ in remote.commands].count("screen -ls") == 2
 
 
 def test_start_stop_kill_and_restart_server(settings: Settings) -> None:
@@ -214,6 +402,9 @@ def test_start_stop_kill_and_restart_server(settings: Settings) -> None:
             return CommandResult("", "", 0 if running else 1)
         if command.startswith("screen -DmS"):
             running = True
+        if command.startswith("rc_pid="):
+            waited, running = running, False
+            return CommandResult("waited_ms=1500\n" if waited else "", "", 0)
         if " -X stuff " in command or " -X quit" in command:
             running = False
         return CommandResult("", "", 0)
@@ -226,18 +417,307 @@ def test_start_stop_kill_and_restart_server(settings: Settings) -> None:
     assert service.start_server(record.id).status == "online"
     assert service.stop_server(record.id).status == "stopping"
     assert service.stop_server(record.id).status == "offline"
-    assert service.restart_server(record.id).status == "starting"
+    restarted = service.restart_server(record.id)
+    assert (restarted.status, restarted.shutdown_seconds) == ("starting", None)
+    restarted = service.restart_server(record.id)
+    assert (restarted.status, restarted.shutdown_seconds) == ("starting", 1.5)
+    stopped = service.stop_server(record.id, wait=True)
+    assert (stopped.status, stopped.shutdown_seconds) == ("offline", 1.5)
     assert service.kill_server(record.id).status == "offline"
     assert any("exec java -Xms1G -Xmx4G" in command for command, _, _ in remote.commands)
+    assert [len(batch) for batch in remote.batches] == [2, 2, 2, 2, 1]
+
+
+def test_overlapping_operations_on_one_server_are_serialized_and_coalesced(
+    settings: Settings,
+) -> None:
+    restarting = threading.Event()
+    release = threading.Event()
+
+    def respond(command: str, _check: bool, _timeout: int | None) -> CommandResult:
+        if command.startswith("rc_pid="):
+            restarting.set()
+            release.wait(5)
+        return CommandResult("", "", 1 if " -Q select " in command else 0)
+
+    remote = FakeRemote(respond)
+    service = build_service(settings, remote)
+    record = add_record(service.store)
+    views: dict[str, ServerView] = {}
+
+    def call(name: str, operation: Callable[[], ServerView]) -> threading.Thread:
+        thread = threading.Thread(target=lambda: views.update({name: operation()}))
+        thread.start()
+        return thread
+
+    threads = [call("restart", lambda: service.restart_server(record.id))]
+    assert restarting.wait(5)
+    threads += [
+        call("double-click", lambda: service.restart_server(record.id)),
+        call("kill", lambda: service.kill_server(record.id)),
+    ]
+    for _ in range(500):
+        if service.locks.pending(record.id) == 3:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    commands = [command for command, _, _ in remote.commands]
+    # One restart ran; the kill waited for it instead of interleaving with it.
+    assert [command.startswith("rc_pid=") for command in commands] == [True, False, False]
+    assert commands[1].startswith("screen -DmS ")
+    assert commands[2].endswith(" -X quit")
+    assert views["double-click"].status == views["restart"].status == "starting"
+    assert views["restart"].lock_wait_seconds < views["kill"].lock_wait_seconds
+    assert views["kill"].status == "offline"
+    assert views["kill"].lock_wait_seconds > 0
+
+
+def test_bulk_operations_share_one_session_and_report_each_server(settings: Settings) -> None:
+    remote = FakeRemote()
+    sessions = 0
+
+    @contextmanager
+    def session_factory():
+        nonlocal sessions
+        sessions += 1
+        yield remote
+
+    service = MinecraftService(
+        settings,
+        ServerStore(settings.data_dir),
+        Catalog(),  # type: ignore[arg-type]
+        session_factory=session_factory,
+    )
+    first = add_record(service.store)
+    second = service.store.add(
+        first.model_copy(update={"id": "c" * 32, "name": "creative", "screen_name": "rc-cccccc"})
+    )
+
+    seen: list[BulkResult] = []
+    results = service.run_bulk(
+        "start", [first.id, second.id, "d" * 32, first.id], on_result=seen.append
+    )
+
+    assert sessions == 1
+    assert sorted(result.id for result in seen) == sorted(result.id for result in results)
+    assert [(result.id, result.ok, result.error) for result in results] == [
+        (first.id, True, None),
+        (second.id, True, None),
+        ("d" * 32, False, "not_found"),
+    ]
+    assert {result.server.status for result in results if result.server} == {"starting"}
+    assert sum(command.startswith("screen -DmS") for command, _, _ in remote.commands) == 2
+    with pytest.raises(InvalidRequestError, match="Only starts"):
+        service.run_bulk("stop", [first.id], stagger=1)
+
+    def refuse(command: str, check: bool, timeout: int | None) -> CommandResult:
+        if "rc-cccccc" in command and command.startswith("screen -S"):
+            raise paramiko.ChannelException(1, "Administratively prohibited")
+        return FakeRemote._default_response(command, check, timeout)
+
+    remote.responder = refuse
+    results = service.run_bulk("kill", [first.id, second.id])
+
+    assert [(result.ok, result.error) for result in results] == [
+        (True, None),
+        (False, "remote_command_failed"),
+    ]
+    assert "Administratively prohibited" in (results[1].detail or "")
+
+
+def test_staggered_starts_wait_for_each_server_to_boot(settings: Settings) -> None:
+    def respond(command: str, _check: bool, _timeout: int | None) -> CommandResult:
+        if command.startswith("stat -c %i"):
+            return CommandResult("42\n", "", 0)
+        if command.startswith("rc_log="):
+            if "rc-cccccc" in command:
+                return CommandResult("", "", 3)
+            return CommandResult("booted_s=7\n", "", 0)
+        return CommandResult("", "", 1 if " -Q select " in command else 0)
+
+    remote = FakeRemote(respond)
+    service = build_service(settings, remote)
+    first = add_record(service.store)
+    second = service.store.add(
+        first.model_copy(update={"id": "c" * 32, "name": "creative", "screen_name": "rc-cccccc"})
+    )
+
+    results = service.run_bulk("start", [first.id, second.id], stagger=1)
+
+    assert [(result.ok, result.boot_seconds) for result in results] == [(True, 7.0), (False, None)]
+    assert results[1].detail == "Server exited while starting"
+    steps = [
+        ("start" if command.startswith("screen") else "boot", "rc-aaaa" in command)
+        for command, _, _ in remote.commands
+        if command.startswith(("screen -DmS", "rc_log="))
+    ]
+    # With one boot slot the second server starts only after the first has booted.
+    assert steps == [("start", True), ("boot", True), ("start", False), ("boot", False)]
+    # Both logs are probed side by side before the first start.
+    assert [command.startswith("stat -c %i") for command in remote.batches[0]] == [True, True]
+    assert remote.commands[0][0].startswith("stat -c %i")
+    boot_wait = next(command for command, _, _ in remote.commands if command.startswith("rc_log="))
+    assert "!= 42 ]" in boot_wait
+
+
+def test_boot_wait_ignores_the_previous_log_and_notices_exits(tmp_path: Path) -> None:
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    log = logs / "latest.log"
+    log.write_text("[10:00:00] [Server thread/INFO]: Done (4.2s)!\n", encoding="utf-8")
+    fake_screen = tmp_path / "screen"
+    fake_screen.write_text('#!/bin/sh\nexit "${RC_SCREEN_STATUS:-0}"\n', encoding="utf-8")
+    fake_screen.chmod(0o755)
+
+    def wait(before: str, screen_status: int = 0) -> subprocess.CompletedProcess[str]:
+        script = BOOT_WAIT.format(
+            log=shlex.quote(str(log)), before=shlex.quote(before), screen="rc-x", seconds=1
+        )
+        return subprocess.run(  # noqa: S603 - runs the template under test
+            ["/bin/sh", "-c", script],
+            capture_output=True,
+            text=True,
+            env={
+                **os.environ,
+                "PATH": f"{tmp_path}:{os.environ['PATH']}",
+                "RC_SCREEN_STATUS": str(screen_status),
+            },
+            check=False,
+        )
+
+    old_inode = str(log.stat().st_ino)
+    assert wait(old_inode).returncode == 124
+    assert wait(old_inode, screen_status=1).returncode == BOOT_EXITED
+    # Log4j rolls the old log aside before it creates a new latest.log.
+    log.rename(logs / "2026-10-17-1.log")
+    log.write_text("[10:05:00] [Server thread/INFO]: Done (3.9s)!\n", encoding="utf-8")
+    booted = wait(old_inode)
+    assert (booted.returncode, booted.stdout) == (0, "booted_s=0\n")
 
 
 def test_restart_times_out_when_server_will_not_stop(settings: Settings) -> None:
-    remote = FakeRemote(lambda _command, _check, _timeout: CommandResult("", "", 0))
+    def respond(command: str, _check: bool, _timeout: int | None) -> CommandResult:
+        return CommandResult("waited_ms=30004\n", "", 124 if command.startswith("rc_pid=") else 0)
+
+    remote = FakeRemote(respond)
     service = build_service(settings, remote)
     record = add_record(service.store)
 
     with pytest.raises(ConflictError, match="30 seconds"):
         service.restart_server(record.id)
+    # The wait happens on the host: one batch, never a start, no polling round-trips.
+    assert len(remote.commands) == 1
+    assert remote.commands[0][2] >= 45
+
+
+def test_stop_and_wait_blocks_on_the_host_until_the_process_exits(
+    settings: Settings, tmp_path: Path
+) -> None:
+    server = subprocess.Popen(["sleep", "30"])  # noqa: S607 - stands in for java
+    # Reap it as soon as it dies, as screen does for java; tail --pid waits on zombies.
+    threading.Thread(target=server.wait, daemon=True).start()
+    fake_screen = tmp_path / "screen"
+    fake_screen.write_text(
+        "#!/bin/sh\n"
+        f'if [ "$1" = -ls ]; then printf "\\t%s.rc-aaaaaaaaaaaa\\t(Detached)\\n" {server.pid}; fi\n'
+        f'if [ "$3" = -X ]; then (sleep 0.3; kill {server.pid}) & fi\n',
+        encoding="utf-8",
+    )
+    fake_screen.chmod(0o755)
+    environment = {**os.environ, "PATH": f"{tmp_path}:{os.environ['PATH']}"}
+    script = MinecraftService._stop_and_wait("rc-aaaaaaaaaaaa")
+
+    try:
+        waited = subprocess.run(  # noqa: S603 - fixed test script
+            ["/bin/sh", "-c", script], env=environment, capture_output=True, text=True, timeout=20
+        )
+    finally:
+        server.kill()
+
+    assert waited.returncode == 0, waited.stderr
+    assert 250 <= int(waited.stdout.strip().removeprefix("waited_ms=")) < 10_000
+
+
+def test_stop_and_wait_rejects_screen_names_it_did_not_generate() -> None:
+    with pytest.raises(RemoteCommandError, match="invalid screen name"):
+        MinecraftService._stop_and_wait("rc-aaaa'; rm -rf ~; '")
+
+
+def run_download(tmp_path: Path, sha1: str) -> subprocess.CompletedProcess[str]:
+    # The fake curl writes "jar" to its --output file and logs that it ran.
+    fake_curl = tmp_path / "bin" / "curl"
+    fake_curl.parent.mkdir(exist_ok=True)
+    fake_curl.write_text(
+        "#!/bin/sh\n"
+        f"echo called >> {tmp_path}/curl.log\n"
+        'while [ "$1" != --output ]; do shift; done\n'
+        'printf jar > "$2"\n',
+        encoding="utf-8",
+    )
+    fake_curl.chmod(0o755)
+    server = tmp_path / "root" / "survival-aaaaaaaa"
+    server.mkdir(parents=True, exist_ok=True)
+    script = DOWNLOAD_SCRIPT.format(
+        cache=shlex.quote(str(tmp_path / "root" / ".jars")),
+        path=shlex.quote(str(server)),
+        url="https://example.invalid/server.jar",
+        sha1=sha1,
+    )
+    environment = {**os.environ, "PATH": f"{fake_curl.parent}:{os.environ['PATH']}"}
+    return subprocess.run(  # noqa: S603 - fixed test script
+        ["/bin/sh", "-c", script], env=environment, capture_output=True, text=True, timeout=20
+    )
+
+
+def test_download_script_fills_the_jar_cache_once_and_links_from_it(tmp_path: Path) -> None:
+    sha1 = hashlib.sha1(b"jar").hexdigest()  # noqa: S324 - Mojang's integrity hash
+    first = run_download(tmp_path, sha1)
+    (tmp_path / "root" / "survival-aaaaaaaa" / "server.jar").unlink()
+    second = run_download(tmp_path, sha1)
+
+    assert first.returncode == 0, first.stderr
+    assert "cached" not in first.stdout.split()
+    assert second.returncode == 0, second.stderr
+    assert second.stdout.strip() == "cached"
+    assert (tmp_path / "curl.log").read_text().split() == ["called"]
+    assert (tmp_path / "root" / ".jars" / f"{sha1}.jar").read_bytes() == b"jar"
+    assert (tmp_path / "root" / "survival-aaaaaaaa" / "server.jar").read_bytes() == b"jar"
+    assert (tmp_path / "root" / "survival-aaaaaaaa" / "eula.txt").read_text() == "eula=true\n"
+
+
+def test_download_script_rejects_a_jar_with_the_wrong_hash(tmp_path: Path) -> None:
+    failed = run_download(tmp_path, "c" * 40)
+
+    assert failed.returncode != 0
+    assert "SHA-1 verification" in failed.stderr
+    assert list((tmp_path / "root" / ".jars").iterdir()) == []
+    assert not (tmp_path / "root" / "survival-aaaaaaaa" / "server.jar").exists()
+
+
+def test_jar_cache_gc_removes_unreferenced_and_abandoned_files(tmp_path: Path) -> None:
+    old = time.time() - 2 * 3600
+    for name in ("a" * 40 + ".jar", "b" * 40 + ".jar", "c" * 40 + ".jar.part.42"):
+        (tmp_path / name).write_bytes(b"jar")
+        os.utime(tmp_path / name, (old, old))
+    (tmp_path / ("d" * 40 + ".jar")).write_bytes(b"jar")
+    script = JAR_CACHE_GC.format(cache=shlex.quote(str(tmp_path)), keep="a" * 40, grace=60)
+
+    collected = subprocess.run(  # noqa: S603 - fixed test script
+        ["/bin/sh", "-c", script], capture_output=True, text=True, timeout=20
+    )
+
+    assert collected.returncode == 0, collected.stderr
+    assert sorted(collected.stdout.split()) == [
+        "removed=" + "b" * 40 + ".jar",
+        "removed=" + "c" * 40 + ".jar.part.42",
+    ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "a" * 40 + ".jar",
+        "d" * 40 + ".jar",
+    ]
 
 
 def test_send_command_quotes_payload_as_one_shell_argument(settings: Settings) -> None:
@@ -272,7 +752,8 @@ def test_delete_requires_confirmation_offline_state_and_safe_parent(settings: Se
 
     assert service.delete_server(record.id, confirm="survival").name == "survival"
     assert service.store.list() == []
-    assert remote.commands[-1][0].startswith("rm -rf --")
+    assert remote.commands[-2][0].startswith("rm -rf --")
+    assert "/srv/minecraft/.jars" in remote.commands[-1][0]
 
     unsafe = add_record(service.store, path="/home/minecraft/survival-aaaaaaaa")
     with pytest.raises(RemoteCommandError, match="outside"):
@@ -304,3 +785,107 @@ def test_get_logs_handles_present_and_missing_files(settings: Settings) -> None:
     assert service.get_logs(record.id, 30) == {"lines": [], "available": False}
     with pytest.raises(InvalidRequestError):
         service.get_logs(record.id, 501)
+
+
+def test_async_facade_bounds_concurrent_remote_work(settings: Settings) -> None:
+    lock = threading.Lock()
+    active = peak = 0
+
+    def respond(command: str, _check: bool, _timeout: int | None) -> CommandResult:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        threading.Event().wait(0.02)
+        with lock:
+            active -= 1
+        return FakeRemote._default_response(command, _check, _timeout)
+
+    service = AsyncMinecraftService(build_service(settings, FakeRemote(respond)), concurrency=2)
+    results: list[dict[str, object]] = []
+
+    async def probe() -> None:
+        results.append(await service.check_host())
+
+    async def main() -> None:
+        async with anyio.create_task_group() as group:
+            for _ in range(6):
+                group.start_soon(probe)
+
+    anyio.run(main)
+
+    assert len(results) == 6
+    assert all(result["ready"] for result in results)
+    assert peak == 2
+
+
+def test_async_facade_keeps_catalog_and_validation_off_the_ssh_limiter(
+    settings: Settings,
+) -> None:
+    class Releases(Catalog):
+        def list_releases(self, limit: int) -> list[str]:
+            return ["1.21.5"][:limit]
+
+    service = build_service(settings, FakeRemote())
+    service.catalog = Releases()  # type: ignore[assignment]
+    facade = AsyncMinecraftService(service, concurrency=1)
+
+    async def main() -> tuple[list[str], tuple[str, str, int]]:
+        # Every SSH slot is taken, as by a long remote command.
+        async with facade.limiter:
+            with anyio.fail_after(5):
+                releases = await facade.list_releases(1)
+                validated = await facade.validate_new_server(
+                    name="survival", version="1.21.5", ram_gb=4, accept_eula=True
+                )
+        return releases, validated
+
+    assert anyio.run(main) == (["1.21.5"], ("survival", "1.21.5", 4))
+
+
+class FakeHelper:
+    def __init__(self, sessions: set[str]) -> None:
+        self.sessions = sessions
+        self.calls: list[tuple[str, dict[str, object]]] = []
+
+    def call(self, verb: str, **args: object) -> dict[str, object]:
+        self.calls.append((verb, args))
+        running = args.get("screen") in self.sessions
+        if verb == "status-all":
+            return {"sessions": sorted(self.sessions)}
+        if verb == "start":
+            return {"started": not running}
+        if verb in {"stop", "stuff"}:
+            return {"sent": running}
+        if verb == "tail":
+            return {"available": True, "lines": ["ready"]}
+        return {}
+
+
+def test_helper_mode_uses_verbs_instead_of_shell_commands(settings: Settings) -> None:
+    remote = FakeRemote()
+    helper = FakeHelper({"rc-aaaaaaaaaaaa"})
+    service = build_service(settings, remote)
+    service.helper = helper  # type: ignore[assignment]
+    record = add_record(service.store)
+
+    assert service.list_servers()[0].status == "online"
+    assert service.start_server(record.id).status == "online"
+    assert service.send_command(record.id, "list") == {"status": "sent"}
+    assert service.get_logs(record.id, 10) == {"available": True, "lines": ["ready"]}
+    assert service.stop_server(record.id).status == "stopping"
+    helper.sessions.clear()
+    with pytest.raises(ConflictError, match="offline"):
+        service.send_command(record.id, "list")
+    assert service.kill_server(record.id).status == "offline"
+
+    assert remote.commands == []
+    assert [verb for verb, _ in helper.calls] == [
+        "status-all",
+        "start",
+        "stuff",
+        "tail",
+        "stop",
+        "stuff",
+        "quit",
+    ]
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+from remotecraft.models import JobView
+from remotecraft.shared import FileLock, SharedState
+
+
+def test_file_locks_exclude_writers_and_share_readers(tmp_path: Path) -> None:
+    path = tmp_path / "operations.lock"
+    reader, other_reader, writer = FileLock(path), FileLock(path), FileLock(path)
+
+    assert reader.acquire(shared=True)
+    assert other_reader.acquire(shared=True, blocking=False)
+    assert not writer.acquire(blocking=False)
+    reader.release()
+    other_reader.release()
+    with writer:
+        assert writer.held
+        assert not reader.acquire(shared=True, blocking=False)
+    assert not writer.held
+
+
+def test_snapshots_are_only_published_for_the_current_generation(tmp_path: Path) -> None:
+    first, second = SharedState(tmp_path), SharedState(tmp_path)
+
+    assert first.snapshot() is None
+    first.publish_snapshot(frozenset({"rc-aaaaaaaaaaaa"}), 12.5, 0)
+    assert second.snapshot() == (frozenset({"rc-aaaaaaaaaaaa"}), 12.5, 0)
+
+    second.bump_generation()
+    first.publish_snapshot(frozenset(), 13.0, 0)
+
+    assert first.generation() == 1
+    assert second.snapshot() == (frozenset({"rc-aaaaaaaaaaaa"}), 12.5, 0)
+    first.close()
+    second.close()
+
+
+def test_quiescent_is_false_while_any_operation_runs(tmp_path: Path) -> None:
+    first, second = SharedState(tmp_path), SharedState(tmp_path)
+
+    with first.operation():
+        with second.quiescent() as quiet:
+            assert not quiet
+    with second.quiescent() as quiet:
+        assert quiet
+
+
+def test_jobs_and_events_are_visible_to_other_instances(tmp_path: Path) -> None:
+    first, second = SharedState(tmp_path), SharedState(tmp_path)
+    job = JobView(id="f" * 32, kind="create", state="running")
+
+    first.save_job(job)
+    start = second.last_event()
+    first.append_event({"type": "host", "host": {"reachable": True}})
+    second.append_event({"type": "host", "host": {"reachable": False}})
+
+    assert second.load_job(job.id) == job
+    assert second.load_job("0" * 32) is None
+    assert [event for _seq, event in second.events_since(start)] == [
+        {"type": "host", "host": {"reachable": True}}
+    ]
+    assert [event["host"] for _seq, event in first.events_since(start)] == [{"reachable": False}]
@@ -1,3 +1,7 @@
+import itertools
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import replace
 from pathlib import Path
 
@@ -6,30 +10,75 @@ import pytest
 
 from remotecraft.config import Settings
 from remotecraft.errors import ConfigurationError, RemoteCommandError
-from remotecraft.ssh import CommandResult, ParamikoRemoteSession
+from remotecraft.ssh import (
+    HOST_KEYS,
+    BatchStep,
+    CommandResult,
+    KnownHostsCache,
+    ParamikoRemoteSession,
+    SSHConnectionPool,
+    execute_batch,
+)
 
 
 class Channel:
-    def __init__(self, status: int) -> None:
+    """Delivers canned output a few bytes at a time, like a slow remote command."""
+
+    def __init__(
+        self, stdout: bytes = b"", stderr: bytes = b"", status: int = 0, *, piece: int = 3
+    ) -> None:
+        self.stdout = [stdout[i : i + piece] for i in range(0, len(stdout), piece)]
+        self.stderr = [stderr[i : i + piece] for i in range(0, len(stderr), piece)]
         self.status = status
+        self.closed = False
+        self.reads = 0
+
+    def recv_ready(self) -> bool:
+        return bool(self.stdout)
+
+    @property
+    def eof_received(self) -> bool:
+        return not self.stdout and not self.stderr
+
+    def recv(self, _size: int) -> bytes:
+        self.reads += 1
+        return self.stdout.pop(0) if self.stdout else b""
+
+    def recv_stderr_ready(self) -> bool:
+        return bool(self.stderr)
+
+    def recv_stderr(self, _size: int) -> bytes:
+        self.reads += 1
+        return self.stderr.pop(0) if self.stderr else b""
+
+    def exit_status_ready(self) -> bool:
+        return not self.stdout and not self.stderr
 
     def recv_exit_status(self) -> int:
         return self.status
 
+    def close(self) -> None:
+        self.closed = True
+
 
 class Stream:
-    def __init__(self, payload: bytes, status: int = 0) -> None:
-        self.payload = payload
-        self.channel = Channel(status)
+    def __init__(self, channel: Channel) -> None:
+        self.channel = channel
 
-    def read(self) -> bytes:
-        return self.payload
+
+class Transport:
+    def __init__(self) -> None:
+        self.active = True
+
+    def is_active(self) -> bool:
+        return self.active
 
 
 class Client:
     def __init__(self, *, status: int = 0) -> None:
         self.status = status
         self.closed = False
+        self.transport = Transport()
         self.policy = None
         self.connect_kwargs: dict[str, object] = {}
         self.loaded_host_files: list[str] = []
@@ -48,11 +97,18 @@ class Client:
 
     def close(self) -> None:
         self.closed = True
+        self.transport.active = False
+
+    def get_transport(self) -> Transport:
+        return self.transport
 
     def exec_command(self, command: str, *, timeout: int):
+        if not self.transport.active:
+            raise paramiko.SSHException("SSH session not active")
         assert command == "whoami"
         assert timeout == 12
-        return None, Stream(b"minecraft\n", self.status), Stream(b"failed\n")
+        stream = Stream(Channel(b"minecraft\n", b"failed\n", self.status))
+        return None, stream, stream
 
 
 def test_session_uses_known_hosts_reject_policy_and_closes(
@@ -66,7 +122,8 @@ def test_session_uses_known_hosts_reject_policy_and_closes(
 
     assert result == CommandResult("minecraft\n", "failed\n", 0)
     assert isinstance(client.policy, paramiko.RejectPolicy)
-    assert client.loaded_host_files == [str(settings.known_hosts_path)]
+    assert client._host_keys is HOST_KEYS.load(settings.known_hosts_path)  # type: ignore[attr-defined, arg-type]
+    assert client.loaded_host_files == []
     assert client.connect_kwargs["hostname"] == settings.ssh_host
     assert client.closed is True
 
@@ -83,6 +140,43 @@ def test_session_rejects_missing_known_hosts_file(
         ParamikoRemoteSession(bad_settings).__enter__()
 
 
+HOST_LINE = (
+    "minecraft.example.test ssh-ed25519 "
+    "AAAAC3NzaC1lZDI1NTE5AAAAIOMqqnkVzrm0SdG6UOoqKLsabgH5C9okWi0dh2l9GKJl\n"
+)
+
+
+def test_known_hosts_are_parsed_once_until_the_file_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    known_hosts = tmp_path / "known_hosts"
+    known_hosts.write_text(HOST_LINE, encoding="utf-8")
+    parsed: list[str] = []
+    original = paramiko.HostKeys
+
+    def counting_host_keys(filename: str | None = None) -> paramiko.HostKeys:
+        parsed.append(str(filename))
+        return original(filename)
+
+    monkeypatch.setattr(paramiko, "HostKeys", counting_host_keys)
+    cache = KnownHostsCache()
+
+    first = cache.load(known_hosts, required=True)
+    assert cache.load(known_hosts, required=True) is first
+    assert first.lookup("minecraft.example.test") is not None
+    assert parsed == [str(known_hosts)]
+
+    known_hosts.write_text(HOST_LINE.replace("minecraft.", "backup."), encoding="utf-8")
+    refreshed = cache.load(known_hosts, required=True)
+    assert refreshed.lookup("backup.example.test") is not None
+    assert refreshed.lookup("minecraft.example.test") is None
+    assert len(parsed) == 2
+
+    assert len(cache.load(tmp_path / "absent")) == 0
+    with pytest.raises(ConfigurationError, match="does not exist"):
+        cache.load(tmp_path / "absent", required=True)
+
+
 def test_run_requires_connection_and_reports_remote_failure(settings: Settings) -> None:
     remote = ParamikoRemoteSession(settings)
     with pytest.raises(RemoteCommandError, match="not connected"):
@@ -91,3 +185,291 @@ def test_run_requires_connection_and_reports_remote_failure(settings: Settings)
     remote.client = Client(status=1)  # type: ignore[assignment]
     with pytest.raises(RemoteCommandError, match="failed"):
         remote.run("whoami", timeout=12)
+
+
+class ShellClient(Client):
+    """Answers ``echo`` and ``exit`` commands and records channel opening order."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: list[str] = []
+
+    def exec_command(self, command: str, *, timeout: int):
+        self.events.append(f"open {command} {timeout}")
+        word, _, argument = command.partition(" ")
+        status = int(argument) if word == "exit" else 0
+        channel = Channel(
+            f"{argument}\n".encode() if word == "echo" else b"",
+            b"boom\n" if status else b"",
+            status,
+        )
+        original = channel.recv_exit_status
+
+        def recv_exit_status() -> int:
+            self.events.append(f"wait {command}")
+            return original()
+
+        channel.recv_exit_status = recv_exit_status  # type: ignore[method-assign]
+        stream = Stream(channel)
+        return None, stream, stream
+
+
+class SFTPClient:
+    """Writes to local files, like an SFTP server with the remote root at ``/``."""
+
+    def __init__(self) -> None:
+        self.opened: list[str] = []
+        self.timeout: float | None = None
+
+    def __enter__(self) -> "SFTPClient":
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        return None
+
+    def get_channel(self) -> "SFTPClient":
+        return self
+
+    def settimeout(self, timeout: float) -> None:
+        self.timeout = timeout
+
+    def open(self, path: str, mode: str):  # type: ignore[no-untyped-def]
+        self.opened.append(mode)
+        handle = open(path, mode)
+        handle.set_pipelined = lambda _pipelined: None  # type: ignore[attr-defined]
+        return handle
+
+
+def test_put_uploads_over_sftp_and_resumes_from_offset(settings: Settings, tmp_path: Path) -> None:
+    local = tmp_path / "server.jar"
+    local.write_bytes(b"0123456789")
+    target = tmp_path / "remote.jar.part"
+    target.write_bytes(b"0123")
+    sftp = SFTPClient()
+    client = Client()
+    client.open_sftp = lambda: sftp  # type: ignore[attr-defined]
+    remote = ParamikoRemoteSession(settings)
+    remote.client = client  # type: ignore[assignment]
+    sent: list[int] = []
+
+    remote.put(local, str(target), offset=4, progress=sent.append, timeout=40)
+    assert target.read_bytes() == b"0123456789"
+    remote.put(local, str(target))
+
+    assert target.read_bytes() == b"0123456789"
+    assert sftp.opened == ["r+b", "wb"]
+    assert sent == [10]
+    assert sftp.timeout == settings.command_timeout_seconds
+
+
+def test_run_many_opens_every_channel_before_collecting(settings: Settings) -> None:
+    remote = ParamikoRemoteSession(settings)
+    client = ShellClient()
+    remote.client = client  # type: ignore[assignment]
+
+    results = remote.run_many(["echo one", "echo two", "exit 3"], check=False, timeout=7)
+
+    assert [result.stdout for result in results] == ["one\n", "two\n", ""]
+    assert [result.exit_status for result in results] == [0, 0, 3]
+    assert client.events == [
+        "open echo one 7",
+        "open echo two 7",
+        "open exit 3 7",
+        "wait echo one",
+        "wait echo two",
+        "wait exit 3",
+    ]
+    with pytest.raises(RemoteCommandError, match="boom"):
+        remote.run_many(["echo one", "exit 1"])
+
+
+def test_stream_yields_decoded_output_incrementally(settings: Settings) -> None:
+    channel = Channel("héllo\nwörld".encode(), b"warn\n", 0, piece=1)
+    remote = ParamikoRemoteSession(settings)
+    remote.client = Client()  # type: ignore[assignment]
+    remote.client.exec_command = lambda *_args, **_kwargs: (  # type: ignore[method-assign]
+        None,
+        Stream(channel),
+        None,
+    )
+
+    with remote.stream("cat file") as output:
+        lines = list(output.lines())
+
+    assert [(line.stream, line.text) for line in lines] == [
+        ("stdout", "héllo"),
+        ("stderr", "warn"),
+        ("stdout", "wörld"),
+    ]
+    assert output.exit_status == 0
+    assert channel.closed is True
+
+
+class LateChannel(Channel):
+    """Reports its exit status before the last frame has been read, as servers may."""
+
+    eof_received = True
+
+    def __init__(self) -> None:
+        super().__init__(b"first\nlast\n", status=3, piece=6)
+
+    def recv_ready(self) -> bool:
+        return self.reads == 0
+
+    def exit_status_ready(self) -> bool:
+        return True
+
+
+def test_stream_reads_output_that_arrives_after_the_exit_status(settings: Settings) -> None:
+    channel = LateChannel()
+    remote = ParamikoRemoteSession(settings)
+    remote.client = Client()  # type: ignore[assignment]
+    remote.client.exec_command = lambda *_args, **_kwargs: (  # type: ignore[method-assign]
+        None,
+        Stream(channel),
+        None,
+    )
+
+    with remote.stream("cat file") as output:
+        result = output.result(check=False)
+
+    assert result.stdout == "first\nlast\n"
+    assert result.exit_status == 3
+
+
+def test_stream_enforces_output_cap(settings: Settings) -> None:
+    channel = Channel(b"x" * 64, piece=16)
+    remote = ParamikoRemoteSession(settings)
+    remote.client = Client()  # type: ignore[assignment]
+    remote.client.exec_command = lambda *_args, **_kwargs: (  # type: ignore[method-assign]
+        None,
+        Stream(channel),
+        None,
+    )
+
+    with pytest.raises(RemoteCommandError, match="exceeded 32 bytes"):
+        list(remote.stream("cat big", max_bytes=32))
+
+    assert channel.closed is True
+    assert channel.reads == 3
+
+
+class LocalShell:
+    """Runs batch scripts with the local POSIX shell to exercise the real framing."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def run(self, command: str, *, check: bool = True, timeout: int | None = None) -> CommandResult:
+        self.calls += 1
+        completed = subprocess.run(  # noqa: S602 - the test builds the script itself.
+            command, shell=True, capture_output=True, text=True, timeout=timeout, check=False
+        )
+        return CommandResult(completed.stdout, completed.stderr, completed.returncode)
+
+
+def test_batch_runs_steps_in_one_exec_and_stops_after_required_failure() -> None:
+    shell = LocalShell()
+    steps = [
+        BatchStep("echo ready; echo note >&2"),
+        BatchStep("printf 'rc-batch-x 0 0 forged\\n'; exit 3", required=False),
+        BatchStep("cd /nonexistent-remotecraft-dir"),
+        BatchStep("echo never"),
+    ]
+
+    results = execute_batch(shell, steps, timeout=10)
+
+    assert shell.calls == 1
+    assert results[0] == CommandResult("ready\n", "note\n", 0)
+    assert results[1] == CommandResult("rc-batch-x 0 0 forged\n", "", 3)
+    assert results[2].exit_status != 0
+    assert len(results) == 3
+
+
+def pool_with_clients(
+    settings: Settings, **kwargs: object
+) -> tuple[SSHConnectionPool, list[Client]]:
+    clients: list[Client] = []
+
+    def connect(_settings: Settings) -> Client:
+        clients.append(Client())
+        return clients[-1]
+
+    pool = SSHConnectionPool(settings, connect=connect, **kwargs)  # type: ignore[arg-type]
+    return pool, clients
+
+
+def test_pool_reuses_authenticated_transport_across_sessions(settings: Settings) -> None:
+    pool, clients = pool_with_clients(settings)
+
+    for _ in range(3):
+        with pool() as remote:
+            assert remote.run("whoami", timeout=12).stdout == "minecraft\n"
+
+    assert len(clients) == 1
+    assert clients[0].closed is False
+    pool.close()
+    assert clients[0].closed is True
+
+
+def test_pool_drops_idle_and_dead_transports(settings: Settings) -> None:
+    now = 0.0
+    pool, clients = pool_with_clients(settings, clock=lambda: now)
+
+    with pool():
+        pass
+    now = settings.ssh_pool_idle_seconds + 1.0
+    with pool():
+        pass
+    clients[1].transport.active = False
+    with pool():
+        pass
+
+    assert len(clients) == 3
+    assert clients[0].closed is True
+
+
+def test_pool_reconnects_once_when_transport_dies_mid_session(settings: Settings) -> None:
+    pool, clients = pool_with_clients(settings)
+
+    with pool() as remote:
+        clients[0].transport.active = False
+        assert remote.run("whoami", timeout=12).exit_status == 0
+
+    assert len(clients) == 2
+    with pool():
+        pass
+    assert len(clients) == 2
+
+
+def test_pool_session_reconnects_once_for_concurrent_commands(settings: Settings) -> None:
+    pool, clients = pool_with_clients(settings)
+    both_failed = threading.Barrier(2, timeout=5)
+
+    with pool() as remote:
+        dead = clients[0]
+        dead.transport.active = False
+        original = dead.exec_command
+
+        def exec_command(command: str, *, timeout: int):
+            both_failed.wait()
+            return original(command, timeout=timeout)
+
+        dead.exec_command = exec_command  # type: ignore[method-assign]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(lambda _: remote.run("whoami", timeout=12), range(2)))
+
+    assert [result.exit_status for result in results] == [0, 0]
+    assert len(clients) == 2
+
+
+def test_pool_enforces_size_limit(settings: Settings) -> None:
+    ticks = itertools.count(step=5)
+    limited = replace(settings, ssh_pool_size=1, command_timeout_seconds=1)
+    pool, clients = pool_with_clients(limited, clock=lambda: float(next(ticks)))
+
+    with pool():
+        with pytest.raises(RemoteCommandError, match="busy"):
+            pool.acquire()
+
+    assert len(clients) == 1
@@ -0,0 +1,121 @@
+import threading
+from pathlib import Path
+
+from remotecraft.errors import RemoteCommandError
+from remotecraft.shared import SharedState
+from remotecraft.status import StatusCache
+
+
+def test_status_cache_serves_snapshots_until_they_expire() -> None:
+    now = [0.0]
+    fetches: list[float] = []
+
+    def fetch() -> set[str]:
+        fetches.append(now[0])
+        return {"rc-aaaaaaaaaaaa"}
+
+    cache = StatusCache(fetch, ttl_seconds=5, clock=lambda: now[0])
+
+    assert cache.get().sessions == {"rc-aaaaaaaaaaaa"}
+    now[0] = 3.0
+    assert cache.age(cache.get()) == 3.0
+    now[0] = 5.0
+    cache.get()
+    cache.invalidate()
+    cache.get()
+
+    assert fetches == [0.0, 5.0, 5.0]
+
+
+def test_status_cache_coalesces_concurrent_refreshes() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    calls = 0
+
+    def fetch() -> set[str]:
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait(5)
+        return {"rc-aaaaaaaaaaaa"}
+
+    cache = StatusCache(fetch, ttl_seconds=5)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(5)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == 1
+    assert len(results) == 5
+    assert len({id(result) for result in results}) == 1
+
+
+def test_status_cache_shares_failures_and_drops_refreshes_that_predate_invalidation() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    outcomes: list[BaseException | set[str]] = []
+
+    def failing() -> set[str]:
+        started.set()
+        release.wait(5)
+        raise RemoteCommandError("screen is unavailable")
+
+    cache = StatusCache(failing, ttl_seconds=5)
+
+    def get() -> None:
+        try:
+            outcomes.append(set(cache.get().sessions))
+        except RemoteCommandError as exc:
+            outcomes.append(exc)
+
+    leader = threading.Thread(target=get)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=get)
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert [str(outcome) for outcome in outcomes] == ["screen is unavailable"] * 2
+
+    def racing() -> set[str]:
+        cache.invalidate()
+        return {"stale"}
+
+    # The caller still gets its own result, but it is not cached for the next one.
+    cache.fetch = racing
+    assert cache.get().sessions == {"stale"}
+    cache.fetch = lambda: {"fresh"}
+    assert cache.get().sessions == {"fresh"}
+
+
+def test_shared_status_caches_span_worker_processes(tmp_path: Path) -> None:
+    fetches: list[str] = []
+
+    def worker(name: str) -> StatusCache:
+        def fetch() -> set[str]:
+            fetches.append(name)
+            return {"rc-aaaaaaaaaaaa"}
+
+        return StatusCache(fetch, ttl_seconds=5, shared=SharedState(tmp_path))
+
+    first, second = worker("first"), worker("second")
+
+    first.get()
+    second.get()
+    with first.changing():
+        snapshot = second.get()
+        with second.settled(snapshot) as settled:
+            assert not settled
+    second.get()
+    snapshot = first.get()
+    with first.settled(snapshot) as settled:
+        assert settled
+
+    # One fetch before the operation, one during it, one after it.
+    assert fetches == ["first", "second", "second"]
@@ -1,10 +1,24 @@
+import json
+import os
+import threading
+import time
 from pathlib import Path
 
 import pytest
 
-from remotecraft.errors import NotFoundError, StoreError
+from remotecraft import store as store_module
+from remotecraft.errors import ConflictError, NotFoundError, StoreError
 from remotecraft.models import ServerRecord
-from remotecraft.store import ServerStore
+from remotecraft.store import (
+    MIGRATIONS,
+    JournaledServerStore,
+    ServerStore,
+    SqliteServerStore,
+)
+
+BACKENDS = pytest.mark.parametrize(
+    "backend", [ServerStore, JournaledServerStore, SqliteServerStore]
+)
 
 
 def record(server_id: str = "a" * 32, name: str = "survival") -> ServerRecord:
@@ -19,8 +33,16 @@ def record(server_id: str = "a" * 32, name: str = "survival") -> ServerRecord:
     )
 
 
-def test_store_round_trip_update_and_remove(tmp_path: Path) -> None:
-    store = ServerStore(tmp_path)
+def reopen(store: ServerStore, backend: type[ServerStore], data_dir: Path) -> ServerStore:
+    """Open the data directory again, as a restarted process would."""
+    if isinstance(store, JournaledServerStore):
+        store.close()  # A journal has one owning process at a time.
+    return backend(data_dir)
+
+
+@BACKENDS
+def test_store_round_trip_update_and_remove(tmp_path: Path, backend: type[ServerStore]) -> None:
+    store = backend(tmp_path)
     created = store.add(record())
 
     assert store.get(created.id) == created
@@ -28,22 +50,25 @@ def test_store_round_trip_update_and_remove(tmp_path: Path) -> None:
 
     updated = store.update(created.id, status="online")
     assert updated.status == "online"
-    assert ServerStore(tmp_path).get(created.id).status == "online"
+    store = reopen(store, backend, tmp_path)
+    assert store.get(created.id).status == "online"
 
     assert store.remove(created.id).id == created.id
     assert store.list() == []
 
 
-def test_store_rejects_duplicate_ids(tmp_path: Path) -> None:
-    store = ServerStore(tmp_path)
+@BACKENDS
+def test_store_rejects_duplicate_ids(tmp_path: Path, backend: type[ServerStore]) -> None:
+    store = backend(tmp_path)
     store.add(record())
 
     with pytest.raises(StoreError, match="Duplicate"):
         store.add(record(name="creative"))
 
 
-def test_store_reports_missing_records(tmp_path: Path) -> None:
-    store = ServerStore(tmp_path)
+@BACKENDS
+def test_store_reports_missing_records(tmp_path: Path, backend: type[ServerStore]) -> None:
+    store = backend(tmp_path)
 
     with pytest.raises(NotFoundError):
         store.get("f" * 32)
@@ -57,11 +82,199 @@ def test_store_rejects_corrupt_metadata(tmp_path: Path) -> None:
         store.list()
 
 
-def test_store_validates_updates(tmp_path: Path) -> None:
-    store = ServerStore(tmp_path)
+@BACKENDS
+def test_store_validates_updates(tmp_path: Path, backend: type[ServerStore]) -> None:
+    store = backend(tmp_path)
     created = store.add(record())
 
     with pytest.raises(StoreError, match="Invalid server metadata update"):
         store.update(created.id, status="teleporting")
 
     assert store.get(created.id).status == "offline"
+
+
+@BACKENDS
+def test_store_names_are_unique_ignoring_case(tmp_path: Path, backend: type[ServerStore]) -> None:
+    store = backend(tmp_path)
+    created = store.add(record())
+
+    assert store.find_by_name("SURVIVAL") == created
+    assert store.find_by_name("creative") is None
+    with pytest.raises(ConflictError, match="already exists"):
+        store.add(record("c" * 32, name="Survival"))
+    assert store.list() == [created]
+
+
+def test_sqlite_store_imports_existing_json_metadata(tmp_path: Path) -> None:
+    legacy = ServerStore(tmp_path)
+    first = legacy.add(record())
+    second = legacy.add(record("c" * 32, name="creative"))
+
+    store = SqliteServerStore(tmp_path)
+    legacy.remove(first.id)
+
+    assert store.list() == [first, second]
+    # Only a new database imports: later edits to the JSON file are not merged again.
+    assert SqliteServerStore(tmp_path).list() == [first, second]
+
+
+def test_sqlite_store_retries_a_failed_import_on_the_next_open(tmp_path: Path) -> None:
+    legacy = tmp_path / "servers.json"
+    first = record().model_dump(mode="json")
+    duplicate = record("c" * 32, name="SURVIVAL").model_dump(mode="json")
+    legacy.write_text(json.dumps([first, duplicate]), encoding="utf-8")
+
+    with pytest.raises(ConflictError):
+        SqliteServerStore(tmp_path)
+
+    legacy.write_text(json.dumps([first]), encoding="utf-8")
+    assert [server.id for server in SqliteServerStore(tmp_path).list()] == [first["id"]]
+
+
+def test_sqlite_store_uses_wal_and_tracks_schema_version(tmp_path: Path) -> None:
+    store = SqliteServerStore(tmp_path)
+    connection = store._connection
+
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connection.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    connection.execute(f"PRAGMA user_version = {len(MIGRATIONS) + 1}")
+    store.close()
+
+    with pytest.raises(StoreError, match="newer RemoteCraft"):
+        SqliteServerStore(tmp_path)
+
+
+def test_json_store_serves_reads_from_memory_until_the_file_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = ServerStore(tmp_path)
+    created = store.add(record())
+    reads: list[Path] = []
+    original = store_module.read_json_records
+
+    def counting(path: Path) -> list[ServerRecord]:
+        reads.append(path)
+        return original(path)
+
+    monkeypatch.setattr(store_module, "read_json_records", counting)
+
+    for _ in range(3):
+        assert store.get(created.id) == created
+    store.update(created.id, status="online")
+    assert store.get(created.id).status == "online"
+    assert reads == []
+
+    # Another process replaces the file: the next read notices and reloads it.
+    other = ServerStore(tmp_path)
+    other.add(record("c" * 32, name="creative"))
+    reads.clear()
+    assert [server.name for server in store.list()] == ["survival", "creative"]
+    assert len(reads) == 1
+
+
+def test_journal_replays_changes_and_ignores_a_torn_last_line(tmp_path: Path) -> None:
+    store = JournaledServerStore(tmp_path)
+    first = store.add(record())
+    second = store.add(record("c" * 32, name="creative"))
+    store.update(first.id, status="online")
+    store.remove(second.id)
+    # Simulate a crash: nothing is compacted, and one write is cut short.
+    with store.journal_path.open("a", encoding="utf-8") as journal:
+        journal.write('{"remove": "aaaa')
+    store.close()  # The dying process's descriptors and lock go with it.
+
+    assert json.loads(store.path.read_text(encoding="utf-8")) == []
+    recovered = JournaledServerStore(tmp_path)
+
+    assert [(server.id, server.status) for server in recovered.list()] == [(first.id, "online")]
+    assert recovered.journal_path.read_bytes() == b""
+    assert ServerStore(tmp_path).list() == recovered.list()
+
+
+def test_journal_rejects_corruption_before_the_last_line(tmp_path: Path) -> None:
+    store = JournaledServerStore(tmp_path)
+    store.add(record())
+    store.close()
+    journal = tmp_path / "servers.journal"
+    journal.write_text("not-json\n" + journal.read_text(encoding="utf-8"), encoding="utf-8")
+
+    with pytest.raises(StoreError, match="Could not read the server metadata journal"):
+        JournaledServerStore(tmp_path)
+    # A store that failed to open does not keep the directory locked.
+    journal.write_text("", encoding="utf-8")
+    JournaledServerStore(tmp_path).close()
+
+
+def test_journal_compacts_into_the_snapshot(tmp_path: Path) -> None:
+    store = JournaledServerStore(tmp_path, compact_after=3)
+    created = store.add(record())
+    store.update(created.id, status="starting")
+    assert len(store.journal_path.read_bytes().splitlines()) == 2
+
+    store.update(created.id, status="online")
+
+    assert store.journal_path.read_bytes() == b""
+    assert ServerStore(tmp_path).get(created.id).status == "online"
+
+
+def test_journal_writers_share_fsyncs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = JournaledServerStore(tmp_path)
+    ids = [store.add(record(f"{index:032x}", name=f"server-{index}")).id for index in range(8)]
+    fsyncs: list[int] = []
+    fsync = os.fsync
+
+    def slow_fsync(fd: int) -> None:
+        fsyncs.append(fd)
+        time.sleep(0.05)
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", slow_fsync)
+    start = threading.Barrier(len(ids))
+
+    def write(server_id: str) -> None:
+        start.wait()
+        store.update(server_id, status="online")
+
+    threads = [threading.Thread(target=write, args=(server_id,)) for server_id in ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(server.status == "online" for server in store.list())
+    assert len(fsyncs) < len(ids)
+    store.close()
+    assert [server.status for server in JournaledServerStore(tmp_path).list()] == ["online"] * 8
+
+
+def test_journal_has_one_owning_process(tmp_path: Path) -> None:
+    store = JournaledServerStore(tmp_path)
+
+    with pytest.raises(StoreError, match="Another process"):
+        JournaledServerStore(tmp_path)
+
+    store.close()
+    JournaledServerStore(tmp_path).close()
+
+
+def test_json_stores_in_separate_processes_do_not_lose_updates(tmp_path: Path) -> None:
+    # Each instance stands in for one worker process with its own memory and lock.
+    stores = [ServerStore(tmp_path), ServerStore(tmp_path)]
+    ids = [stores[0].add(record(f"{index:032x}", name=f"server-{index}")).id for index in range(8)]
+    start = threading.Barrier(len(ids))
+
+    def write(index: int, server_id: str) -> None:
+        start.wait()
+        stores[index % 2].update(server_id, status="online")
+
+    threads = [
+        threading.Thread(target=write, args=(index, server_id))
+        for index, server_id in enumerate(ids)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [server.status for server in ServerStore(tmp_path).list()] == ["online"] * 8
+    assert stores[0].list() == stores[1].list()
@@ -1,10 +1,15 @@
+import hashlib
+import io
 import json
+from collections.abc import Callable
+from email.message import Message
 from pathlib import Path
-from urllib.error import URLError
+from urllib.error import HTTPError, URLError
 
 import pytest
 
 from remotecraft.errors import NotFoundError, UpstreamError
+from remotecraft.models import DownloadSpec
 from remotecraft.versions import MANIFEST_URL, VersionCatalog
 
 DETAIL_URL = "https://piston-meta.mojang.com/v1/packages/release.json"
@@ -12,8 +17,9 @@ JAR_URL = "https://piston-data.mojang.com/v1/objects/server.jar"
 
 
 class Response:
-    def __init__(self, payload: dict) -> None:
+    def __init__(self, payload: dict, headers: dict[str, str] | None = None) -> None:
         self.payload = payload
+        self.headers = headers or {}
 
     def __enter__(self) -> "Response":
         return self
@@ -49,6 +55,66 @@ def test_catalog_lists_releases_and_caches_manifest(tmp_path: Path) -> None:
     assert calls == [MANIFEST_URL]
 
 
+def test_catalog_serves_lookups_from_memory_until_the_ttl_passes(tmp_path: Path) -> None:
+    cache = tmp_path / "versions.json"
+    now = [100.0]
+    calls: list[str] = []
+
+    def opener(request, timeout: int):  # type: ignore[no-untyped-def]
+        calls.append(request.full_url)
+        return Response(manifest())
+
+    pending: list[Callable[[], None]] = []
+    catalog = VersionCatalog(cache, opener=opener, clock=lambda: now[0], spawn=pending.append)
+    assert catalog.list_releases() == ["1.21.5"]
+    cache.unlink()
+    assert catalog.list_releases() == ["1.21.5"]
+    with pytest.raises(NotFoundError):
+        catalog.get_vanilla_download("25w01a")
+
+    # Another process refreshed the file: it is re-read instead of fetched again.
+    newer = {"versions": [{"id": "1.21.6", "type": "release", "url": DETAIL_URL}]}
+    cache.write_text(json.dumps({"timestamp": 3650, "manifest": newer}), encoding="utf-8")
+    now[0] = 3700.0
+    assert catalog.list_releases() == ["1.21.6"]
+    assert calls == [MANIFEST_URL]
+
+    # Past the TTL the stale index is served while a refresh runs in the background.
+    now[0] = 7300.0
+    assert catalog.list_releases() == ["1.21.6"]
+    assert catalog.list_releases() == ["1.21.6"]
+    assert len(pending) == 1 and calls == [MANIFEST_URL]
+    pending.pop()()
+    assert catalog.list_releases() == ["1.21.5"]
+    assert calls == [MANIFEST_URL, MANIFEST_URL]
+
+
+def test_catalog_revalidates_with_validators_and_keeps_manifest_on_304(tmp_path: Path) -> None:
+    now = [100.0]
+    sent: list[dict[str, str]] = []
+
+    def opener(request, timeout: int):  # type: ignore[no-untyped-def]
+        sent.append(dict(request.header_items()))
+        if len(sent) > 1:
+            raise HTTPError(MANIFEST_URL, 304, "Not Modified", Message(), None)
+        return Response(manifest(), {"ETag": '"v1"', "Last-Modified": "Tue, 01 Jul 2025"})
+
+    catalog = VersionCatalog(tmp_path / "versions.json", opener=opener, clock=lambda: now[0])
+    catalog.refresh()
+    now[0] = 5000.0
+    # A fresh process picks up the validators from the cache file.
+    reloaded = VersionCatalog(tmp_path / "versions.json", opener=opener, clock=lambda: now[0])
+    index = reloaded.refresh()
+
+    assert index.releases == ("1.21.5",)
+    assert index.fetched_at == 5000.0
+    assert "If-none-match" not in sent[0]
+    assert sent[1]["If-none-match"] == '"v1"'
+    assert sent[1]["If-modified-since"] == "Tue, 01 Jul 2025"
+    assert reloaded.refresh() is index
+    assert len(sent) == 2
+
+
 def test_catalog_returns_verified_download_metadata(tmp_path: Path) -> None:
     payloads = {
         MANIFEST_URL: manifest(),
@@ -67,6 +133,49 @@ def test_catalog_returns_verified_download_metadata(tmp_path: Path) -> None:
     assert download.size == 1234
 
 
+def test_catalog_caches_release_documents_by_their_checksum(tmp_path: Path) -> None:
+    details = {
+        "id": "1.21.5",
+        "downloads": {"server": {"url": JAR_URL, "sha1": "a" * 40, "size": 1}},
+    }
+    body = json.dumps(details).encode()
+    entry = {
+        "id": "1.21.5",
+        "type": "release",
+        "url": DETAIL_URL,
+        "sha1": hashlib.sha1(body, usedforsecurity=False).hexdigest(),
+    }
+    cache = tmp_path / "versions.json"
+    cache.write_text(
+        json.dumps({"timestamp": 100, "manifest": {"versions": [entry]}}), encoding="utf-8"
+    )
+    fetched: list[str] = []
+    served = [body]
+
+    def opener(request, timeout: int):  # type: ignore[no-untyped-def]
+        fetched.append(request.full_url)
+        return io.BytesIO(served[0])
+
+    def catalog() -> VersionCatalog:
+        return VersionCatalog(cache, opener=opener, clock=lambda: 100)
+
+    assert catalog().get_vanilla_download("1.21.5").sha1 == "a" * 40
+    assert catalog().get_vanilla_download("1.21.5").sha1 == "a" * 40
+    assert fetched == [DETAIL_URL]
+
+    cached = tmp_path / "releases" / f"{entry['sha1']}.json"
+    cached.write_bytes(b"{}")
+    assert catalog().get_vanilla_download("1.21.5").size == 1
+    assert fetched == [DETAIL_URL, DETAIL_URL]
+    assert cached.read_bytes() == body
+
+    cached.unlink()
+    served[0] = body.replace(b'"size": 1', b'"size": 2')
+    with pytest.raises(UpstreamError, match="checksum"):
+        catalog().get_vanilla_download("1.21.5")
+    assert not cached.exists()
+
+
 def test_catalog_rejects_untrusted_metadata_url(tmp_path: Path) -> None:
     def opener(_request, timeout: int):  # type: ignore[no-untyped-def]
         assert timeout == 10
@@ -97,3 +206,27 @@ def test_catalog_reports_unknown_release(tmp_path: Path) -> None:
 
     with pytest.raises(NotFoundError):
         catalog.get_vanilla_download("1.0")
+
+
+def test_catalog_downloads_jar_only_when_its_hash_matches(tmp_path: Path) -> None:
+    def opener(request, timeout: int):  # type: ignore[no-untyped-def]
+        assert request.full_url == JAR_URL
+        return io.BytesIO(b"server jar")
+
+    catalog = VersionCatalog(tmp_path / "versions.json", opener=opener)
+    sha1 = hashlib.sha1(b"server jar", usedforsecurity=False).hexdigest()
+    received: list[int] = []
+
+    catalog.download_jar(
+        DownloadSpec(url=JAR_URL, sha1=sha1, size=10),
+        tmp_path / "good.jar",
+        progress=received.append,
+    )
+    with pytest.raises(UpstreamError, match="SHA-1"):
+        catalog.download_jar(
+            DownloadSpec(url=JAR_URL, sha1="c" * 40, size=10), tmp_path / "bad.jar"
+        )
+
+    assert (tmp_path / "good.jar").read_bytes() == b"server jar"
+    assert received == [10]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["good.jar"]